@@ -0,0 +1,129 @@
+"""
+Audio playback engine for the Kili English Learning App.
+
+Plays text-to-speech audio straight from memory through one long-lived
+player, with queueing and interruption, instead of writing every reply to
+disk and constructing a new QMediaPlayer for it.
+"""
+
+from collections import deque
+from PyQt5.QtCore import QObject, QBuffer, QByteArray, QIODevice, pyqtSignal
+from PyQt5.QtMultimedia import (
+    QAudio,
+    QAudioFormat,
+    QAudioOutput,
+    QMediaContent,
+    QMediaPlayer,
+)
+
+# Raw PCM returned by the speech API: 24 kHz, 16-bit signed, little-endian, mono
+PCM_SAMPLE_RATE = 24000
+PCM_SAMPLE_SIZE = 16
+PCM_CHANNELS = 1
+
+
+class AudioPlaybackEngine(QObject):
+    """
+    Long-lived playback engine that plays queued audio clips from memory.
+
+    Compressed clips (mp3, opus, ...) go through a single QMediaPlayer fed
+    from a QBuffer. Raw PCM clips skip decoding entirely and go straight to
+    a QAudioOutput, which gives the lowest time to first sound.
+    """
+    started = pyqtSignal()
+    finished = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.queue = deque()
+        self._buffer = None
+        self._current_format = None
+
+        self.player = QMediaPlayer(self)
+        self.player.mediaStatusChanged.connect(self._on_media_status)
+
+        audio_format = QAudioFormat()
+        audio_format.setSampleRate(PCM_SAMPLE_RATE)
+        audio_format.setSampleSize(PCM_SAMPLE_SIZE)
+        audio_format.setChannelCount(PCM_CHANNELS)
+        audio_format.setCodec("audio/pcm")
+        audio_format.setByteOrder(QAudioFormat.LittleEndian)
+        audio_format.setSampleType(QAudioFormat.SignedInt)
+        self.pcm_output = QAudioOutput(audio_format, self)
+        self.pcm_output.stateChanged.connect(self._on_pcm_state)
+
+    def enqueue(self, data, audio_format="mp3"):
+        """
+        Queue an audio clip; it starts at once if nothing else is playing.
+
+        Args:
+            data (bytes): Encoded audio as returned by the speech API.
+            audio_format (str): Format of `data`, e.g. "pcm", "mp3" or "opus".
+        """
+        if not data:
+            return
+        self.queue.append((bytes(data), audio_format))
+        if not self.is_playing():
+            self._play_next()
+
+    def play(self, data, audio_format="mp3"):
+        """
+        Interrupt whatever is playing and play this clip immediately.
+        """
+        self.interrupt()
+        self.enqueue(data, audio_format)
+
+    def interrupt(self):
+        """
+        Stop the current clip and drop everything queued after it.
+        """
+        self.queue.clear()
+        self._stop_current()
+
+    def is_playing(self):
+        return self._current_format is not None
+
+    def _play_next(self):
+        if not self.queue:
+            self.finished.emit()
+            return
+        data, audio_format = self.queue.popleft()
+
+        self._buffer = QBuffer(self)
+        self._buffer.setData(QByteArray(data))
+        self._buffer.open(QIODevice.ReadOnly)
+        self._current_format = audio_format
+
+        if audio_format == "pcm":
+            self.pcm_output.start(self._buffer)
+        else:
+            self.player.setMedia(QMediaContent(), self._buffer)
+            self.player.play()
+        self.started.emit()
+
+    def _stop_current(self):
+        current_format = self._current_format
+        self._current_format = None
+        if current_format == "pcm":
+            self.pcm_output.stop()
+        elif current_format is not None:
+            self.player.stop()
+            self.player.setMedia(QMediaContent())
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer.deleteLater()
+            self._buffer = None
+
+    def _on_media_status(self, status):
+        if self._current_format not in (None, "pcm") and status in (
+            QMediaPlayer.EndOfMedia,
+            QMediaPlayer.InvalidMedia,
+        ):
+            self._stop_current()
+            self._play_next()
+
+    def _on_pcm_state(self, state):
+        # Idle means the buffer ran dry, i.e. the clip finished playing
+        if self._current_format == "pcm" and state == QAudio.IdleState:
+            self._stop_current()
+            self._play_next()
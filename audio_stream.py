@@ -0,0 +1,165 @@
+"""
+Streaming speech-to-text helpers for the Kili English Learning App.
+
+Cuts live microphone capture into segments at pauses and transcribes the
+segments concurrently while the learner is still speaking, so the full text
+is ready almost as soon as the recording stops.
+"""
+
+import io
+import asyncio
+import numpy as np
+from scipy.io.wavfile import write
+
+
+class PauseSegmenter:
+    """
+    Splits a stream of audio blocks into segments at pauses in speech.
+
+    A segment is cut once speech has been heard and the trailing silence
+    reaches `min_pause` seconds. Long monologues are force-cut at
+    `max_segment` seconds so no single upload grows unbounded.
+    """
+
+    def __init__(
+        self,
+        samplerate=44100,
+        silence_threshold=0.01,
+        min_pause=0.6,
+        min_segment=1.0,
+        max_segment=15.0,
+    ):
+        self.samplerate = samplerate
+        self.silence_threshold = silence_threshold
+        self.min_pause_frames = int(min_pause * samplerate)
+        self.min_segment_frames = int(min_segment * samplerate)
+        self.max_segment_frames = int(max_segment * samplerate)
+        self._reset()
+
+    def _reset(self):
+        self._blocks = []
+        self._frames = 0
+        self._silent_frames = 0
+        self._has_speech = False
+
+    def feed(self, block):
+        """
+        Adds a block of samples and returns any segments completed by it.
+
+        Args:
+            block (np.ndarray): Audio samples as delivered by the input stream.
+
+        Returns:
+            list: Completed segments as numpy arrays (usually empty).
+        """
+        rms = float(np.sqrt(np.mean(np.square(block)))) if len(block) else 0.0
+        if rms < self.silence_threshold:
+            self._silent_frames += len(block)
+        else:
+            self._silent_frames = 0
+            self._has_speech = True
+
+        self._blocks.append(block)
+        self._frames += len(block)
+
+        if not self._has_speech:
+            # Drop leading silence so it is never uploaded
+            if self._frames > self.min_pause_frames:
+                self._blocks = self._blocks[-1:]
+                self._frames = len(block)
+            return []
+
+        paused = (
+            self._silent_frames >= self.min_pause_frames
+            and self._frames >= self.min_segment_frames
+        )
+        if paused or self._frames >= self.max_segment_frames:
+            return [self._cut()]
+        return []
+
+    def flush(self):
+        """
+        Returns the remaining buffered speech as a final segment.
+
+        Returns:
+            np.ndarray or None: The last segment, or None if only silence is buffered.
+        """
+        if not self._has_speech:
+            self._reset()
+            return None
+        return self._cut()
+
+    def _cut(self):
+        segment = np.concatenate(self._blocks, axis=0)
+        self._reset()
+        return segment
+
+
+def segment_to_wav(segment, samplerate):
+    """
+    Encodes a segment as an in-memory 16-bit WAV file ready for upload.
+
+    Args:
+        segment (np.ndarray): Float audio samples in the range [-1, 1].
+        samplerate (int): Sample rate of the segment.
+
+    Returns:
+        io.BytesIO: WAV file object with a `name` so upload clients detect the format.
+    """
+    pcm = (np.clip(segment, -1.0, 1.0) * 32767).astype(np.int16)
+    wav_file = io.BytesIO()
+    write(wav_file, samplerate, pcm)
+    wav_file.seek(0)
+    wav_file.name = "segment.wav"
+    return wav_file
+
+
+class ChunkedTranscriber:
+    """
+    Transcribes audio segments concurrently in the background and stitches
+    the partial transcripts back together in capture order.
+    """
+
+    def __init__(self, transcribe, samplerate=44100, loop=None):
+        """
+        Args:
+            transcribe (callable): Blocking function taking a WAV file object and returning text.
+            samplerate (int): Sample rate of submitted segments.
+            loop (asyncio.AbstractEventLoop): Loop to schedule transcriptions on.
+        """
+        self.transcribe = transcribe
+        self.samplerate = samplerate
+        self.loop = loop or asyncio.get_event_loop()
+        self._tasks = []
+
+    def submit(self, segment):
+        """
+        Schedules a segment for transcription. Safe to call from any thread.
+        """
+        if segment is None or not len(segment):
+            return
+        self.loop.call_soon_threadsafe(self._start, segment)
+
+    def _start(self, segment):
+        wav_file = segment_to_wav(segment, self.samplerate)
+        self._tasks.append(
+            self.loop.create_task(asyncio.to_thread(self.transcribe, wav_file))
+        )
+
+    async def result(self):
+        """
+        Waits for every scheduled segment and returns the stitched transcript.
+
+        Returns:
+            str: Partial transcripts joined in capture order.
+        """
+        # Let submissions queued from the recorder thread reach _start first
+        await asyncio.sleep(0)
+        parts = await asyncio.gather(*self._tasks, return_exceptions=True)
+        texts = []
+        for part in parts:
+            if isinstance(part, Exception):
+                print("Error transcribing segment:", part)
+            elif part and part.strip():
+                texts.append(part.strip())
+        return " ".join(texts)
@@ -0,0 +1,172 @@
+"""
+Headless batch analysis for archives of recorded practice conversations.
+
+Walks a directory of transcripts (.txt, in the app's "You: / System:" format)
+and audio recordings, and for each item runs transcription (audio only) and
+conversation_corrector in a pool of worker processes. The main process
+ingests the resulting feedback into the learnings database, records each
+finished item in a checkpoint file so interrupted runs resume where they
+stopped, and reports throughput in items/s.
+
+Usage:
+    python batch_analyze.py recordings/ --workers 8
+    python batch_analyze.py recordings/ --db database/english_learnings.db --checkpoint run.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import database_manager
+import gen_ai_apis
+from transcript import Transcript
+
+auth_key = "openai_auth_key.txt"
+db_file = "database/english_learnings.db"
+
+TRANSCRIPT_EXTENSIONS = {".txt"}
+AUDIO_EXTENSIONS = {".mp3", ".wav", ".m4a", ".ogg", ".webm", ".flac"}
+
+# Per-process client, created once by the pool initializer
+_worker_client = None
+
+
+def _init_worker(key_path):
+    global _worker_client
+    _worker_client = gen_ai_apis.create_client(key_path)
+
+
+def analyze_item(path):
+    """
+    Transcribes (if needed) and analyzes one conversation in a worker process.
+
+    Args:
+        path (str): Transcript or audio file.
+
+    Returns:
+        dict: The feedback produced by conversation_corrector.
+    """
+    session = gen_ai_apis.TutorSession(lambda: _worker_client)
+    if os.path.splitext(path)[1].lower() in AUDIO_EXTENSIONS:
+        with open(path, "rb") as audio_file:
+            text = session.speech_to_text(audio_file)
+        session.transcript.append("You", text)
+    else:
+        with open(path, "r", encoding="utf-8") as txt_file:
+            session.transcript = Transcript.parse(txt_file.read())
+    return session.conversation_corrector()
+
+
+def find_items(input_dir):
+    """
+    Lists transcript and audio files under a directory, in a stable order.
+    """
+    extensions = TRANSCRIPT_EXTENSIONS | AUDIO_EXTENSIONS
+    items = []
+    for root, _, files in os.walk(input_dir):
+        for name in files:
+            if os.path.splitext(name)[1].lower() in extensions:
+                items.append(os.path.join(root, name))
+    return sorted(items)
+
+
+def load_checkpoint(checkpoint_path):
+    """
+    Returns the set of items already finished by earlier runs.
+    """
+    done = set()
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path, "r") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # A line cut short by an interrupted run
+                if entry.get("status") == "done":
+                    done.add(entry["item"])
+    return done
+
+
+def run(input_dir, workers, db_path, checkpoint_path, key_path):
+    items = find_items(input_dir)
+    done = load_checkpoint(checkpoint_path)
+    pending = [path for path in items if os.path.relpath(path, input_dir) not in done]
+    print(f"[Batch] {len(items)} items found, {len(items) - len(pending)} already done.")
+    if not pending:
+        return
+
+    db = database_manager.DBManager(db_path)
+    processed = failed = learned = 0
+    start = time.perf_counter()
+
+    with open(checkpoint_path, "a") as checkpoint, ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(key_path,)
+    ) as pool:
+        queue = iter(pending)
+        in_flight = {}
+
+        def submit_next():
+            path = next(queue, None)
+            if path is not None:
+                in_flight[pool.submit(analyze_item, path)] = path
+
+        # Keep a bounded number of items in flight so memory stays flat on large archives
+        for _ in range(workers * 2):
+            submit_next()
+
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                path = in_flight.pop(future)
+                item = os.path.relpath(path, input_dir)
+                try:
+                    learned += db.add_feedback(future.result(), note=f"batch: {item}")
+                    entry = {"item": item, "status": "done"}
+                    processed += 1
+                except Exception as e:
+                    print(f"Error analyzing {item}:", e)
+                    entry = {"item": item, "status": "error", "error": str(e)}
+                    failed += 1
+                checkpoint.write(json.dumps(entry) + "\n")
+                checkpoint.flush()
+                submit_next()
+
+            elapsed = time.perf_counter() - start
+            print(
+                f"[Batch] {processed + failed}/{len(pending)} items, "
+                f"{(processed + failed) / elapsed:.2f} items/s",
+                end="\r",
+            )
+
+    db.close()
+    elapsed = time.perf_counter() - start
+    print(
+        f"\n[Batch] Done: {processed} analyzed, {failed} failed, {learned} new learnings "
+        f"in {elapsed:.1f} s ({processed / elapsed:.2f} items/s)."
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyze recorded practice conversations in bulk.")
+    parser.add_argument("input_dir", help="Directory of transcripts and audio files.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--db", default=db_file)
+    parser.add_argument(
+        "--checkpoint",
+        help="Progress file for resuming (default: .kili_batch_checkpoint.jsonl in input_dir).",
+    )
+    parser.add_argument("--auth-key", default=auth_key)
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.input_dir):
+        sys.exit(f"Not a directory: {args.input_dir}")
+    run(
+        args.input_dir,
+        args.workers,
+        args.db,
+        args.checkpoint or os.path.join(args.input_dir, ".kili_batch_checkpoint.jsonl"),
+        args.auth_key,
+    )
@@ -0,0 +1,126 @@
+"""
+Benchmark for reading learning items from the database.
+
+Fills a database with synthetic learnings, then loads every item of every
+category and serializes them with format_learnings_to_json (the path of a
+large quiz draw or an export), once as typed LearningItems built by the
+row factory and once the way rows used to be read: a dict per row from
+dict(zip(columns, row)) plus a "table" key, serialized by dispatching on the
+table name. Reports time, peak allocation while loading and memory held by
+the loaded rows.
+
+Usage:
+    python benchmarks/learning_items.py --items 20000 --runs 5
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import database_manager  # noqa: E402
+import helper  # noqa: E402
+
+TABLES = list(database_manager.DBManager.TABLE_SCHEMAS)
+
+
+def fill(db, items, rng):
+    today = datetime.today().strftime("%Y-%m-%d")
+    with db.conn:
+        for table, (key_col, value_col) in database_manager.DBManager.SEARCH_COLUMNS.items():
+            columns = [key_col] + ([value_col] if value_col else [])
+            rows = [
+                [f"{table} key {i} {rng.random()}"] + ([f"value {i}"] if value_col else []) + [today, "note"]
+                for i in range(items)
+            ]
+            db.conn.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}, learned_date, note) "
+                f"VALUES ({', '.join('?' for _ in columns)}, ?, ?)",
+                rows,
+            )
+
+
+def load_dicts(db):
+    entries = []
+    for table in TABLES:
+        cursor = db.conn.execute(f"SELECT * FROM {table}")
+        columns = [description[0] for description in cursor.description]
+        for row in cursor.fetchall():
+            entry = dict(zip(columns, row))
+            entry["table"] = table
+            entries.append(entry)
+    return entries
+
+
+def format_dicts(learnings):
+    result = {"grammar_mistakes": {}, "better_vocabulary": {}, "better_phrases": {},
+              "new_words": [], "new_phrases": []}
+    for item in learnings:
+        table = item.get("table")
+        if table == "GrammarMistakes":
+            result["grammar_mistakes"][item["mistake"]] = item["correction"]
+        elif table == "BetterVocabulary":
+            word, better_word = item.get("word") or item.get("original"), item.get("better_word") or item.get("better")
+            if word and better_word:
+                result["better_vocabulary"][word] = better_word
+        elif table == "BetterPhrases":
+            if item.get("original") and item.get("better"):
+                result["better_phrases"][item["original"]] = item["better"]
+        elif table == "NewWords":
+            if item.get("word"):
+                result["new_words"].append(item["word"])
+        elif table == "NewPhrases":
+            if item.get("phrase"):
+                result["new_phrases"].append(item["phrase"])
+    return result
+
+
+def load_items(db):
+    entries = []
+    for table in TABLES:
+        entries.extend(db.get_entries(table))
+    return entries
+
+
+def measure(load, serialize, db, runs):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        serialize(load(db))
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entries = load(db)
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1000, (peak - before) / 2 ** 20, (held - before) / 2 ** 20, len(entries)
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = database_manager.DBManager(os.path.join(tmp, "bench.db"))
+        fill(db, args.items, rng)
+        print(f"{'rows':>8} {'':>6} {'load+format ms':>15} {'peak MiB':>9} {'held MiB':>9}")
+        for name, load, serialize in (
+            ("dicts", load_dicts, format_dicts),
+            ("items", load_items, helper.format_learnings_to_json),
+        ):
+            elapsed, peak, held, rows = measure(load, serialize, db, args.runs)
+            print(f"{rows:>8} {name:>6} {elapsed:>15.1f} {peak:>9.1f} {held:>9.1f}")
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--items", type=int, default=20000, help="Items per category.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
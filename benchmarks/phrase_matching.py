@@ -0,0 +1,93 @@
+"""
+Benchmark for detecting stored words and phrases in chat messages.
+
+Fills a phrase index with a growing number of synthetic target phrases and
+times scanning a chat message with the Aho-Corasick index against checking
+every stored phrase in turn (stems compared as word sequences, so both find
+the same matches). Also times adding one phrase to the built index and the
+first scan after it, the path of a turn following a stored report.
+
+Usage:
+    python benchmarks/phrase_matching.py --items 100 1000 10000 50000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import phrase_matcher  # noqa: E402
+
+WORDS = (
+    "make take progress break habit improve skill fluent conversation describe "
+    "enormous remarkable heading bed schedule meeting practice patient neighbour "
+    "weather forecast appointment reluctant eager borrow lend vivid recall"
+).split()
+
+
+def synthetic_phrases(rng, count):
+    phrases = set()
+    while len(phrases) < count:
+        length = rng.choice((1, 2, 2, 3, 4))
+        phrases.add(" ".join(rng.choice(WORDS) + str(rng.randrange(count)) for _ in range(length)))
+    return sorted(phrases)
+
+
+def naive_match(phrases, text):
+    stems = [token for token, _, _ in phrase_matcher.tokenize(text)]
+    found = []
+    for phrase in phrases:
+        length = len(phrase)
+        for i in range(len(stems) - length + 1):
+            if stems[i:i + length] == phrase:
+                found.append(phrase)
+    return found
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    print(f"{'items':>7} {'build ms':>9} {'index us':>9} {'add+scan us':>12} {'naive us':>10} {'matches':>8}")
+    for count in args.items:
+        phrases = synthetic_phrases(rng, count)
+        used = rng.sample(phrases, min(3, len(phrases)))
+        message = (
+            f"Yesterday I wanted to {used[0]} before the {used[1]}, "
+            f"and honestly the {used[-1]} was much better than I expected it to be."
+        )
+
+        start = time.perf_counter()
+        index = phrase_matcher.PhraseIndex()
+        index.add_many(("NewPhrases", i, phrase) for i, phrase in enumerate(phrases))
+        build_ms = (time.perf_counter() - start) * 1000
+
+        stemmed = [[token for token, _, _ in phrase_matcher.tokenize(p)] for p in phrases]
+        index_us = timed(lambda: index.match(message), args.repeat)
+        start = time.perf_counter()
+        for i in range(args.adds):
+            index.add("NewPhrases", count + i, f"{rng.choice(WORDS)} {rng.choice(WORDS)}{rng.randrange(count)}")
+            index.match(message)
+        add_us = (time.perf_counter() - start) / args.adds * 1e6
+        naive_us = timed(lambda: naive_match(stemmed, message), max(1, args.repeat // 100))
+        matches = len(index.match(message))
+        assert matches == len(naive_match(stemmed, message))
+        print(f"{count:>7} {build_ms:>9.1f} {index_us:>9.1f} {add_us:>12.1f} {naive_us:>10.0f} {matches:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=1000, help="Scans timed per size.")
+    parser.add_argument("--adds", type=int, default=100, help="Single additions timed per size.")
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
@@ -0,0 +1,81 @@
+"""
+Benchmark for diversity-aware memory quiz selection.
+
+Fills a temporary learnings database with synthetic items, builds the
+TF-IDF matrix once, and then times repeated diverse picks (due sampling,
+TF-IDF weighting and greedy MMR) against the plain random picker.
+
+Usage:
+    python benchmarks/quiz_selection.py --items 100000 --runs 20
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import database_manager  # noqa: E402
+
+TABLES = ["GrammarMistakes", "BetterPhrases", "BetterVocabulary", "NewWords", "NewPhrases"]
+WORDS = (
+    "the a an house car went go goes yesterday school friend big small happy "
+    "quickly slowly running eat ate eaten table city river book"
+).split()
+
+
+def fill(db, items, seed):
+    rng = random.Random(seed)
+
+    def sentence(i):
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 9))) + f" {i}"
+
+    share = items // 3
+    db.add_feedback({
+        "grammar_mistakes": {sentence(i): "correction" for i in range(share)},
+        "better_phrases": {sentence(i): "better" for i in range(share, 2 * share)},
+        "better_vocabulary": {f"{rng.choice(WORDS)}{i}": "better" for i in range(items - 2 * share)},
+    })
+
+
+def timed(fn, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return statistics.median(times), times[min(len(times) - 1, int(0.95 * len(times)))]
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = database_manager.DBManager(os.path.join(tmp, "bench.db"))
+        fill(db, args.items, args.seed)
+
+        start = time.perf_counter()
+        db.get_diverse_from_tables(TABLES, args.limit)  # Builds the matrix
+        build_ms = (time.perf_counter() - start) * 1000
+
+        diverse = timed(lambda: db.get_diverse_from_tables(TABLES, args.limit), args.runs)
+        plain = timed(lambda: db.get_random_from_tables(TABLES, args.limit), args.runs)
+        db.close()
+
+    print(f"items:             {args.items}")
+    print(f"matrix build:      {build_ms:.1f} ms")
+    print(f"diverse p50/p95:   {diverse[0]:.1f} / {diverse[1]:.1f} ms")
+    print(f"random p50/p95:    {plain[0]:.1f} / {plain[1]:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
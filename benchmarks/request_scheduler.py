@@ -0,0 +1,80 @@
+"""
+Benchmark for the priority request scheduler.
+
+Simulates a backend that serves a limited number of calls at once. Interactive
+calls (short, like a chat turn) arrive at a steady pace while a growing
+number of background workers keep long calls queued. Reports interactive
+latency p50/p95 at each background load, once with priority classes and
+once with every call in one class (first come, first served).
+
+Usage:
+    python benchmarks/request_scheduler.py --capacity 4 --background 0 4 16 64
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import request_scheduler  # noqa: E402
+
+
+def run(args, background_workers, prioritized):
+    scheduler = request_scheduler.RequestScheduler(
+        max_concurrent=args.capacity, reserved_interactive=1 if prioritized else 0, limits={}
+    )
+    background_level = request_scheduler.BACKGROUND if prioritized else request_scheduler.INTERACTIVE
+    stop = threading.Event()
+
+    def background():
+        with request_scheduler.priority(background_level):
+            while not stop.is_set():
+                scheduler.call("model", lambda: time.sleep(args.background_ms / 1000))
+
+    workers = [threading.Thread(target=background, daemon=True) for _ in range(background_workers)]
+    for worker in workers:
+        worker.start()
+    time.sleep(args.background_ms / 1000)  # Let the queue fill
+
+    latencies = []
+    for _ in range(args.calls):
+        start = time.perf_counter()
+        scheduler.call(
+            "model", lambda: time.sleep(args.interactive_ms / 1000), request_scheduler.INTERACTIVE
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(args.interval_ms / 1000)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    latencies.sort()
+    return statistics.median(latencies), latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+
+
+def main(args):
+    print(f"interactive call: {args.interactive_ms} ms, background call: {args.background_ms} ms, "
+          f"backend capacity: {args.capacity}")
+    print(f"{'background':>10} {'priority p50/p95 ms':>22} {'fifo p50/p95 ms':>20}")
+    for background_workers in args.background:
+        prioritized = run(args, background_workers, True)
+        fifo = run(args, background_workers, False)
+        print(
+            f"{background_workers:>10} {prioritized[0]:>10.0f} / {prioritized[1]:<9.0f}"
+            f" {fifo[0]:>8.0f} / {fifo[1]:<9.0f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--capacity", type=int, default=4, help="Calls the backend serves at once.")
+    parser.add_argument("--background", type=int, nargs="+", default=[0, 4, 16, 64])
+    parser.add_argument("--calls", type=int, default=40, help="Interactive calls per run.")
+    parser.add_argument("--interactive-ms", type=float, default=50)
+    parser.add_argument("--background-ms", type=float, default=300)
+    parser.add_argument("--interval-ms", type=float, default=50)
+    main(parser.parse_args())
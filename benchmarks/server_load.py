@@ -0,0 +1,95 @@
+"""
+Load test for the headless tutor server.
+
+Starts server.create_app in-process on a local port with a pool of
+StubClients, then drives many concurrent learner sessions over HTTP, each
+creating a session and sending several chat turns. Reports throughput and
+per-turn latency, so the cost of the server itself (routing, session
+isolation, thread hand-off) is visible on top of the simulated backend time.
+
+Usage:
+    python benchmarks/server_load.py --sessions 500 --turns 5 --chat-latency 0.5
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import aiohttp
+from aiohttp import web
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import gen_ai_apis  # noqa: E402
+import request_scheduler  # noqa: E402
+import server  # noqa: E402
+from stub_backends import StubClient  # noqa: E402
+
+
+async def learner(http, base_url, turns, latencies):
+    """
+    One simulated learner: open a session, chat, close it.
+    """
+    async with http.post(f"{base_url}/sessions") as response:
+        session_id = (await response.json())["session_id"]
+    for i in range(turns):
+        start = time.perf_counter()
+        async with http.post(
+            f"{base_url}/sessions/{session_id}/chat", json={"text": f"Turn {i} of my practice."}
+        ) as response:
+            response.raise_for_status()
+            await response.json()
+        latencies.append(time.perf_counter() - start)
+    async with http.delete(f"{base_url}/sessions/{session_id}"):
+        pass
+
+
+async def main(args):
+    pool = gen_ai_apis.ClientPool(
+        StubClient({"chat": args.chat_latency}, jitter=args.jitter, seed=i)
+        for i in range(args.clients)
+    )
+    manager = gen_ai_apis.SessionManager(pool)
+    runner = web.AppRunner(server.create_app(manager, args.workers))
+    # The stubs have no rate limits to protect
+    request_scheduler.scheduler.configure(limits={})
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", args.port)
+    await site.start()
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    latencies = []
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as http:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(learner(http, base_url, args.turns, latencies) for _ in range(args.sessions))
+        )
+        elapsed = time.perf_counter() - start
+    await runner.cleanup()
+
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+    print(f"sessions:        {args.sessions}")
+    print(f"turns:           {len(latencies)}")
+    print(f"elapsed:         {elapsed:.2f} s")
+    print(f"throughput:      {len(latencies) / elapsed:.1f} turns/s")
+    print(f"latency p50:     {statistics.median(latencies) * 1000:.1f} ms")
+    print(f"latency p95:     {p95 * 1000:.1f} ms")
+    print(f"backend latency: {args.chat_latency * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=300)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=512)
+    parser.add_argument("--chat-latency", type=float, default=0.5)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--port", type=int, default=8765)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,80 @@
+"""
+Benchmark for the per-learner shard pool of the server.
+
+Stores learnings for a growing number of learners from a thread pool,
+reporting throughput, open file descriptors and resident memory at each
+step (both should stay flat once the pool is full), and times the
+cross-shard aggregate at the end.
+
+Usage:
+    python benchmarks/shard_pool.py --learners 5000 --max-open 64 --threads 16
+"""
+
+import argparse
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import shard_router  # noqa: E402
+
+
+def open_fds():
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return -1  # Not Linux
+
+
+def rss_mib():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        router = shard_router.ShardRouter(tmp, args.max_open)
+
+        def visit(i):
+            learner = f"learner-{i}"
+            with router.db(learner) as db:
+                db.add_feedback({"grammar_mistakes": {f"mistake {rng.random()}": "correction"}})
+                db.get_random_from_tables(["GrammarMistakes"], 1)
+
+        print(f"{'learners':>9} {'ops/s':>8} {'open fds':>9} {'rss MiB':>8} {'open shards':>12}")
+        with ThreadPoolExecutor(args.threads) as executor:
+            for step in range(1, args.steps + 1):
+                count = args.learners * step // args.steps
+                # Mostly recent learners, some revisits of older ones
+                visits = [rng.randrange(count) if rng.random() < 0.2 else rng.randrange(count // 2, count)
+                          for _ in range(args.ops)]
+                start = time.perf_counter()
+                list(executor.map(visit, visits))
+                rate = args.ops / (time.perf_counter() - start)
+                print(f"{count:>9} {rate:>8.0f} {open_fds():>9} {rss_mib():>8.1f} {len(router):>12}")
+
+        start = time.perf_counter()
+        stats = router.aggregate_stats()
+        print(f"aggregate over {stats['learners']} shards: {(time.perf_counter() - start) * 1000:.0f} ms")
+        router.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--learners", type=int, default=5000)
+    parser.add_argument("--max-open", type=int, default=shard_router.MAX_OPEN_SHARDS)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--ops", type=int, default=2000, help="Learner visits per step.")
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
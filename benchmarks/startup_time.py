@@ -0,0 +1,58 @@
+"""
+Startup-time benchmark for the Kili English Learning App.
+
+Launches the app repeatedly with --startup-benchmark, which quits right after
+the first paint, and compares the default lazy startup against
+--eager-startup (all tabs, audio and model stacks loaded up front). Reports
+module import time and time to first paint as printed by the app, plus the
+wall-clock time of the whole process.
+
+Usage:
+    python benchmarks/startup_time.py --runs 5
+    QT_QPA_PLATFORM=offscreen python benchmarks/startup_time.py
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STARTUP_LINE = re.compile(r"\[Startup\] imports: ([\d.]+) ms, first paint: ([\d.]+) ms")
+
+
+def measure(extra_args):
+    """
+    Runs the app once and returns (imports_ms, first_paint_ms, wall_ms).
+    """
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "kili_english_app.py", "--startup-benchmark", *extra_args],
+        cwd=REPO_ROOT, capture_output=True, text=True, timeout=120,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    match = STARTUP_LINE.search(completed.stdout)
+    if not match:
+        raise RuntimeError(f"App did not report startup times:\n{completed.stderr}")
+    return float(match.group(1)), float(match.group(2)), wall_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'mode':<8}{'imports ms':>12}{'first paint ms':>16}{'process ms':>12}")
+    for mode, extra_args in (("eager", ["--eager-startup"]), ("lazy", [])):
+        # Warm the OS file cache so both modes start from the same state
+        measure(extra_args)
+        runs = [measure(extra_args) for _ in range(args.runs)]
+        imports_ms, paint_ms, wall_ms = (statistics.median(values) for values in zip(*runs))
+        print(f"{mode:<8}{imports_ms:>12.1f}{paint_ms:>16.1f}{wall_ms:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Latency-configurable local stand-ins for the OpenAI backends.
+
+StubClient mimics the parts of `openai.OpenAI` used by gen_ai_apis, so
+benchmarks and load tests can exercise the real code paths without network
+access and with predictable, tunable response times.
+"""
+
+import json
+import random
+import time
+from types import SimpleNamespace
+
+DEFAULT_LATENCIES = {
+    "stt": 0.35,
+    "chat": 0.80,
+    "tts": 0.45,
+}
+
+STUB_REPLY = "That sounds great! Could you tell me a little more about it?"
+STUB_FEEDBACK = {
+    "grammar_mistakes": {"I goes there yesterday": "I went there yesterday"},
+    "better_vocabulary": {"very big": "enormous"},
+    "better_phrases": {"I want to talk to you": "I would like to speak with you"},
+}
+STUB_QUIZ = (
+    "Q: Fix this sentence: \"I goes there yesterday.\"\n"
+    "A: I went there yesterday.\n"
+    "Q: Which sounds better? \"very big\" or \"enormous\"?\n"
+    "A: Enormous."
+)
+
+
+class StubClient:
+    """
+    Drop-in replacement for `openai.OpenAI` with simulated latencies.
+
+    Args:
+        latencies (dict): Seconds to sleep per call, keyed by "stt", "chat" and "tts".
+        jitter (float): Maximum random fraction added to or removed from each latency.
+        seed (int): Seed for the jitter, so runs are repeatable.
+    """
+
+    def __init__(self, latencies=None, jitter=0.0, seed=0):
+        self.latencies = dict(DEFAULT_LATENCIES, **(latencies or {}))
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self.chat = SimpleNamespace(
+            completions=SimpleNamespace(create=self._chat_create)
+        )
+        self.audio = SimpleNamespace(
+            transcriptions=SimpleNamespace(create=self._transcribe),
+            speech=SimpleNamespace(create=self._speech),
+        )
+
+    def _sleep(self, stage):
+        latency = self.latencies[stage]
+        if self.jitter:
+            latency *= 1 + self._random.uniform(-self.jitter, self.jitter)
+        time.sleep(max(0.0, latency))
+
+    def _chat_create(self, model=None, messages=None, **kwargs):
+        self._sleep("chat")
+        prompt = messages[-1]["content"] if messages else ""
+        if "JSON" in prompt:
+            content = json.dumps(STUB_FEEDBACK)
+        elif "Q:" in prompt:
+            content = STUB_QUIZ
+        else:
+            content = STUB_REPLY
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+        )
+
+    def _transcribe(self, model=None, file=None, **kwargs):
+        self._sleep("stt")
+        return SimpleNamespace(text="I went to the market yesterday.")
+
+    def _speech(self, model=None, voice=None, input="", response_format="mp3", **kwargs):
+        self._sleep("tts")
+        # Roughly one second of 24 kHz 16-bit silence per 15 characters
+        return SimpleNamespace(content=bytes(48000 * max(1, len(input) // 15)))
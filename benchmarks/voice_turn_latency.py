@@ -0,0 +1,236 @@
+"""
+End-to-end voice-turn latency benchmark for the Kili English Learning App.
+
+Measures the time from "user stops talking" to "first audio out" across the
+same steps the app runs for a spoken turn: RecorderThread capture,
+save_to_mp3 (or streaming transcription), speech_to_text,
+conversation_builder, text_to_speech and play_audio.
+
+The microphone is replaced by WAV fixtures fed through
+RecorderThread.callback, and the OpenAI backends by the latency-configurable
+StubClient, so the benchmark runs headless and repeatably.
+
+Usage:
+    python benchmarks/voice_turn_latency.py --iterations 20
+    python benchmarks/voice_turn_latency.py --fixtures path/to/wavs --streaming --realtime
+    python benchmarks/voice_turn_latency.py --output bench_output.txt
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+from scipy.io.wavfile import read, write
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from PyQt5.QtCore import Qt  # noqa: E402
+
+import gen_ai_apis  # noqa: E402
+import kili_english_app  # noqa: E402
+import audio_stream  # noqa: E402
+from stub_backends import StubClient  # noqa: E402
+
+BLOCK_FRAMES = 1024
+
+
+class StubPlaybackEngine:
+    """
+    Stands in for AudioPlaybackEngine; "first audio out" is the handoff to
+    the engine plus a simulated output-device start latency.
+    """
+
+    def __init__(self, start_latency):
+        self.start_latency = start_latency
+
+    def enqueue(self, data, audio_format="mp3"):
+        time.sleep(self.start_latency)
+
+
+def synthesize_fixture(path, samplerate=44100):
+    """
+    Writes a speech-like fixture: three voiced bursts separated by pauses.
+    """
+    t = np.arange(int(1.6 * samplerate)) / samplerate
+    burst = 0.3 * np.sin(2 * np.pi * 180 * t) * (1 + 0.5 * np.sin(2 * np.pi * 3 * t))
+    pause = np.zeros(int(0.8 * samplerate))
+    signal = np.concatenate([pause, burst, pause, burst, pause, burst, pause[:4410]])
+    write(path, samplerate, (signal * 32767).astype(np.int16))
+
+
+def load_fixture(path):
+    """
+    Loads a WAV fixture as mono float32 samples shaped like microphone blocks.
+    """
+    samplerate, data = read(path)
+    if data.dtype.kind == "i":
+        data = data.astype(np.float32) / np.iinfo(data.dtype).max
+    data = data.astype(np.float32)
+    if data.ndim > 1:
+        data = data.mean(axis=1)
+    return samplerate, data.reshape(-1, 1)
+
+
+def feed_recorder(recorder, audio, realtime):
+    """
+    Pushes fixture audio through the recorder callback as the mic would.
+    """
+    recorder.running = True
+    block_seconds = BLOCK_FRAMES / recorder.samplerate
+    for start in range(0, len(audio), BLOCK_FRAMES):
+        block = audio[start:start + BLOCK_FRAMES]
+        recorder.callback(block, len(block), None, None)
+        if realtime:
+            time.sleep(block_seconds)
+    recorder.stop()
+
+
+async def run_turn(fixture, streaming, realtime, playback):
+    """
+    Runs one spoken turn and returns the latency of each stage in seconds.
+    """
+    samplerate, audio = fixture
+    recorder = kili_english_app.RecorderThread(samplerate, streaming=streaming)
+    transcriber = None
+    if streaming:
+        transcriber = audio_stream.ChunkedTranscriber(
+            gen_ai_apis.speech_to_text, samplerate, asyncio.get_running_loop()
+        )
+        recorder.segment_ready.connect(transcriber.submit, Qt.DirectConnection)
+
+    await asyncio.to_thread(feed_recorder, recorder, audio, realtime)
+
+    stages = {}
+    turn_start = stage_start = time.perf_counter()
+
+    def lap(name):
+        nonlocal stage_start
+        now = time.perf_counter()
+        stages[name] = now - stage_start
+        stage_start = now
+
+    if transcriber:
+        transcriber.submit(recorder.flush_segment())
+        user_text = await transcriber.result()
+        lap("speech_to_text")
+    else:
+        await asyncio.to_thread(recorder.save_to_mp3)
+        lap("save_to_mp3")
+        user_text = await asyncio.to_thread(gen_ai_apis.speech_to_text)
+        lap("speech_to_text")
+
+    reply = await asyncio.to_thread(gen_ai_apis.conversation_builder, user_text)
+    lap("conversation_builder")
+    audio_out = await asyncio.to_thread(
+        gen_ai_apis.text_to_speech, reply, kili_english_app.tts_format
+    )
+    lap("text_to_speech")
+    playback.enqueue(audio_out, kili_english_app.tts_format)
+    lap("play_audio")
+
+    stages["total"] = time.perf_counter() - turn_start
+    return stages
+
+
+def summarize(runs):
+    """
+    Aggregates per-iteration stage timings into mean/p50/p95 in milliseconds.
+    """
+    summary = {}
+    for stage in runs[0]:
+        values = sorted(run[stage] * 1000 for run in runs)
+        p95_index = min(len(values) - 1, int(round(0.95 * (len(values) - 1))))
+        summary[stage] = {
+            "mean_ms": round(statistics.fmean(values), 2),
+            "p50_ms": round(statistics.median(values), 2),
+            "p95_ms": round(values[p95_index], 2),
+        }
+    return summary
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--fixtures", help="Directory of recorded WAV fixtures.")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--streaming", action="store_true", help="Use streaming STT.")
+    parser.add_argument(
+        "--realtime", action="store_true",
+        help="Feed fixtures at real-time speed (needed for streaming STT to overlap).",
+    )
+    parser.add_argument("--stt-latency", type=float, default=0.35)
+    parser.add_argument("--chat-latency", type=float, default=0.80)
+    parser.add_argument("--tts-latency", type=float, default=0.45)
+    parser.add_argument("--playback-latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--output", help="Append the JSON result line to this file.")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="kili_bench_")
+    if args.fixtures:
+        paths = sorted(glob.glob(os.path.join(args.fixtures, "*.wav")))
+    else:
+        paths = [os.path.join(workdir, "synthetic.wav")]
+        synthesize_fixture(paths[0])
+    if not paths:
+        parser.error(f"No WAV fixtures found in {args.fixtures}")
+    fixtures = [load_fixture(path) for path in paths]
+
+    kili_english_app.user_audio = os.path.join(workdir, "user_audio.mp3")
+    gen_ai_apis.set_config({
+        "user_audio": kili_english_app.user_audio,
+        "system_audio": os.path.join(workdir, "system_audio.mp3"),
+        "conversation_txt": os.path.join(workdir, "conversation.txt"),
+    })
+    gen_ai_apis.client = StubClient(
+        {"stt": args.stt_latency, "chat": args.chat_latency, "tts": args.tts_latency},
+        jitter=args.jitter,
+    )
+    playback = StubPlaybackEngine(args.playback_latency)
+
+    runs = []
+    for i in range(args.iterations):
+        fixture = fixtures[i % len(fixtures)]
+        runs.append(asyncio.run(run_turn(fixture, args.streaming, args.realtime, playback)))
+        gen_ai_apis.delete_chat_history()
+
+    summary = summarize(runs)
+    print(f"{'stage':<22}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for stage, stats in summary.items():
+        print(f"{stage:<22}{stats['mean_ms']:>10}{stats['p50_ms']:>10}{stats['p95_ms']:>10}")
+
+    if args.output:
+        result = {
+            "benchmark": "voice_turn_latency",
+            "commit": current_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "iterations": args.iterations,
+            "streaming": args.streaming,
+            "realtime": args.realtime,
+            "fixtures": [os.path.basename(path) for path in paths],
+            "stages": summary,
+        }
+        with open(args.output, "a") as outfile:
+            outfile.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
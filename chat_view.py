@@ -0,0 +1,187 @@
+"""
+Virtualized chat transcript view for the Kili English Learning App.
+
+A QListView over a turn model replaces the single append-only QTextEdit.
+Each turn caches its own text layout, only a capped window of recent turns
+is kept rendered, and older turns are paged back in when the user scrolls
+to the top, so appending stays constant-time however long the session is.
+"""
+
+import html
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSize
+from PyQt5.QtGui import QTextDocument
+from PyQt5.QtWidgets import QAbstractItemView, QListView, QStyledItemDelegate
+
+MAX_RENDERED_TURNS = 200
+TRIM_BATCH = 50
+LOAD_OLDER_BATCH = 50
+TURN_PADDING = 6
+
+SENDER_ICONS = {"System": "🤖", "You": "👩🏽"}
+
+
+class ChatTurn:
+    """
+    One chat message plus its cached layout for the last width it was laid out at.
+    """
+    __slots__ = ("sender", "text", "html", "doc", "doc_width")
+
+    def __init__(self, sender, text, rich_text=None):
+        self.sender = sender
+        self.text = text
+        icon = SENDER_ICONS.get(sender, sender)
+        body = rich_text if rich_text is not None else html.escape(text)
+        self.html = f"{icon}: {body}"
+        self.doc = None
+        self.doc_width = None
+
+    def release_layout(self):
+        self.doc = None
+        self.doc_width = None
+
+
+class ChatTurnModel(QAbstractListModel):
+    """
+    List model holding the rendered window of turns, with older turns
+    parked in a plain archive list until they are scrolled back into view.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._turns = []
+        self._archive = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._turns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        turn = self._turns[index.row()]
+        if role == Qt.DisplayRole:
+            return turn.text
+        if role == Qt.UserRole:
+            return turn
+        return None
+
+    def append_turn(self, turn):
+        row = len(self._turns)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._turns.append(turn)
+        self.endInsertRows()
+
+    def trim(self):
+        """
+        Park the oldest turns once the rendered window exceeds its cap.
+        Trimming a whole batch at a time keeps the amortized cost per append constant.
+        """
+        if len(self._turns) <= MAX_RENDERED_TURNS + TRIM_BATCH:
+            return
+        excess = len(self._turns) - MAX_RENDERED_TURNS
+        self.beginRemoveRows(QModelIndex(), 0, excess - 1)
+        for turn in self._turns[:excess]:
+            turn.release_layout()
+            self._archive.append(turn)
+        del self._turns[:excess]
+        self.endRemoveRows()
+
+    def has_older(self):
+        return bool(self._archive)
+
+    def load_older(self, batch=LOAD_OLDER_BATCH):
+        """
+        Bring the most recent archived turns back into the rendered window.
+
+        Returns:
+            int: Number of turns loaded.
+        """
+        loaded = self._archive[-batch:]
+        if not loaded:
+            return 0
+        del self._archive[-batch:]
+        self.beginInsertRows(QModelIndex(), 0, len(loaded) - 1)
+        self._turns[:0] = loaded
+        self.endInsertRows()
+        return len(loaded)
+
+    def clear(self):
+        self.beginResetModel()
+        self._turns = []
+        self._archive = []
+        self.endResetModel()
+
+
+class ChatTurnDelegate(QStyledItemDelegate):
+    """
+    Paints turns from their cached QTextDocument, laying a turn out again
+    only when the view width changes.
+    """
+
+    def _layout(self, turn):
+        width = max(1, self.parent().viewport().width() - 2 * TURN_PADDING)
+        if turn.doc is None or turn.doc_width != width:
+            doc = QTextDocument()
+            doc.setHtml(turn.html)
+            doc.setTextWidth(width)
+            turn.doc = doc
+            turn.doc_width = width
+        return turn.doc
+
+    def sizeHint(self, option, index):
+        turn = index.data(Qt.UserRole)
+        doc = self._layout(turn)
+        return QSize(int(doc.idealWidth()), int(doc.size().height()) + 2 * TURN_PADDING)
+
+    def paint(self, painter, option, index):
+        turn = index.data(Qt.UserRole)
+        doc = self._layout(turn)
+        painter.save()
+        painter.translate(option.rect.left() + TURN_PADDING, option.rect.top() + TURN_PADDING)
+        doc.drawContents(painter)
+        painter.restore()
+
+
+class ChatView(QListView):
+    """
+    Chat transcript widget; a drop-in for the read-only QTextEdit it replaces.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.turn_model = ChatTurnModel(self)
+        self.setModel(self.turn_model)
+        self.setItemDelegate(ChatTurnDelegate(self))
+        self.setUniformItemSizes(False)
+        self.setWordWrap(True)
+        self.setResizeMode(QListView.Adjust)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(LOAD_OLDER_BATCH)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.verticalScrollBar().valueChanged.connect(self._on_scroll)
+
+    def append_message(self, sender, text, rich_text=None):
+        """
+        Append a message, keeping the view pinned to the bottom if it was there.
+
+        Args:
+            sender (str): "You" or "System".
+            text (str): Plain message text.
+            rich_text (str, optional): Pre-rendered HTML body to show instead of `text`.
+        """
+        scrollbar = self.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum()
+        self.turn_model.append_turn(ChatTurn(sender, text, rich_text))
+        if at_bottom:
+            # Only trim while following the conversation, never under the reader
+            self.turn_model.trim()
+            self.scrollToBottom()
+
+    def clear(self):
+        self.turn_model.clear()
+
+    def _on_scroll(self, value):
+        if value == self.verticalScrollBar().minimum() and self.turn_model.has_older():
+            loaded = self.turn_model.load_older()
+            self.scrollTo(self.turn_model.index(loaded), QAbstractItemView.PositionAtTop)
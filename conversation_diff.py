@@ -0,0 +1,184 @@
+"""
+Word-level conversation diff for the English Enhancer tab.
+
+Pairs each "You:" turn of the original conversation with its rewrite,
+computes a minimal word-level edit script per pair with Myers' O(n·d)
+algorithm, and renders both sides as HTML with the changes highlighted.
+Results are cached per conversation hash, so showing the same diff again
+is free.
+"""
+
+import hashlib
+import html
+import re
+import threading
+from collections import OrderedDict
+
+from transcript import SPEAKER_ICONS, Transcript
+
+TOKEN_PATTERN = re.compile(r"\s+|\w+(?:['’]\w+)*|[^\w\s]")
+
+CACHE_SIZE = 32
+_cache = OrderedDict()
+# Diffs are computed on worker threads, possibly several at once
+_cache_lock = threading.Lock()
+
+
+class TurnDiff:
+    """
+    The edit script between one original turn and its rewrite.
+    """
+    __slots__ = ("speaker", "ops", "changed")
+
+    def __init__(self, speaker, ops):
+        self.speaker = speaker
+        self.ops = ops
+        self.changed = any(tag != "equal" for tag, _ in ops)
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text)
+
+
+def myers_diff(a, b):
+    """
+    Computes a minimal edit script turning sequence `a` into `b`.
+
+    Runs in O((n + m) · d) time, where d is the number of edits, so
+    lightly edited turns diff in near-linear time.
+
+    Returns:
+        list: (tag, item) pairs with tag "equal", "delete" or "insert".
+    """
+    n, m = len(a), len(b)
+    max_d = n + m
+    v = {1: 0}
+    trace = []
+    for d in range(max_d + 1):
+        trace.append(dict(v))
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[k - 1] < v[k + 1]):
+                x = v[k + 1]  # Step down: insertion
+            else:
+                x = v[k - 1] + 1  # Step right: deletion
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[k] = x
+            if x >= n and y >= m:
+                return _backtrack(a, b, trace, d)
+    return []
+
+
+def _backtrack(a, b, trace, final_d):
+    x, y = len(a), len(b)
+    ops = []
+    for d in range(final_d, 0, -1):
+        v = trace[d]
+        k = x - y
+        if k == -d or (k != d and v[k - 1] < v[k + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = v[prev_k]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            ops.append(("equal", a[x]))
+        if x == prev_x:
+            y -= 1
+            ops.append(("insert", b[y]))
+        else:
+            x -= 1
+            ops.append(("delete", a[x]))
+    while x > 0 and y > 0:
+        x -= 1
+        y -= 1
+        ops.append(("equal", a[x]))
+    ops.reverse()
+    return ops
+
+
+def diff_conversations(original, improved):
+    """
+    Pairs the "You:" turns of both transcripts in order and diffs each pair.
+    Other turns are kept from the original unchanged.
+
+    Args:
+        original (Transcript): The learner's conversation.
+        improved (Transcript): The rewritten conversation.
+
+    Returns:
+        list: TurnDiff objects in conversation order.
+    """
+    rewrites = [turn.text for turn in improved.user_turns()]
+    rewrites.reverse()
+    diffs = []
+    for turn in original:
+        if turn.speaker == "You" and rewrites:
+            ops = myers_diff(tokenize(turn.text), tokenize(rewrites.pop()))
+        else:
+            ops = [("equal", token) for token in tokenize(turn.text)]
+        diffs.append(TurnDiff(turn.speaker, ops))
+    return diffs
+
+
+def _render_side(diffs, hidden_tag, highlight_tag, style):
+    lines = []
+    for diff in diffs:
+        spans = []
+        for tag, token in diff.ops:
+            if tag == hidden_tag:
+                continue
+            escaped = html.escape(token)
+            spans.append(f'<span style="{style}">{escaped}</span>' if tag == highlight_tag else escaped)
+        icon = SPEAKER_ICONS.get(diff.speaker, diff.speaker)
+        lines.append(f"{icon}: {''.join(spans)}")
+    return "<br><br>".join(lines)
+
+
+def render_diff_html(original, improved):
+    """
+    Diffs two conversations and renders both sides as highlighted HTML.
+    Cached per pair of conversation hashes.
+
+    Args:
+        original (Transcript or str): The learner's conversation.
+        improved (Transcript or str): The rewritten conversation.
+
+    Returns:
+        tuple: (original_html, improved_html, changed_turns, user_turns)
+    """
+    if isinstance(original, str):
+        original = Transcript.parse(original)
+    if isinstance(improved, str):
+        improved = Transcript.parse(improved)
+    key = (
+        hashlib.sha1(original.text().encode("utf-8")).hexdigest(),
+        hashlib.sha1(improved.text().encode("utf-8")).hexdigest(),
+    )
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    diffs = diff_conversations(original, improved)
+    original_html = _render_side(
+        diffs, "insert", "delete", "background-color: #fee2e2; text-decoration: line-through;"
+    )
+    improved_html = _render_side(diffs, "delete", "insert", "background-color: #dcfce7;")
+    user_turns = [diff for diff in diffs if diff.speaker == "You"]
+    result = (
+        original_html,
+        improved_html,
+        sum(diff.changed for diff in user_turns),
+        len(user_turns),
+    )
+
+    with _cache_lock:
+        _cache[key] = result
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
@@ -2,14 +2,25 @@
 Database manager for English learning app.
 Handles storage and retrieval of grammar mistakes, better phrases, vocabulary, new words, and new phrases.
 Supports spaced repetition via recall counts.
+Mastered items are moved to archive tables (searchable and restorable), so
+the active tables only hold what the learner is still studying.
+Keeps progress statistics in aggregate tables maintained by triggers, so
+reading them never scans the learning tables.
 """
 
+import argparse
 import sqlite3
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import random
 
+import learning_items
+from learning_items import LearningItem
+
 RECALL_COUNT = 3
+STATS_DAYS = 14
+# Free pages returned to the file system per maintenance run
+MAINTENANCE_VACUUM_PAGES = 2000
 
 
 class DBManager:
@@ -20,10 +31,24 @@ class DBManager:
         "NewWords": "word TEXT UNIQUE",
         "NewPhrases": "phrase TEXT UNIQUE",
     }
+    # (key, value) columns searched in the archive; the key is also what makes an item unique
+    SEARCH_COLUMNS = {
+        "GrammarMistakes": ("mistake", "correction"),
+        "BetterPhrases": ("original", "better"),
+        "BetterVocabulary": ("word", "better_word"),
+        "NewWords": ("word", None),
+        "NewPhrases": ("phrase", None),
+    }
 
-    def __init__(self, db_path="english_learning.db"):
-        self.conn = sqlite3.connect(db_path)
+    def __init__(self, db_path="english_learning.db", check_same_thread=True):
+        # The server's shard pool passes False and serializes access to each manager itself
+        self.conn = sqlite3.connect(db_path, check_same_thread=check_same_thread)
+        # Only takes effect for a new database; existing ones are converted by --maintenance
+        self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self.insert_listeners = []
+        self.learning_matrix = None
         self._create_tables()
+        self._create_stats_tables()
 
     def _create_tables(self):
         for table, fields in self.TABLE_SCHEMAS.items():
@@ -37,8 +62,213 @@ class DBManager:
             );
             """
             self.conn.execute(query)
+            # Mastered entries, keeping their id
+            self.conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {table}Archive (
+                    id INTEGER PRIMARY KEY,
+                    {fields},
+                    learned_date TEXT,
+                    recalled_count INTEGER DEFAULT 0,
+                    note TEXT,
+                    archived_at TEXT
+                );
+                """
+            )
         self.conn.commit()
 
+    def _columns(self, table: str) -> str:
+        fields = [field.split()[0] for field in self.TABLE_SCHEMAS[table].split(", ")]
+        return ", ".join(["id"] + fields + ["learned_date", "recalled_count", "note"])
+
+    def _create_stats_tables(self):
+        """
+        Creates the aggregate tables and the triggers that keep them current.
+        A database created before the statistics existed is backfilled once.
+        """
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'StatsTotals'"
+        ).fetchone()
+        # Triggers from before the archive count archiving as deleting
+        outdated = exists and not self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' "
+            "AND name = 'GrammarMistakes_stats_delete' AND sql LIKE '%Archive%'"
+        ).fetchone()
+        with self.conn:
+            # Items learned and recall attempts per day and category
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS StatsDaily (
+                    day TEXT,
+                    category TEXT,
+                    learned INTEGER DEFAULT 0,
+                    recalled INTEGER DEFAULT 0,
+                    PRIMARY KEY (day, category)
+                ) WITHOUT ROWID;
+                """
+            )
+            # Current size, backlog and progress per category
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS StatsTotals (
+                    category TEXT PRIMARY KEY,
+                    total INTEGER DEFAULT 0,
+                    due INTEGER DEFAULT 0,
+                    attempted INTEGER DEFAULT 0,
+                    mastered INTEGER DEFAULT 0,
+                    recall_attempts INTEGER DEFAULT 0
+                );
+                """
+            )
+            self._create_stats_triggers()
+        if not exists or outdated:
+            self.rebuild_stats()
+
+    def _create_stats_triggers(self):
+        # Moving an entry to or from its archive is neither learning nor forgetting it,
+        # so the insert and delete triggers skip ids that are in the archive
+        for table in self.TABLE_SCHEMAS:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO StatsTotals (category) VALUES (?)", (table,)
+            )
+            self.conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_stats_insert AFTER INSERT ON {table}
+                WHEN NOT EXISTS (SELECT 1 FROM {table}Archive WHERE id = NEW.id)
+                BEGIN
+                    INSERT INTO StatsDaily (day, category, learned)
+                    VALUES (NEW.learned_date, '{table}', 1)
+                    ON CONFLICT (day, category) DO UPDATE SET learned = learned + 1;
+                    UPDATE StatsTotals SET
+                        total = total + 1,
+                        due = due + (NEW.recalled_count < {RECALL_COUNT}),
+                        attempted = attempted + (NEW.recalled_count > 0),
+                        mastered = mastered + (NEW.recalled_count >= {RECALL_COUNT}),
+                        recall_attempts = recall_attempts + NEW.recalled_count
+                    WHERE category = '{table}';
+                END;
+                """
+            )
+            self.conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_stats_delete AFTER DELETE ON {table}
+                WHEN NOT EXISTS (SELECT 1 FROM {table}Archive WHERE id = OLD.id)
+                BEGIN
+                    UPDATE StatsDaily SET learned = learned - 1
+                    WHERE day = OLD.learned_date AND category = '{table}';
+                    UPDATE StatsTotals SET
+                        total = total - 1,
+                        due = due - (OLD.recalled_count < {RECALL_COUNT}),
+                        attempted = attempted - (OLD.recalled_count > 0),
+                        mastered = mastered - (OLD.recalled_count >= {RECALL_COUNT})
+                    WHERE category = '{table}';
+                END;
+                """
+            )
+            # Recall attempts are counted on the day they happen; resets only move the backlog
+            self.conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_stats_recall
+                AFTER UPDATE OF recalled_count ON {table}
+                WHEN NEW.recalled_count != OLD.recalled_count
+                BEGIN
+                    INSERT INTO StatsDaily (day, category, recalled)
+                    VALUES (
+                        date('now', 'localtime'), '{table}',
+                        MAX(NEW.recalled_count - OLD.recalled_count, 0)
+                    )
+                    ON CONFLICT (day, category) DO UPDATE SET recalled = recalled + excluded.recalled;
+                    UPDATE StatsTotals SET
+                        due = due + (NEW.recalled_count < {RECALL_COUNT}) - (OLD.recalled_count < {RECALL_COUNT}),
+                        attempted = attempted + (NEW.recalled_count > 0) - (OLD.recalled_count > 0),
+                        mastered = mastered + (NEW.recalled_count >= {RECALL_COUNT}) - (OLD.recalled_count >= {RECALL_COUNT}),
+                        recall_attempts = recall_attempts + MAX(NEW.recalled_count - OLD.recalled_count, 0)
+                    WHERE category = '{table}';
+                END;
+                """
+            )
+
+    def rebuild_stats(self):
+        """
+        Recomputes the statistics tables from the learning tables and
+        recreates their triggers, e.g. for a database written by an older
+        version or after changing RECALL_COUNT.
+        """
+        with self.conn:
+            self.conn.execute("DELETE FROM StatsDaily")
+            self.conn.execute("DELETE FROM StatsTotals")
+            for table in self.TABLE_SCHEMAS:
+                for suffix in ("insert", "delete", "recall"):
+                    self.conn.execute(f"DROP TRIGGER IF EXISTS {table}_stats_{suffix}")
+            self._create_stats_triggers()
+            for table in self.TABLE_SCHEMAS:
+                # Archived entries still count as learned and mastered
+                entries = (
+                    f"(SELECT learned_date, recalled_count FROM {table} "
+                    f"UNION ALL SELECT learned_date, recalled_count FROM {table}Archive)"
+                )
+                # Past attempts are only known through the current recall counts, not per day
+                self.conn.execute(
+                    f"""
+                    INSERT INTO StatsDaily (day, category, learned)
+                    SELECT learned_date, '{table}', COUNT(*) FROM {entries}
+                    WHERE learned_date IS NOT NULL GROUP BY learned_date
+                    """
+                )
+                self.conn.execute(
+                    f"""
+                    UPDATE StatsTotals SET
+                        total = (SELECT COUNT(*) FROM {entries}),
+                        due = (SELECT COUNT(*) FROM {entries} WHERE recalled_count < {RECALL_COUNT}),
+                        attempted = (SELECT COUNT(*) FROM {entries} WHERE recalled_count > 0),
+                        mastered = (SELECT COUNT(*) FROM {entries} WHERE recalled_count >= {RECALL_COUNT}),
+                        recall_attempts = (SELECT COALESCE(SUM(recalled_count), 0) FROM {entries})
+                    WHERE category = ?
+                    """,
+                    (table,),
+                )
+
+    def get_stats_totals(self) -> List[Dict]:
+        """
+        Returns per-category totals: items, due backlog, mastered items,
+        recall attempts and success rate (share of recalled items that
+        reached RECALL_COUNT).
+        """
+        cursor = self.conn.execute(
+            "SELECT category, total, due, attempted, mastered, recall_attempts FROM StatsTotals"
+        )
+        columns = [description[0] for description in cursor.description]
+        results = []
+        for row in cursor.fetchall():
+            entry = dict(zip(columns, row))
+            entry["success_rate"] = entry["mastered"] / entry["attempted"] if entry["attempted"] else 0.0
+            results.append(entry)
+        return results
+
+    def get_daily_stats(self, days: int = STATS_DAYS) -> List[Dict]:
+        """
+        Returns learned and recalled counts per day and category for the
+        last `days` days, most recent first.
+        """
+        since = (datetime.today() - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+        cursor = self.conn.execute(
+            "SELECT day, category, learned, recalled FROM StatsDaily "
+            "WHERE day >= ? ORDER BY day DESC",
+            (since,),
+        )
+        columns = [description[0] for description in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def add_insert_listener(self, listener):
+        """
+        Registers a callback(table, entry_id, data) run after each new entry is stored.
+        """
+        self.insert_listeners.append(listener)
+
+    def _notify_insert(self, table: str, entry_id: int, data: Dict[str, str]):
+        for listener in self.insert_listeners:
+            listener(table, entry_id, data)
+
     def _add_entry(self, table: str, data: Dict[str, str], note: Optional[str] = None) -> bool:
         """
         Adds a new entry to the specified table.
@@ -48,37 +278,49 @@ class DBManager:
         values = list(data.values()) + [datetime.today().strftime("%Y-%m-%d"), note]
         try:
             with self.conn:
-                self.conn.execute(
+                # A mastered entry learned again is due again, not a new entry
+                key_col = self.SEARCH_COLUMNS[table][0]
+                if key_col in data and self._restore_keys(table, [data[key_col]]):
+                    return False
+                cursor = self.conn.execute(
                     f"INSERT INTO {table} ({keys}) VALUES ({placeholders})", values
                 )
-            return True
         except sqlite3.IntegrityError:
             return False
+        self._notify_insert(table, cursor.lastrowid, data)
+        return True
 
-    def _increment_recall_count(self, table: str, entry_id: int):
-        with self.conn:
-            self.conn.execute(
-                f"UPDATE {table} SET recalled_count = recalled_count + 1 WHERE id = ?",
-                (entry_id,),
-            )
+    def _select_items(self, table: str, clause: str = "", params=(), archive: bool = False) -> List[LearningItem]:
+        """
+        Runs a SELECT over a table (or its archive) whose rows are built
+        directly into the table's LearningItem class.
+        """
+        item_type = learning_items.ITEM_TYPES[table]
+        columns = item_type.select_columns()
+        source = table
+        if archive:
+            columns += ", archived_at"
+            source += "Archive"
+        # Set before executing: the first row is fetched by execute()
+        cursor = self.conn.cursor()
+        cursor.row_factory = item_type.row_factory
+        return cursor.execute(f"SELECT {columns} FROM {source} {clause}", params).fetchall()
 
-    def _get_random_entries(self, table: str, limit: int = 5) -> List[Dict[str, str]]:
+    def _get_random_entries(self, table: str, limit: int = 5) -> List[LearningItem]:
         """
         Retrieves random entries from a table where recalled_count < RECALL_COUNT.
         """
         with self.conn:
-            cursor = self.conn.execute(
-                f"SELECT * FROM {table} WHERE recalled_count < ? ORDER BY RANDOM() LIMIT ?",
-                (RECALL_COUNT, limit),
+            items = self._select_items(
+                table, "WHERE recalled_count < ? ORDER BY RANDOM() LIMIT ?", (RECALL_COUNT, limit)
+            )
+            self.conn.executemany(
+                f"UPDATE {table} SET recalled_count = recalled_count + 1 WHERE id = ?",
+                [(item.id,) for item in items],
             )
-            columns = [description[0] for description in cursor.description]
-            results = []
-            for row in cursor.fetchall():
-                self._increment_recall_count(table, row[0])
-                results.append(dict(zip(columns, row)))
-            return results
+            return items
 
-    def get_random_from_tables(self, tables: List[str], total_limit: int = 5) -> List[Dict]:
+    def get_random_from_tables(self, tables: List[str], total_limit: int = 5) -> List[LearningItem]:
         """
         Retrieves a combined list of random entries from multiple tables.
         It evenly distributes `total_limit` across the given tables and
@@ -89,14 +331,102 @@ class DBManager:
         results = []
         per_table_limit = max(1, total_limit // len(tables))
         for table in tables:
-            entries = self._get_random_entries(table, per_table_limit)
-            for entry in entries:
-                entry["table"] = table
-                results.append(entry)
+            results.extend(self._get_random_entries(table, per_table_limit))
         if len(results) < total_limit:
             random.shuffle(results)
         return results[:total_limit]
 
+    def get_column(self, table: str, column: str) -> List[tuple]:
+        """
+        Returns (id, value) pairs of one column, in id order.
+        """
+        return self.conn.execute(f"SELECT id, {column} FROM {table} ORDER BY id").fetchall()
+
+    def get_due_entries(self, table: str, ids: List[int]) -> List[tuple]:
+        """
+        Returns (id, recalled_count) pairs of the given entries that are due.
+        """
+        if not ids:
+            return []
+        placeholders = ", ".join("?" for _ in ids)
+        return self.conn.execute(
+            f"SELECT id, recalled_count FROM {table} "
+            f"WHERE id IN ({placeholders}) AND recalled_count < ?",
+            list(ids) + [RECALL_COUNT],
+        ).fetchall()
+
+    def record_quiz_results(self, passed: Dict[str, List[int]], failed: Dict[str, List[int]]):
+        """
+        Writes graded quiz results back in one transaction: passed entries
+        count as one more recall, failed entries are due again from the start.
+        """
+        with self.conn:
+            for table, ids in passed.items():
+                self.conn.executemany(
+                    f"UPDATE {table} SET recalled_count = recalled_count + 1 WHERE id = ?",
+                    [(entry_id,) for entry_id in ids],
+                )
+            for table, ids in failed.items():
+                self._restore(table, ids)
+                self.conn.executemany(
+                    f"UPDATE {table} SET recalled_count = 0 WHERE id = ?",
+                    [(entry_id,) for entry_id in ids],
+                )
+
+    def record_usage(self, entries: Dict[str, List[int]]):
+        """
+        Counts entries the learner used in conversation as one more recall
+        each, in a single transaction. Archived entries are left as they are.
+        """
+        with self.conn:
+            for table, ids in entries.items():
+                self.conn.executemany(
+                    f"UPDATE {table} SET recalled_count = recalled_count + 1 "
+                    "WHERE id = ? AND recalled_count < ?",
+                    [(entry_id, RECALL_COUNT) for entry_id in ids],
+                )
+
+    def get_due_sample(self, table: str, limit: int) -> List[tuple]:
+        """
+        Returns up to `limit` random (id, recalled_count) pairs of due entries.
+        """
+        return self.conn.execute(
+            f"SELECT id, recalled_count FROM {table} WHERE recalled_count < ? "
+            "ORDER BY RANDOM() LIMIT ?",
+            (RECALL_COUNT, limit),
+        ).fetchall()
+
+    def get_diverse_from_tables(self, tables: List[str], total_limit: int = 5, matrix=None) -> List[LearningItem]:
+        """
+        Like get_random_from_tables, but picks due entries that are as
+        different from each other as possible (see quiz_selection). The
+        similarity matrix is built on first use and kept current on insert,
+        unless a matrix kept by another manager (e.g. the app's, when drawing
+        on a worker thread) is passed in.
+        """
+        import quiz_selection
+
+        if matrix is None:
+            if self.learning_matrix is None:
+                self.learning_matrix = quiz_selection.LearningMatrix.from_db(self)
+            matrix = self.learning_matrix
+        picked = quiz_selection.pick_diverse_due(self, matrix, tables, total_limit, RECALL_COUNT)
+        by_table = {}
+        for table, entry_id in picked:
+            by_table.setdefault(table, []).append(entry_id)
+
+        entries = {}
+        with self.conn:
+            for table, ids in by_table.items():
+                placeholders = ", ".join("?" for _ in ids)
+                for item in self._select_items(table, f"WHERE id IN ({placeholders})", ids):
+                    entries[(table, item.id)] = item
+                self.conn.executemany(
+                    f"UPDATE {table} SET recalled_count = recalled_count + 1 WHERE id = ?",
+                    [(entry_id,) for entry_id in ids],
+                )
+        return [entries[key] for key in picked if key in entries]
+
     def add_grammar_mistake(self, mistake: str, correction: str, note: Optional[str] = None) -> bool:
         """Add a grammar mistake and its correction."""
         return self._add_entry("GrammarMistakes", {"mistake": mistake, "correction": correction}, note)
@@ -117,38 +447,261 @@ class DBManager:
         """Add a new phrase."""
         return self._add_entry("NewPhrases", {"phrase": phrase}, note)
 
-    def get_random_grammar_mistakes(self, limit: int = 5) -> List[Dict]:
+    def add_feedback(self, feedback: Dict, note: Optional[str] = None) -> int:
+        """
+        Stores every item of a feedback report in one transaction, skipping
+        items that are already known. Returns the number of new items.
+        """
+        rows = {
+            "GrammarMistakes": ("mistake", "correction", feedback.get("grammar_mistakes", {})),
+            "BetterVocabulary": ("word", "better_word", feedback.get("better_vocabulary", {})),
+            "BetterPhrases": ("original", "better", feedback.get("better_phrases", {})),
+        }
+        today = datetime.today().strftime("%Y-%m-%d")
+        inserted = []
+        with self.conn:
+            for table, (key_col, value_col, items) in rows.items():
+                # Mastered entries that show up again are restored instead of duplicated
+                self._restore_keys(table, list(items))
+                for key, value in items.items():
+                    cursor = self.conn.execute(
+                        f"INSERT OR IGNORE INTO {table} ({key_col}, {value_col}, learned_date, note) "
+                        "VALUES (?, ?, ?, ?)",
+                        (key, value, today, note),
+                    )
+                    if cursor.rowcount:
+                        inserted.append((table, cursor.lastrowid, {key_col: key, value_col: value}))
+        for table, entry_id, data in inserted:
+            self._notify_insert(table, entry_id, data)
+        return len(inserted)
+
+    def get_entries(self, table: str, include_archived: bool = False) -> List[LearningItem]:
+        """
+        Returns all entries of a table, optionally with its archived entries.
+        """
+        clause = ""
+        if include_archived:
+            columns = learning_items.ITEM_TYPES[table].select_columns()
+            clause = f"UNION ALL SELECT {columns} FROM {table}Archive"
+        return self._select_items(table, clause)
+
+    def reschedule(self, entries: Dict[str, List[int]]):
+        """
+        Makes entries due for recall again (e.g. mistakes the learner repeated),
+        in a single transaction. Archived entries are restored first.
+        """
+        with self.conn:
+            for table, ids in entries.items():
+                self._restore(table, ids)
+                self.conn.executemany(
+                    f"UPDATE {table} SET recalled_count = 0 WHERE id = ?",
+                    [(entry_id,) for entry_id in ids],
+                )
+
+    def get_random_grammar_mistakes(self, limit: int = 5) -> List[LearningItem]:
         return self._get_random_entries("GrammarMistakes", limit)
 
-    def get_random_better_phrases(self, limit: int = 5) -> List[Dict]:
+    def get_random_better_phrases(self, limit: int = 5) -> List[LearningItem]:
         return self._get_random_entries("BetterPhrases", limit)
 
-    def get_random_better_vocabulary(self, limit: int = 5) -> List[Dict]:
+    def get_random_better_vocabulary(self, limit: int = 5) -> List[LearningItem]:
         return self._get_random_entries("BetterVocabulary", limit)
 
-    def get_random_new_words(self, limit: int = 5) -> List[Dict]:
+    def get_random_new_words(self, limit: int = 5) -> List[LearningItem]:
         return self._get_random_entries("NewWords", limit)
 
-    def get_random_new_phrases(self, limit: int = 5) -> List[Dict]:
+    def get_random_new_phrases(self, limit: int = 5) -> List[LearningItem]:
         return self._get_random_entries("NewPhrases", limit)
 
     def reset_recall_counts(self, table: Optional[str] = None):
         """
-        Resets recall counts for all or a specific table.
+        Resets recall counts for all or a specific table, restoring its archive.
         """
         with self.conn:
-            if table:
-                self.conn.execute(f"UPDATE {table} SET recalled_count = 0")
-            else:
-                for t in self.TABLE_SCHEMAS:
-                    self.conn.execute(f"UPDATE {t} SET recalled_count = 0")
+            for t in [table] if table else self.TABLE_SCHEMAS:
+                self._restore(t)
+                self.conn.execute(f"UPDATE {t} SET recalled_count = 0")
+
+    def archive_mastered(self) -> int:
+        """
+        Moves mastered entries (recalled RECALL_COUNT times) into the archive
+        tables in one transaction. Returns the number of entries moved.
+        """
+        archived_at = datetime.now().isoformat(timespec="seconds")
+        moved = 0
+        with self.conn:
+            for table in self.TABLE_SCHEMAS:
+                columns = self._columns(table)
+                cursor = self.conn.execute(
+                    f"INSERT OR REPLACE INTO {table}Archive ({columns}, archived_at) "
+                    f"SELECT {columns}, ? FROM {table} WHERE recalled_count >= ?",
+                    (archived_at, RECALL_COUNT),
+                )
+                if cursor.rowcount > 0:
+                    moved += cursor.rowcount
+                    self.conn.execute(
+                        f"DELETE FROM {table} WHERE recalled_count >= ?", (RECALL_COUNT,)
+                    )
+        return moved
+
+    def _restore(self, table: str, ids: Optional[List[int]] = None) -> int:
+        """
+        Moves archived entries (all of them if `ids` is None) back into the
+        active table, due from the start. Runs inside the caller's transaction;
+        the insert listeners are told about each restored entry.
+        """
+        where, params = "", []
+        if ids is not None:
+            if not ids:
+                return 0
+            where = f"WHERE id IN ({', '.join('?' for _ in ids)})"
+            params = list(ids)
+        columns = self._columns(table)
+        # Inserted while still archived, so the stats triggers see a move, not a new entry
+        cursor = self.conn.execute(
+            f"INSERT OR IGNORE INTO {table} ({columns}) SELECT {columns} FROM {table}Archive {where}",
+            params,
+        )
+        restored = []
+        if cursor.rowcount > 0:
+            self.conn.execute(
+                f"UPDATE {table} SET recalled_count = 0 WHERE id IN (SELECT id FROM {table}Archive {where})",
+                params,
+            )
+            # Ids are never reused, so archived ids now in the table are exactly the restored rows
+            key_cols = [col for col in self.SEARCH_COLUMNS[table] if col]
+            restored = self.conn.execute(
+                f"SELECT id, {', '.join(key_cols)} FROM {table} "
+                f"WHERE id IN (SELECT id FROM {table}Archive {where})",
+                params,
+            ).fetchall()
+        self.conn.execute(f"DELETE FROM {table}Archive {where}", params)
+        for entry_id, *values in restored:
+            self._notify_insert(table, entry_id, dict(zip(key_cols, values)))
+        return len(restored)
+
+    def _restore_keys(self, table: str, keys: List[str]) -> int:
+        """
+        Restores the archived entries with the given keys (e.g. mistakes stored again).
+        """
+        if not keys:
+            return 0
+        key_col = self.SEARCH_COLUMNS[table][0]
+        ids = [
+            row[0]
+            for row in self.conn.execute(
+                f"SELECT id FROM {table}Archive WHERE {key_col} IN ({', '.join('?' for _ in keys)})",
+                list(keys),
+            )
+        ]
+        return self._restore(table, ids)
+
+    def restore_archived(self, entries: Dict[str, List[int]]) -> int:
+        """
+        Moves archived entries back into the active tables so they are quizzed again.
+        Returns the number of entries restored.
+        """
+        with self.conn:
+            return sum(self._restore(table, ids) for table, ids in entries.items())
+
+    def search_archive(self, text: str = "", limit: int = 50) -> List[LearningItem]:
+        """
+        Finds archived entries whose key or value contains `text` (case-insensitive),
+        most recently archived first.
+        """
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        results = []
+        for table, (key_col, value_col) in self.SEARCH_COLUMNS.items():
+            condition = f"{key_col} LIKE ? ESCAPE '\\'"
+            params = [pattern]
+            if value_col:
+                condition += f" OR {value_col} LIKE ? ESCAPE '\\'"
+                params.append(pattern)
+            results.extend(self._select_items(
+                table, f"WHERE {condition} ORDER BY archived_at DESC LIMIT ?", params + [limit], archive=True
+            ))
+        results.sort(key=lambda item: item.archived_at or "", reverse=True)
+        return results[:limit]
+
+    def run_maintenance(self, full_vacuum: bool = False) -> Dict:
+        """
+        Idle-time housekeeping: archives mastered entries, refreshes the query
+        planner statistics, returns free pages to the file system and checks
+        tables and indexes for corruption.
+
+        Args:
+            full_vacuum (bool): Rewrite a database created without incremental
+                vacuum so it can use it. Takes as long as copying the whole file,
+                so it is left to an explicit run (--maintenance).
+
+        Returns:
+            dict: Entries archived, pages freed, any integrity problems found,
+                and whether the database still needs its one-time full vacuum.
+        """
+        archived = self.archive_mastered()
+        # Bounded sampling keeps ANALYZE fast on large tables
+        self.conn.execute("PRAGMA analysis_limit = 1000")
+        self.conn.execute("ANALYZE")
+        self.conn.commit()
+        needs_vacuum = self.conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2
+        if needs_vacuum and full_vacuum:
+            # An existing database needs one full VACUUM to switch to incremental mode
+            self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            self.conn.execute("VACUUM")
+            needs_vacuum = False
+        free_pages = self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+        self.conn.execute(f"PRAGMA incremental_vacuum({MAINTENANCE_VACUUM_PAGES})").fetchall()
+        freed = free_pages - self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+        problems = [row[0] for row in self.conn.execute("PRAGMA quick_check(10)") if row[0] != "ok"]
+        return {"archived": archived, "freed_pages": freed, "problems": problems, "needs_vacuum": needs_vacuum}
 
     def close(self):
         self.conn.close()
 
 
+def run_maintenance(db_path: str, full_vacuum: bool = False) -> Dict:
+    """
+    Runs DBManager.run_maintenance on its own connection, so it can be
+    called from a worker thread while the app keeps using its connection.
+    """
+    db = DBManager(db_path)
+    try:
+        return db.run_maintenance(full_vacuum)
+    finally:
+        db.close()
+
+
 if __name__ == "__main__":
-    db = DBManager()
+    parser = argparse.ArgumentParser(description="English learnings database.")
+    parser.add_argument("--db", default="english_learning.db")
+    parser.add_argument(
+        "--rebuild-stats", action="store_true",
+        help="Recompute the progress statistics of an existing database and exit.",
+    )
+    parser.add_argument(
+        "--maintenance", action="store_true",
+        help="Archive mastered entries, analyze, vacuum (fully, if the database needs it) "
+        "and check the database, then exit.",
+    )
+    args = parser.parse_args()
+
+    if args.maintenance:
+        result = run_maintenance(args.db, full_vacuum=True)
+        print(
+            f"Archived {result['archived']} mastered entries, freed {result['freed_pages']} pages, "
+            f"integrity: {', '.join(result['problems']) or 'ok'}"
+        )
+        raise SystemExit
+
+    if args.rebuild_stats:
+        db = DBManager(args.db)
+        db.rebuild_stats()
+        for totals in db.get_stats_totals():
+            print(f"[{totals['category']}] {totals['total']} items, {totals['due']} due")
+        db.close()
+        raise SystemExit
+
+    db = DBManager(args.db)
     db.add_grammar_mistake("He don't like it", "He doesn't like it", "Common mistake")
     db.add_better_phrase("I'm going to sleep now", "I'm heading to bed", "Natural phrasing")
     db.add_better_vocabulary("very big", "enormous", "Advanced vocab")
@@ -160,5 +713,5 @@ if __name__ == "__main__":
         ["GrammarMistakes", "BetterPhrases", "NewWords"], total_limit=3
     )
     for item in mixed:
-        print(f"[{item['table']}] {item}\n")
+        print(f"[{item.table}] {item.label()}\n")
     db.close()
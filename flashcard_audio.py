@@ -0,0 +1,124 @@
+"""
+Spoken flashcards for the Kili English Learning App.
+
+Synthesizes the question and answer of upcoming quiz cards in the
+background while the learner is still on the current one, so moving to the
+next card plays audio that is already in memory instead of waiting on a TTS
+round trip. Prefetching runs at background priority on a small dedicated
+thread pool, which bounds how many requests are in flight; work for a deck
+that was replaced is cancelled (if not started yet) or discarded (if it
+was). Audio the learner is already waiting for is synthesized at
+interactive priority outside that pool.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from request_scheduler import INTERACTIVE, BACKGROUND
+
+# Cards ahead of the current one whose audio is prepared
+PREFETCH_CARDS = 3
+# TTS requests in flight at once
+MAX_CONCURRENT = 2
+SIDES = ("question", "answer")
+
+
+class FlashcardAudio:
+    """
+    Prefetching cache of synthesized flashcard audio, keyed by (card, side).
+    """
+
+    def __init__(self, synthesize, window=PREFETCH_CARDS, max_concurrent=MAX_CONCURRENT):
+        """
+        Args:
+            synthesize (callable): Blocking (text, priority) -> audio bytes
+                function; priority is a request_scheduler class.
+            window (int): Cards ahead of the current one to prefetch.
+            max_concurrent (int): Synthesis requests run at once.
+        """
+        self.synthesize = synthesize
+        self.window = window
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="flashcard-tts")
+        self.deck = []
+        self.clips = {}
+        self.urgent = set()  # Keys of clips synthesized at interactive priority
+        self.hits = 0
+        self.misses = 0
+
+    def set_deck(self, qa_pairs):
+        """
+        Switches to a new deck (a sequence of question/answer dicts), dropping
+        the audio prepared for the old one.
+        """
+        if qa_pairs is self.deck:
+            return
+        self.discard()
+        self.deck = qa_pairs
+        self.hits = self.misses = 0
+
+    def discard(self):
+        """
+        Cancels pending synthesis and forgets all prepared audio.
+        """
+        for clip in self.clips.values():
+            clip.cancel()
+        self.clips = {}
+        self.urgent = set()
+        self.deck = []
+
+    def prefetch(self, index):
+        """
+        Schedules the cards from `index` to `index + window` and forgets the
+        audio of cards the learner has moved past.
+        """
+        for key in [key for key in self.clips if not index - 1 <= key[0] <= index + self.window]:
+            self.clips.pop(key).cancel()
+            self.urgent.discard(key)
+        for card in range(index, min(index + self.window + 1, len(self.deck))):
+            for side in SIDES:
+                self._schedule(card, side)
+
+    def clip(self, card, side):
+        """
+        Returns the future of a card's audio. Check `done()` to see whether it
+        can be played without waiting; hits and misses count how often it
+        could. Audio that is not ready is synthesized at interactive priority,
+        replacing a prefetch still pending for it.
+        """
+        clip = self.clips.get((card, side))
+        if clip is not None and clip.done() and not clip.cancelled() and clip.exception() is None:
+            self.hits += 1
+            return clip
+        self.misses += 1
+        return self._schedule(card, side, urgent=True)
+
+    def _schedule(self, card, side, urgent=False):
+        key = (card, side)
+        clip = self.clips.get(key)
+        # Failed clips are retried the next time they are asked for
+        failed = clip is not None and (clip.cancelled() or (clip.done() and clip.exception() is not None))
+        # A prefetch may be queued behind chat and analysis requests, so one
+        # the learner is waiting on is abandoned rather than waited for
+        upgrade = urgent and clip is not None and not clip.done() and key not in self.urgent
+        if clip is None or failed or upgrade:
+            if upgrade:
+                clip.cancel()
+            text = self.deck[card][side]
+            clip = asyncio.get_event_loop().run_in_executor(
+                None if urgent else self.executor,
+                self.synthesize,
+                text,
+                INTERACTIVE if urgent else BACKGROUND,
+            )
+            clip.add_done_callback(_report_error)
+            self.clips[key] = clip
+            if urgent:
+                self.urgent.add(key)
+            else:
+                self.urgent.discard(key)
+        return clip
+
+
+def _report_error(clip):
+    if not clip.cancelled() and clip.exception() is not None:
+        print("Error synthesizing flashcard audio:", clip.exception())
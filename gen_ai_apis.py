@@ -3,95 +3,126 @@ AI API integration for Kili English Learning App.
 
 Handles OpenAI client initialization, conversation management, feedback analysis,
 quiz generation, speech-to-text, text-to-speech, and chat history operations.
+
+Conversation state lives in TutorSession objects, so one process can serve many
+learners through a SessionManager sharing a ClientPool. The module-level
+functions operate on a default session used by the desktop app. All API calls
+are admitted by the shared request_scheduler, interactive calls first.
 """
 
-import openai
+import itertools
 import json
+import threading
+import time
+import uuid
+
+import mistake_matcher
+import prompt_builder
+import request_scheduler
+from request_scheduler import INTERACTIVE, USER, BACKGROUND
+from tracing import tracer
+from transcript import Transcript
 
 # Global variables
 client = None
-messages = []
 config = None
+client_ready = threading.Event()
+# Server sessions unused for this long are closed
+SESSION_IDLE_TIMEOUT = 30 * 60
 
 # System prompt to guide the assistant
 instruction = (
     "You are a scenario adapter who takes on the given role and assists with practice conversations and "
     "vocabulary building. Your responses should be limited to three lines."
 )
-messages.append({"role": "system", "content": instruction})
 
 
-def init_openai_client(output_config):
+def init_openai_client(output_config, warm_up=False):
     """
     Initializes the OpenAI client and sets global config.
+    Safe to run in a background thread; API calls wait until the client is ready.
 
     Args:
         output_config (dict): Dictionary containing all needed paths/keys.
+        warm_up (bool): Whether to open the HTTPS connection now with a cheap request,
+            so the first real call does not pay for DNS and TLS setup.
     """
-    global config
-    config = output_config
-
-    with open(config["auth_key"], "r") as key_file:
-        key = key_file.read().strip()
+    set_config(output_config)
 
     global client
-    client = openai.OpenAI(api_key=key)
+    try:
+        client = create_client(config["auth_key"])
+    finally:
+        # Unblock waiting calls even if initialization failed
+        client_ready.set()
 
+    if warm_up:
+        try:
+            client.models.list()
+        except Exception as e:
+            print("Error warming up the OpenAI connection:", e)
 
-def improve_english():
+
+def create_client(auth_key):
     """
-    Improves the user's conversation by rewriting only the "You:" parts
-    to enhance grammar, vocabulary, and phrasing. Saves the improved conversation.
+    Creates an OpenAI client from a key file.
+
+    Args:
+        auth_key (str): Path to the file holding the API key.
     """
-    with open(config["feedback_json"], "r") as file:
-        feedback = json.load(file)
+    # Imported here because the openai package is slow to load
+    import openai
 
-    with open(config["conversation_txt"], "r") as file:
-        conversation = file.read()
+    with open(auth_key, "r") as key_file:
+        key = key_file.read().strip()
+    return openai.OpenAI(api_key=key)
 
-    prompt = f"""
-    conversation:
-    {conversation}
 
-    Please rewrite only the "You:" parts of the conversation to improve grammar, vocabulary, and phrasing. Maintain a natural tone that matches the context — casual, formal, or friendly as appropriate. Use your judgment to rephrase the responses as a fluent, thoughtful speaker would, going beyond just applying the provided feedback. Ensure the meaning stays the same, but make the delivery more native-like, polished, and engaging.
+def set_config(output_config):
+    """
+    Sets the global config of file paths and keys without creating the client.
+
+    Args:
+        output_config (dict): Dictionary containing all needed paths/keys.
+    """
+    global config
+    config = output_config
+    default_session.config = output_config
 
-    Output Format:
-    Return only the updated conversation (including both “You:” and “System:” lines), with only the “You:” lines modified. Do not include explanations or extra text, so I can directly paste it into this PyQt text box:
 
-    self.chat_display = QTextEdit(readOnly=True)
-    
-    Feeback received:
-    {json.dumps(feedback, indent=2)}
+def get_client():
     """
+    Returns the OpenAI client, waiting for background initialization if needed.
+    """
+    if client is None:
+        client_ready.wait()
+    return client
 
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=[
-            {
-                "role": "system",
-                "content": "You are an English tutor helping the user improve spoken english",
-            },
-            {"role": "user", "content": prompt},
-        ],
-        temperature=0.7,
-    )
 
-    data = response.choices[0].message.content
+def _improve_prompt(conversation, feedback_json):
+    """Builds the prompt that rewrites the "You:" lines of a conversation."""
+    prompt = f"""
+    conversation (System lines are shortened context):
+    {conversation}
 
-    # Save to txt
-    with open(config["improv_conversation_txt"], "w") as outfile:
-        outfile.write(data)
+    Please rewrite only the "You:" parts of the conversation to improve grammar, vocabulary, and phrasing. Maintain a natural tone that matches the context — casual, formal, or friendly as appropriate. Use your judgment to rephrase the responses as a fluent, thoughtful speaker would, going beyond just applying the provided feedback. Ensure the meaning stays the same, but make the delivery more native-like, polished, and engaging.
 
+    Output Format:
+    Return only the rewritten "You" lines, one per line, each starting with the same label as the line it rewrites (e.g. "You[3]:"). Do not include "System:" lines, explanations or extra text.
 
-def create_quiz(json_file):
+    Feedback received:
+    {feedback_json}
     """
-    Generates a short grammar and phrasing quiz from feedback JSON content and saves it to a file.
+    return prompt
 
-    Args:
-        json_file (str): Path to the JSON file containing feedback or learnings.
-    """
-    with open(json_file, "r") as file:
-        data = json.load(file)
+
+def _quiz_prompt(data):
+    """Builds the quiz generation prompt from feedback or learnings."""
+    grammar_mistakes = "\n".join(data.get("grammar_mistakes", {}))
+    better_phrases = "\n".join(data.get("better_phrases", {}))
+    better_vocabulary = "\n".join(data.get("better_vocabulary", {}))
+    new_words = "\n".join(data.get("new_words", []))
+    new_phrases = "\n".join(data.get("new_phrases", []))
 
     prompt = f"""
     You are an English tutor AI.
@@ -151,36 +182,60 @@ def create_quiz(json_file):
     Now generate quiz questions per item in each section using the structure above.
 
     Grammar Mistakes:
-    {"\n".join(data.get("grammar_mistakes", {}))}
+    {grammar_mistakes}
 
     Corrected Phrases:
-    {"\n".join(data.get("better_phrases", {}))}
+    {better_phrases}
 
     Better vocabulary:
-    {"\n".join(data.get("better_vocabulary", {}))}
+    {better_vocabulary}
 
     New words learnt:
-    {"\n".join(data.get("new_words", []))}
+    {new_words}
 
     New phrases learnt:
-    {"\n".join(data.get("new_phrases", []))}
+    {new_phrases}
     """
+    return prompt
+
+
+def _corrector_prompt(conversation):
+    """Builds the prompt that analyzes a conversation into JSON feedback."""
+    prompt = f"""
+    Analyze the following conversation and provide feedback for improvement in the **You** section only (i.e., the person learning English). Output a single valid **JSON object** with the following exact keys:
+
+    1. "grammar_mistakes":  A dictionary where each key is a sentence spoken by "You" that contains a grammar issue, and the value is the corrected version. Focus on tense, articles, prepositions, and subject-verb agreement.
+
+    2. "better_vocabulary":  A dictionary where each key is a simple, awkward, or repetitive word/phrase used by "You", and the value is a more fluent, natural, or advanced alternative.
 
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=[
-            {
-                "role": "system",
-                "content": "You are an English tutor helping the user correct grammar mistakes.",
-            },
-            {"role": "user", "content": prompt},
-        ],
-        temperature=0.7,
-    )
+    3. "better_phrases":  A dictionary where each key is an unnatural or informal sentence/phrase used by "You", and the value is a more appropriate, fluent, or professional version. This includes:
+    - Awkward sentence structures (even if grammatically correct)
+    - Redundant expressions
+    - Improvements for formality (especially suitable for academic, interview, or visa contexts)
 
-    quiz_content = response.choices[0].message.content
+    Instructions:
+    - DO NOT duplicate corrections across sections.
+    - If no suggestions for a section, return an empty object: {{}}
+    - Limit each correction list (1-3) to a maximum of 7 relevant items.
+    - Ensure the output is a **valid JSON object** with no markdown, extra text, or formatting.
 
-    # Extract question and answers
+    Conversation:
+    {conversation}
+    """
+    return prompt
+
+
+def _fix_json_prompt(invalid_json):
+    """Builds the prompt that asks the model to repair invalid JSON."""
+    prompt = f"""
+    JSON: {invalid_json} I got json.JSONDecodeError, please fix the JSON content for loading and dumping.
+    Ensure the output is a **valid JSON object** with no markdown, extra text, or formatting.
+    """
+    return prompt
+
+
+def _parse_quiz(quiz_content):
+    """Extracts question/answer pairs from "Q:" / "A:" lines."""
     quiz_qa_pairs = []
     question, answer = "", ""
     for line in quiz_content.splitlines():
@@ -191,127 +246,597 @@ def create_quiz(json_file):
             if question and answer:
                 quiz_qa_pairs.append({"question": question, "answer": answer})
             question, answer = "", ""
+    return quiz_qa_pairs
 
-    # Save to JSON
-    with open(config["quiz_json"], "w") as outfile:
-        json.dump(quiz_qa_pairs, outfile, indent=4)
 
+FEEDBACK_SECTIONS = ("grammar_mistakes", "better_vocabulary", "better_phrases")
 
-def conversation_corrector(fix_json=False, invalid_json=None):
+
+def _merge_feedback(running, new):
     """
-    Analyzes the user's conversation for grammar issues and provides suggestions.
+    Merges new feedback into a running feedback document, skipping items whose
+    normalized text is already in any section.
+    """
+    seen = {mistake_matcher.normalize(key) for section in running.values() for key in section}
+    for section in FEEDBACK_SECTIONS:
+        items = new.get(section)
+        if not isinstance(items, dict):
+            continue
+        for key, value in items.items():
+            normalized = mistake_matcher.normalize(key)
+            if normalized not in seen:
+                seen.add(normalized)
+                running[section][key] = value
+
+
+class TutorSession:
+    """
+    One learner's conversation with the tutor.
 
-    Args:
-        fix_json (bool): Whether to fix a broken JSON response.
-        invalid_json (str): The invalid JSON text to attempt to correct.
+    Holds the chat history sent to the model, the conversation transcript, the
+    latest feedback, and an optional config of file paths. Results are always returned;
+    they are also written to files for the keys present in the config.
     """
-    if fix_json:
-        prompt = f"""
-        JSON: {invalid_json} I got json.JSONDecodeError, please fix the JSON content for loading and dumping.
-        Ensure the output is a **valid JSON object** with no markdown, extra text, or formatting.
+
+    def __init__(self, client_source, config=None):
         """
-    else:
-        with open(config["conversation_txt"], "r") as txt_file:
-            conv = txt_file.read()
+        Args:
+            client_source (callable): Returns the client to use for each call.
+            config (dict, optional): File paths, e.g. "conversation_txt" or "feedback_json".
+        """
+        self.client_source = client_source
+        self.scheduler = request_scheduler.scheduler
+        self.config = config or {}
+        self.messages = [{"role": "system", "content": instruction}]
+        self.transcript = Transcript()
+        self.feedback = None
+        # Before/after prompt tokens of the latest compacted request of each kind
+        self.prompt_stats = {}
+        # Feedback merged turn by turn in the background, and the turns it covers
+        self.running_feedback = {section: {} for section in FEEDBACK_SECTIONS}
+        self.analyzed_turns = 0
+        self.analysis_lock = threading.Lock()
+        # Serializes operations on this session when it is shared across threads
+        self.lock = threading.Lock()
+
+    def conversation_text(self):
+        return self.transcript.text()
+
+    def _write(self, key, content, mode="w"):
+        path = self.config.get(key)
+        if path:
+            with tracer.span("file write", file=key), open(path, mode) as f:
+                f.write(content)
+
+    def conversation_builder(self, user_input):
+        """
+        Adds user input to the conversation, gets the assistant's response, appends both to log and returns the reply.
+
+        Args:
+            user_input (str): The user's message.
 
-        prompt = f"""
-        Analyze the following conversation and provide feedback for improvement in the **You** section only (i.e., the person learning English). Output a single valid **JSON object** with the following exact keys:
+        Returns:
+            str: Assistant's reply.
+        """
+        self.messages.append({"role": "user", "content": "You: " + user_input})
 
-        1. "grammar_mistakes":  A dictionary where each key is a sentence spoken by "You" that contains a grammar issue, and the value is the corrected version. Focus on tense, articles, prepositions, and subject-verb agreement.
+        with tracer.span("chat", turns=len(self.messages)):
+            response = self.scheduler.call(
+                "gpt-4",
+                lambda: self.client_source().chat.completions.create(
+                    model="gpt-4", messages=self.messages
+                ),
+                INTERACTIVE,
+            )
 
-        2. "better_vocabulary":  A dictionary where each key is a simple, awkward, or repetitive word/phrase used by "You", and the value is a more fluent, natural, or advanced alternative.
+        reply = response.choices[0].message.content.strip()
+        self.messages.append({"role": "assistant", "content": reply})
 
-        3. "better_phrases":  A dictionary where each key is an unnatural or informal sentence/phrase used by "You", and the value is a more appropriate, fluent, or professional version. This includes:
-        - Awkward sentence structures (even if grammatically correct)
-        - Redundant expressions
-        - Improvements for formality (especially suitable for academic, interview, or visa contexts)
+        new_from = len(self.transcript)
+        self.transcript.append("You", user_input)
+        self.transcript.append("System", reply)
+        self._write("conversation_txt", self.transcript.text_since(new_from), mode="a")
 
-        Instructions:
-        - DO NOT duplicate corrections across sections.
-        - If no suggestions for a section, return an empty object: {{}}
-        - Limit each correction list (1-3) to a maximum of 7 relevant items.
-        - Ensure the output is a **valid JSON object** with no markdown, extra text, or formatting.
+        return reply
 
-        Conversation:
-        {conv}
+    def conversation_corrector(self, fix_json=False, invalid_json=None, known=None):
         """
+        Analyzes the user's conversation for grammar issues and provides suggestions.
 
-    response = client.chat.completions.create(
-        model="gpt-4o", messages=[{"role": "user", "content": prompt}], temperature=0.4
-    )
+        Args:
+            fix_json (bool): Whether to fix a broken JSON response.
+            invalid_json (str): The invalid JSON text to attempt to correct.
+            known (list, optional): KnownMatch objects from mistake_matcher. Sentences that
+                are known mistakes are left out of the prompt and known items out of the result.
 
-    result_text = response.choices[0].message.content
+        Returns:
+            dict: The feedback that was saved.
+        """
+        if fix_json:
+            result_json = self._request_feedback(_fix_json_prompt(invalid_json))
+        else:
+            transcript = mistake_matcher.strip_known(self.transcript, known) if known else self.transcript
+            result_json = self._request_feedback(
+                self._feedback_prompt("corrector", transcript, self.conversation_text())
+            )
+
+        if known:
+            result_json = mistake_matcher.filter_feedback(result_json, known)
+        self.feedback = result_json
+        self._write("feedback_json", json.dumps(result_json, indent=2))
+        return result_json
+
+    def _feedback_prompt(self, name, transcript, full_text):
+        blocks = prompt_builder.user_turn_blocks(transcript)
+        prompt, kept, tokens = prompt_builder.fit_to_budget(
+            blocks, _corrector_prompt, prompt_builder.CORRECTOR_TOKEN_BUDGET
+        )
+        self.prompt_stats[name] = prompt_builder.report(
+            name, prompt_builder.count_tokens(_corrector_prompt(full_text)), tokens, len(blocks) - len(kept)
+        )
+        return prompt
+
+    def _request_feedback(self, prompt):
+        with tracer.span("feedback request"):
+            response = self.scheduler.call(
+                "gpt-4o",
+                lambda: self.client_source().chat.completions.create(
+                    model="gpt-4o", messages=[{"role": "user", "content": prompt}], temperature=0.4
+                ),
+                USER,
+            )
+        result_text = response.choices[0].message.content
+        try:
+            return json.loads(result_text)
+        except json.JSONDecodeError:
+            print("The model didn't return valid JSON.")
+            return self._request_feedback(_fix_json_prompt(result_text))
+
+    def analyze_new_turns(self, known=None, known_mistakes=None):
+        """
+        Analyzes only the "You" turns added since the last analysis and merges
+        the result into the running feedback. Meant to run in the background
+        after each turn; concurrent calls run one after the other.
 
-    try:
-        result_json = json.loads(result_text)
-        json_object = json.dumps(result_json, indent=2)
-        with open(config["feedback_json"], "w") as outfile:
-            outfile.write(json_object)
-    except json.JSONDecodeError:
-        print("The model didn't return valid JSON.")
-        conversation_corrector(fix_json=True, invalid_json=result_text)
+        Args:
+            known (list, optional): KnownMatch objects; known mistakes are left out.
+            known_mistakes (KnownMistakeIndex, optional): Matched against the
+                new turns only, when `known` is not given.
 
+        Returns:
+            bool: Whether a request was made.
+        """
+        with self.analysis_lock:
+            transcript = self.transcript
+            start, end = self.analyzed_turns, len(transcript)
+            if not any(turn.speaker == "You" for turn in transcript.turns[start:end]):
+                self.analyzed_turns = end
+                return False
+            if known is None and known_mistakes is not None:
+                known = known_mistakes.match(transcript, start, end)
+
+            # Start at the System reply the first new turn answers, for context
+            window = mistake_matcher.strip_known(transcript, known or [], max(start - 1, 0), end)
+            full_window = "".join(turn.line() for turn in transcript.turns[max(start - 1, 0):end])
+            result = self._request_feedback(self._feedback_prompt("turn analysis", window, full_window))
+            if known:
+                result = mistake_matcher.filter_feedback(result, known)
+
+            if self.transcript is transcript:  # Not reset or restored meanwhile
+                _merge_feedback(self.running_feedback, result)
+                self.analyzed_turns = end
+            return True
+
+    def current_feedback(self, known=None):
+        """
+        Returns the feedback for the whole conversation from the running
+        document, analyzing first any turns the background analysis has not
+        reached yet (usually none).
 
-def conversation_builder(user_input):
+        Args:
+            known (list, optional): KnownMatch objects; known mistakes are left out.
+
+        Returns:
+            dict: The feedback that was saved.
+        """
+        self.analyze_new_turns(known)
+        feedback = {section: dict(items) for section, items in self.running_feedback.items()}
+        if known:
+            feedback = mistake_matcher.filter_feedback(feedback, known)
+        self.feedback = feedback
+        self._write("feedback_json", json.dumps(feedback, indent=2))
+        return feedback
+
+    def improve_english(self, feedback=None):
+        """
+        Improves the user's conversation by rewriting only the "You:" parts
+        to enhance grammar, vocabulary, and phrasing. Saves the improved conversation.
+
+        Args:
+            feedback (dict, optional): Feedback to apply. Defaults to the session's latest feedback.
+
+        Returns:
+            str: The improved conversation.
+        """
+        feedback = feedback or self.feedback or {}
+        transcript = self.transcript
+        feedback_json = prompt_builder.compact_json(feedback)
+        blocks = prompt_builder.user_turn_blocks(transcript, numbered=True)
+        prompt, kept, tokens = prompt_builder.fit_to_budget(
+            blocks,
+            lambda conversation: _improve_prompt(conversation, feedback_json),
+            prompt_builder.ENHANCER_TOKEN_BUDGET,
+        )
+        self.prompt_stats["enhancer"] = prompt_builder.report(
+            "enhancer",
+            prompt_builder.count_tokens(
+                _improve_prompt(transcript.text(), json.dumps(feedback, indent=2))
+            ),
+            tokens,
+            len(blocks) - len(kept),
+        )
+
+        with tracer.span("enhancer request"):
+            response = self.scheduler.call(
+                "gpt-4",
+                lambda: self.client_source().chat.completions.create(
+                    model="gpt-4",
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "You are an English tutor helping the user improve spoken english",
+                        },
+                        {"role": "user", "content": prompt},
+                    ],
+                    temperature=0.7,
+                ),
+                USER,
+            )
+
+        # Only the numbered "You" lines come back; put them into the full conversation
+        data = prompt_builder.merge_rewrites(
+            transcript, kept, response.choices[0].message.content
+        ).text()
+        self._write("improv_conversation_txt", data)
+        return data
+
+    def create_quiz(self, data):
+        """
+        Generates a short grammar and phrasing quiz from feedback or learnings.
+
+        Args:
+            data (dict): Feedback or formatted learnings.
+
+        Returns:
+            list: The generated question/answer pairs.
+        """
+        with tracer.span("quiz request"):
+            response = self.scheduler.call(
+                "gpt-4",
+                lambda: self.client_source().chat.completions.create(
+                    model="gpt-4",
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "You are an English tutor helping the user correct grammar mistakes.",
+                        },
+                        {"role": "user", "content": _quiz_prompt(data)},
+                    ],
+                    temperature=0.7,
+                ),
+                USER,
+            )
+
+        quiz_qa_pairs = _parse_quiz(response.choices[0].message.content)
+        self._write("quiz_json", json.dumps(quiz_qa_pairs, indent=4))
+        return quiz_qa_pairs
+
+    def speech_to_text(self, audio_file):
+        """
+        Transcribes user audio input using OpenAI's audio transcription.
+
+        Args:
+            audio_file (file-like): Audio to transcribe.
+
+        Returns:
+            str: Transcribed text.
+        """
+        # The SDK uploads and transcribes in one call, so this span covers both
+        with tracer.span("transcription (upload + STT)"):
+            transcription = self.scheduler.call(
+                "gpt-4o-transcribe",
+                lambda: self.client_source().audio.transcriptions.create(
+                    model="gpt-4o-transcribe", file=audio_file
+                ),
+                INTERACTIVE,
+            )
+        return transcription.text
+
+    def text_to_speech(self, input_text, response_format="mp3"):
+        """
+        Converts input text to speech and returns the audio bytes.
+
+        Args:
+            input_text (str): The text to convert to speech.
+            response_format (str): Audio format to request, e.g. "mp3", "opus" or
+                "pcm" (raw 24 kHz 16-bit mono, lowest latency to play).
+
+        Returns:
+            bytes: The synthesized audio.
+        """
+        with tracer.span("tts", format=response_format, chars=len(input_text)):
+            response = self.scheduler.call(
+                "tts-1",
+                lambda: self.client_source().audio.speech.create(
+                    model="tts-1", voice="alloy", input=input_text, response_format=response_format
+                ),
+                INTERACTIVE,
+            )
+        return response.content
+
+    def restore_conversation(self, turns):
+        """
+        Replaces the current conversation with turns restored from a saved session
+        and rewrites the log file to match.
+
+        Args:
+            turns (list): Dicts with "speaker" ("You" or "System"), "text" and
+                optionally "created_at" keys.
+        """
+        self.messages = self.messages[:1]  # Keep only the system instruction
+        self.transcript = Transcript.from_turns(turns)
+        self.running_feedback = {section: {} for section in FEEDBACK_SECTIONS}
+        self.analyzed_turns = 0
+        for turn in self.transcript:
+            if turn.speaker == "You":
+                self.messages.append({"role": "user", "content": "You: " + turn.text})
+            else:
+                self.messages.append({"role": "assistant", "content": turn.text})
+        self._write("conversation_txt", self.transcript.text())
+
+    def delete_chat_history(self):
+        """
+        Resets conversation to the system instruction and clears the log file.
+        """
+        self.messages = self.messages[:1]  # Keep only the system instruction
+        self.transcript = Transcript()
+        self.feedback = None
+        self.running_feedback = {section: {} for section in FEEDBACK_SECTIONS}
+        self.analyzed_turns = 0
+        self._write("conversation_txt", "")
+
+
+class ClientPool:
     """
-    Adds user input to the conversation, gets the assistant's response, appends both to log and returns the reply.
+    A fixed set of API clients shared by all sessions, handed out round-robin
+    so concurrent sessions spread over several connection pools.
+    """
+
+    def __init__(self, clients):
+        self.clients = list(clients)
+        self._cycle = itertools.cycle(self.clients)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_key_file(cls, auth_key, size=4):
+        return cls(create_client(auth_key) for _ in range(size))
+
+    def get(self):
+        with self._lock:
+            return next(self._cycle)
+
+
+class SessionManager:
+    """
+    Creates, looks up and closes isolated TutorSessions that share one ClientPool.
+    Sessions a client never closed are dropped by expire_idle.
+    """
+
+    def __init__(self, client_pool, max_sessions=10000, idle_timeout=SESSION_IDLE_TIMEOUT):
+        self.client_pool = client_pool
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions = {}
+        self._last_used = {}
+        self._lock = threading.Lock()
+
+    def create(self, config=None):
+        """
+        Starts a new session.
+
+        Returns:
+            tuple: (session_id, TutorSession)
+
+        Raises:
+            RuntimeError: If the session limit has been reached.
+        """
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                raise RuntimeError("Too many open sessions.")
+            session_id = uuid.uuid4().hex
+            session = TutorSession(self.client_pool.get, config)
+            self._sessions[session_id] = session
+            self._last_used[session_id] = time.monotonic()
+        return session_id, session
+
+    def get(self, session_id):
+        """
+        Looks up a session and marks it as used.
+
+        Raises:
+            KeyError: If no session has this id.
+        """
+        with self._lock:
+            session = self._sessions[session_id]
+            self._last_used[session_id] = time.monotonic()
+        return session
+
+    def close(self, session_id):
+        with self._lock:
+            self._last_used.pop(session_id, None)
+            return self._sessions.pop(session_id, None) is not None
+
+    def expire_idle(self, now=None):
+        """
+        Closes sessions not looked up for `idle_timeout` seconds. Sessions
+        with an operation in progress are kept.
+
+        Returns:
+            list: Ids of the closed sessions.
+        """
+        now = time.monotonic() if now is None else now
+        expired = []
+        with self._lock:
+            for session_id, last_used in list(self._last_used.items()):
+                if now - last_used >= self.idle_timeout and not self._sessions[session_id].lock.locked():
+                    del self._sessions[session_id]
+                    del self._last_used[session_id]
+                    expired.append(session_id)
+        return expired
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+# Session used by the module-level functions (the desktop app's conversation)
+default_session = TutorSession(get_client)
+
+
+def improve_english():
+    """
+    Improves the user's conversation by rewriting only the "You:" parts
+    to enhance grammar, vocabulary, and phrasing. Saves the improved conversation.
+    """
+    with open(config["feedback_json"], "r") as file:
+        feedback = json.load(file)
+    return default_session.improve_english(feedback)
+
+
+def create_quiz(json_file):
+    """
+    Generates a short grammar and phrasing quiz from feedback JSON content and saves it to a file.
 
     Args:
-        user_input (str): The user's message.
+        json_file (str): Path to the JSON file containing feedback or learnings.
 
     Returns:
-        str: Assistant's reply.
+        list: The generated question/answer pairs.
     """
-    global messages
-    messages.append({"role": "user", "content": "You: " + user_input})
+    with open(json_file, "r") as file:
+        data = json.load(file)
+    return default_session.create_quiz(data)
+
+
+def conversation_corrector(known=None):
+    """
+    Analyzes the user's conversation for grammar issues and provides suggestions.
+
+    Args:
+        known (list, optional): Known mistakes already matched locally.
+
+    Returns:
+        dict: The feedback that was saved.
+    """
+    return default_session.conversation_corrector(known=known)
+
 
-    response = client.chat.completions.create(model="gpt-4", messages=messages)
+def analyze_new_turns(known=None, known_mistakes=None):
+    """
+    Analyzes the turns added since the last analysis in the background, at
+    background priority so it never delays the next chat turn.
+
+    Args:
+        known (list, optional): Known mistakes already matched locally.
+        known_mistakes (KnownMistakeIndex, optional): Index to match the new turns against.
+
+    Returns:
+        bool: Whether a request was made.
+    """
+    with request_scheduler.priority(BACKGROUND):
+        return default_session.analyze_new_turns(known, known_mistakes)
 
-    reply = response.choices[0].message.content.strip()
-    messages.append({"role": "assistant", "content": reply})
 
-    with open(config["conversation_txt"], "a") as f:
-        f.write(f"You: {user_input}\nSystem: {reply}\n")
+def current_feedback(known=None):
+    """
+    Returns the running feedback for the whole conversation and saves it.
+
+    Args:
+        known (list, optional): Known mistakes already matched locally.
 
-    return reply
+    Returns:
+        dict: The feedback that was saved.
+    """
+    return default_session.current_feedback(known)
 
 
-def speech_to_text():
+def conversation_builder(user_input):
+    """
+    Adds user input to the conversation, gets the assistant's response, appends both to log and returns the reply.
+
+    Args:
+        user_input (str): The user's message.
+
+    Returns:
+        str: Assistant's reply.
+    """
+    return default_session.conversation_builder(user_input)
+
+
+def speech_to_text(audio_file=None):
     """
     Transcribes user audio input using OpenAI's audio transcription.
 
+    Args:
+        audio_file (file-like, optional): Audio to transcribe, e.g. an in-memory
+            segment. Defaults to the saved user audio file.
+
     Returns:
         str: Transcribed text.
     """
-    with open(config["user_audio"], "rb") as audio_file:
-        transcription = client.audio.transcriptions.create(
-            model="gpt-4o-transcribe", file=audio_file
-        )
-    return transcription.text
+    if audio_file is None:
+        with open(config["user_audio"], "rb") as user_audio_file:
+            return default_session.speech_to_text(user_audio_file)
+    return default_session.speech_to_text(audio_file)
 
 
-def text_to_speech(input_text):
+def text_to_speech(input_text, response_format="mp3", save=False):
     """
-    Converts input text to speech and saves the audio output.
+    Converts input text to speech and returns the audio bytes.
 
     Args:
         input_text (str): The text to convert to speech.
+        response_format (str): Audio format to request, e.g. "mp3", "opus" or
+            "pcm" (raw 24 kHz 16-bit mono, lowest latency to play).
+        save (bool): Whether to also write the audio to the system audio file.
+
+    Returns:
+        bytes: The synthesized audio.
     """
-    response = client.audio.speech.create(
-        model="tts-1", voice="alloy", input=input_text
-    )
+    audio = default_session.text_to_speech(input_text, response_format)
+
+    if save:
+        with open(config["system_audio"], "wb") as f:
+            f.write(audio)
+
+    return audio
 
-    with open(config["system_audio"], "wb") as f:
-        f.write(response.content)
+
+def restore_conversation(turns):
+    """
+    Replaces the current conversation with turns restored from a saved session
+    and rewrites the log file to match.
+
+    Args:
+        turns (list): Dicts with "speaker" ("You" or "System") and "text" keys.
+    """
+    default_session.restore_conversation(turns)
 
 
 def delete_chat_history():
     """
     Resets conversation to the system instruction and clears the log file.
     """
-    global messages
-    messages = messages[:1]  # Keep only the system instruction
-    open(config["conversation_txt"], "w").close()
+    default_session.delete_chat_history()
 
 
 if __name__ == "__main__":
@@ -327,4 +852,4 @@ if __name__ == "__main__":
     }
     init_openai_client(config)
     # Add more function calls as needed for testing
-    english_enhancer()
+    improve_english()
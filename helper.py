@@ -3,15 +3,17 @@ Helper utilities for the Kili English Learning App.
 
 Includes:
 - Formatting learnings from the database into JSON for quiz/report generation.
-- UI-specific helpers for formatting conversation text for display.
+- UI-specific helpers for formatting highlighted chat messages, progress statistics and diagnostics for display.
 """
 
+from html import escape as html_escape
+
 def format_learnings_to_json(learnings):
     """
     Converts a list of learning items from the database into a structured JSON object.
 
     Args:
-        learnings (list): List of dicts, each representing a learning item with a 'table' key.
+        learnings (list): LearningItem objects, each serializing itself into its category.
 
     Returns:
         dict: Structured JSON with grammar mistakes, vocabulary, phrases, new words, and new phrases.
@@ -25,60 +27,114 @@ def format_learnings_to_json(learnings):
     }
 
     for item in learnings:
-        table = item.get("table")
-        if table == "GrammarMistakes":
-            _add_grammar_mistake(result, item)
-        elif table == "BetterVocabulary":
-            _add_better_vocabulary(result, item)
-        elif table == "BetterPhrases":
-            _add_better_phrase(result, item)
-        elif table == "NewWords":
-            _add_new_word(result, item)
-        elif table == "NewPhrases":
-            _add_new_phrase(result, item)
+        item.add_to(result)
 
     return result
 
-def _add_grammar_mistake(result, item):
-    result["grammar_mistakes"][item["mistake"]] = item["correction"]
-
-def _add_better_vocabulary(result, item):
-    better_word = item.get("better_word") or item.get("better")
-    word = item.get("word") or item.get("original")
-    if word and better_word:
-        result["better_vocabulary"][word] = better_word
+def highlight_phrases_html(text, spans):
+    """
+    Escapes a chat message for display, marking the given character spans.
 
-def _add_better_phrase(result, item):
-    original = item.get("original")
-    better = item.get("better")
-    if original and better:
-        result["better_phrases"][original] = better
+    Args:
+        text (str): The message.
+        spans (list): Non-overlapping (start, end) offsets in ascending order.
 
-def _add_new_word(result, item):
-    word = item.get("word")
-    if word:
-        result["new_words"].append(word)
+    Returns:
+        str: HTML body for the chat view.
+    """
+    parts = []
+    position = 0
+    for start, end in spans:
+        parts.append(html_escape(text[position:start]))
+        parts.append(f'<b style="color:#2e7d32">{html_escape(text[start:end])}</b>')
+        position = end
+    parts.append(html_escape(text[position:]))
+    return "".join(parts)
 
-def _add_new_phrase(result, item):
-    phrase = item.get("phrase")
-    if phrase:
-        result["new_phrases"].append(phrase)
 
-def parse_conversation_for_display(text):
+def format_stats_html(totals, daily, recall_count):
     """
-    Formats conversation text for display in the UI.
-    Adds newlines before each 'You:' or 'System:' and replaces with icons.
+    Formats progress statistics as HTML tables for the Stats tab.
 
     Args:
-        text (str): The conversation text.
+        totals (list): Per-category totals from DBManager.get_stats_totals.
+        daily (list): Per-day rows from DBManager.get_daily_stats.
+        recall_count (int): Recalls after which an item counts as mastered.
 
     Returns:
-        str: Formatted conversation string for display.
+        str: HTML with a totals table and a per-day activity table.
+    """
+    rows = []
+    for entry in totals:
+        rows.append(
+            f"<tr><td>{entry['category']}</td><td>{entry['total']}</td><td>{entry['due']}</td>"
+            f"<td>{entry['mastered']}</td><td>{entry['recall_attempts']}</td>"
+            f"<td>{entry['success_rate']:.0%}</td></tr>"
+        )
+    html = (
+        "<h3>Learnings</h3><table border='1' cellpadding='4' cellspacing='0'>"
+        "<tr><th>Category</th><th>Items</th><th>Due</th>"
+        f"<th>Mastered ({recall_count} recalls)</th><th>Recall attempts</th><th>Success rate</th></tr>"
+        + "".join(rows) + "</table>"
+    )
+
+    days = {}
+    for entry in daily:
+        learned, recalled = days.get(entry["day"], (0, 0))
+        days[entry["day"]] = (learned + entry["learned"], recalled + entry["recalled"])
+    day_rows = "".join(
+        f"<tr><td>{day}</td><td>{learned}</td><td>{recalled}</td></tr>"
+        for day, (learned, recalled) in days.items()
+    )
+    html += (
+        "<h3>Recent days</h3><table border='1' cellpadding='4' cellspacing='0'>"
+        "<tr><th>Day</th><th>Learned</th><th>Recalled</th></tr>"
+        + (day_rows or "<tr><td colspan='3'>No activity yet.</td></tr>") + "</table>"
+    )
+    return html
+
+
+def format_diagnostics_html(span_stats, loop_lag, memory_lines, queue_stats=()):
     """
-    import re
-    content = re.sub(r'(You:|System:)', r'\n\1', text).strip()
-    content = content.replace('You:', '👩🏽:')
-    content = content.replace('System:', '🤖:')
-    return content
+    Formats tracing data as HTML for the Diagnostics tab.
 
+    Args:
+        span_stats (list): Per-span stats from Tracer.span_stats.
+        loop_lag (tuple): (mean, p95, max) event loop lag in milliseconds.
+        memory_lines (list): Top allocation lines, or None if tracemalloc is off.
+        queue_stats (list): Per-priority queue waits from RequestScheduler.stats.
 
+    Returns:
+        str: HTML with a span table, the loop lag and the memory snapshot.
+    """
+    rows = "".join(
+        f"<tr><td>{entry['name']}</td><td>{entry['count']}</td><td>{entry['mean']:.1f}</td>"
+        f"<td>{entry['p95']:.1f}</td><td>{entry['max']:.1f}</td></tr>"
+        for entry in span_stats
+    )
+    html = (
+        "<h3>Spans (ms)</h3><table border='1' cellpadding='4' cellspacing='0'>"
+        "<tr><th>Span</th><th>Count</th><th>Mean</th><th>p95</th><th>Max</th></tr>"
+        + (rows or "<tr><td colspan='5'>Nothing traced yet.</td></tr>") + "</table>"
+    )
+    if queue_stats:
+        html += (
+            "<h3>Request queue wait (ms)</h3><table border='1' cellpadding='4' cellspacing='0'>"
+            "<tr><th>Priority</th><th>Calls</th><th>p50</th><th>p95</th></tr>"
+            + "".join(
+                f"<tr><td>{entry['priority']}</td><td>{entry['count']}</td>"
+                f"<td>{entry['p50']:.1f}</td><td>{entry['p95']:.1f}</td></tr>"
+                for entry in queue_stats
+            )
+            + "</table>"
+        )
+    mean, p95, worst = loop_lag
+    html += (
+        "<h3>Event loop lag</h3>"
+        f"<p>mean {mean:.1f} ms, p95 {p95:.1f} ms, max {worst:.1f} ms</p>"
+    )
+    if memory_lines is None:
+        html += "<h3>Memory</h3><p>Start the app with --trace-memory to take snapshots.</p>"
+    elif memory_lines:
+        html += "<h3>Memory</h3><pre>" + html_escape("\n".join(memory_lines)) + "</pre>"
+    return html
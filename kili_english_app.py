@@ -3,13 +3,15 @@ Kili - English Learning App (PyQt5)
 Main application UI and logic for chat, reports, quizzes, and English enhancement.
 """
 
+import time
+
+# Captured before any other import so the startup report covers import time
+process_start = time.perf_counter()
+
 import sys
 import asyncio
-import sounddevice as sd
-import numpy as np
-from scipy.io.wavfile import write
-from pydub import AudioSegment
 import tempfile
+import threading
 import os
 from PyQt5.QtWidgets import (
     QApplication,
@@ -23,27 +25,44 @@ from PyQt5.QtWidgets import (
     QLineEdit,
     QTabWidget,
     QMessageBox,
+    QDialog,
+    QListWidget,
+    QListWidgetItem,
+    QAbstractItemView,
+    QCheckBox,
+    QFileDialog,
 )
 from PyQt5.QtGui import QIcon
-from PyQt5.QtCore import QThread, pyqtSignal
-from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
-from PyQt5.QtCore import QUrl
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
 import json
 
 from qasync import QEventLoop
 import gen_ai_apis
 import database_manager
+import session_store
 import helper
+import conversation_diff
+import mistake_matcher
+import phrase_matcher
+import quiz_grading
+import ui_tasks
+import chat_view
+import request_scheduler
+import tracing
+from tracing import tracer
+
+imports_done = time.perf_counter()
 
 auth_key = "openai_auth_key.txt"
 system_audio = "output/system_audio.mp3"
 user_audio = "output/user_audio.mp3"
 feedback_json = "output/feedback.json"
 learnings_json = "output/learnings.json"
-quiz_json = "output/quiz.json"
 conversation_txt = "output/conversation.txt"
 improv_conversation_txt = "output/improv_conversation.txt"
 db_file = "database/english_learnings.db"
+tts_format = "pcm"
+maintenance_interval_ms = 10 * 60 * 1000
 
 
 class RecorderThread(QThread):
@@ -51,16 +70,23 @@ class RecorderThread(QThread):
     Thread for recording audio from the microphone.
     """
     finished = pyqtSignal()
+    segment_ready = pyqtSignal(object)
 
-    def __init__(self, samplerate=44100):
+    def __init__(self, samplerate=44100, streaming=False):
         super().__init__()
         self.samplerate = samplerate
         self.recording = []
         self.running = False
+        self.segmenter = None
+        if streaming:
+            import audio_stream
+            self.segmenter = audio_stream.PauseSegmenter(samplerate)
 
     def run(self):
+        import sounddevice as sd
+
         self.running = True
-        with sd.InputStream(
+        with tracer.span("capture", streaming=self.segmenter is not None), sd.InputStream(
             samplerate=self.samplerate, channels=1, callback=self.callback
         ):
             while self.running:
@@ -69,22 +95,37 @@ class RecorderThread(QThread):
 
     def callback(self, indata, frames, time, status):
         if self.running:
-            self.recording.append(indata.copy())
+            block = indata.copy()
+            self.recording.append(block)
+            if self.segmenter:
+                for segment in self.segmenter.feed(block):
+                    self.segment_ready.emit(segment)
 
     def stop(self):
         self.running = False
 
+    def flush_segment(self):
+        """
+        Return the speech captured since the last pause, if any.
+        """
+        return self.segmenter.flush() if self.segmenter else None
+
     def save_to_mp3(self):
         """
         Save the recorded audio to an MP3 file.
         """
-        audio = np.concatenate(self.recording, axis=0)
-        temp_wav = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-        temp_wav.close()
-        write(temp_wav.name, self.samplerate, audio)
-        sound = AudioSegment.from_wav(temp_wav.name)
-        sound.export(user_audio, format="mp3")
-        os.remove(temp_wav.name)
+        import numpy as np
+        from scipy.io.wavfile import write
+        from pydub import AudioSegment
+
+        with tracer.span("save_to_mp3"):
+            audio = np.concatenate(self.recording, axis=0)
+            temp_wav = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
+            temp_wav.close()
+            write(temp_wav.name, self.samplerate, audio)
+            sound = AudioSegment.from_wav(temp_wav.name)
+            sound.export(user_audio, format="mp3")
+            os.remove(temp_wav.name)
         return user_audio
 
 
@@ -92,26 +133,111 @@ class EnglishTutorApp(QWidget):
     """
     Main application window for the Kili English Learning App.
     """
-    def __init__(self):
+    def __init__(self, eager_tabs=False):
         super().__init__()
         self.setWindowTitle("Kili - English Learning App")
+        self.eager_tabs = eager_tabs
+        self.first_paint_done = False
         self.recorder_thread = None
+        self.transcriber = None
+        # Cards of the open quiz (a session_store.QuizDeck once a quiz is opened)
         self.qa_pairs = []
+        # Most recently generated quiz, opened by Start Quiz
+        self.latest_quiz_id = None
+        # Card index -> passed, for typed answers not yet written back
+        self.quiz_results = {}
         self.current_index = 0
         self.showing_question = True
+        # Prefetching TTS cache for spoken quizzes, created when first enabled
+        self.flashcard_audio = None
         self.system_audio_enabled = True
+        self.streaming_stt_enabled = True
+        self.audio_engine = None
+        # Ends the pending "playback start" span once the engine starts a clip
+        self.end_playback_span = None
+        self.loop_lag = tracing.LoopLagMonitor(tracer)
+        self.tasks = ui_tasks.TaskRunner()
+        self.on_first_paint = None
         self.init_ui()
         self.db = database_manager.DBManager(db_file)
+        self.sessions = session_store.SessionStore(db_file)
+        self.session_id = None
+        self.improved_conversation = None
+        self.known_mistakes = None
+        self.phrase_index = None
+        # Similarity matrix for diverse memory quizzes, built on a worker thread
+        self.learning_matrix = None
+        self.learning_matrix_lock = threading.Lock()
+        # (table, id) of stored words and phrases already credited in this session
+        self.credited_phrases = set()
+        # Database housekeeping is tried periodically and skipped while the app is busy
+        self.vacuum_hint_shown = False
+        self.maintenance_timer = QTimer(self)
+        self.maintenance_timer.setInterval(maintenance_interval_ms)
+        self.maintenance_timer.timeout.connect(self.run_idle_maintenance)
+        self.maintenance_timer.start()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.first_paint_done:
+            self.first_paint_done = True
+            first_paint = time.perf_counter()
+            print(
+                f"[Startup] imports: {(imports_done - process_start) * 1000:.1f} ms, "
+                f"first paint: {(first_paint - process_start) * 1000:.1f} ms"
+            )
+            if self.on_first_paint:
+                self.on_first_paint()
 
     def init_ui(self):
         """
-        Initialize the UI with all tabs and widgets.
+        Initialize the UI. Only the chat tab is built up front; the Report,
+        Quiz, Enhancer, Stats and Diagnostics tabs are built the first time they are shown.
         """
         main_layout = QVBoxLayout()
-        tab_widget = QTabWidget()
+        self.tab_widget = QTabWidget()
 
-        # === Tab 1: Chat ===
         chat_tab = QWidget()
+        self.build_chat_tab(chat_tab)
+        self.tab_widget.addTab(chat_tab, "🗨️ Chat")
+
+        # Placeholder tabs, keyed by index, waiting to be built
+        self.pending_tabs = {}
+        self.add_lazy_tab("📄 Report", self.build_report_tab)
+        self.add_lazy_tab("🧠 Quiz", self.build_quiz_tab)
+        self.add_lazy_tab("✨ English Enhancer", self.build_enhancer_tab)
+        self.add_lazy_tab("📊 Stats", self.build_stats_tab)
+        self.add_lazy_tab("🩺 Diagnostics", self.build_diagnostics_tab)
+        self.tab_widget.currentChanged.connect(self.ensure_tab_built)
+
+        if self.eager_tabs:
+            for index in list(self.pending_tabs):
+                self.ensure_tab_built(index)
+
+        main_layout.addWidget(self.tab_widget)
+        self.setLayout(main_layout)
+
+    def add_lazy_tab(self, title, builder):
+        """
+        Add a placeholder tab whose widgets are built on first show.
+        """
+        tab = QWidget()
+        index = self.tab_widget.addTab(tab, title)
+        self.pending_tabs[index] = (tab, builder)
+
+    def ensure_tab_built(self, index):
+        """
+        Build the widgets of a placeholder tab if it has not been built yet.
+        """
+        pending = self.pending_tabs.pop(index, None)
+        if pending:
+            tab, builder = pending
+            builder(tab)
+
+    def build_chat_tab(self, tab):
+        """
+        Build the chat tab.
+        """
         chat_layout = QVBoxLayout()
 
         # Toggle buttons
@@ -123,14 +249,22 @@ class EnglishTutorApp(QWidget):
             lambda checked: setattr(self, "system_audio_enabled", checked)
         )
 
+        self.toggle_streaming = QPushButton("⚡ Streaming STT")
+        self.toggle_streaming.setCheckable(True)
+        self.toggle_streaming.setChecked(True)
+        self.toggle_streaming.toggled.connect(
+            lambda checked: setattr(self, "streaming_stt_enabled", checked)
+        )
+
         # self.toggle_hints = QPushButton("💡 Hints")
         # self.toggle_hints.setCheckable(True)
 
         toggle_layout.addWidget(self.toggle_audio)
+        toggle_layout.addWidget(self.toggle_streaming)
         # toggle_layout.addWidget(self.toggle_hints)
         chat_layout.addLayout(toggle_layout)
 
-        self.chat_display = QTextEdit(readOnly=True)
+        self.chat_display = chat_view.ChatView()
         chat_layout.addWidget(self.chat_display)
 
         # Chat buttons
@@ -139,12 +273,15 @@ class EnglishTutorApp(QWidget):
         self.record_btn.toggled.connect(self.toggle_recording)
         self.clear_chat_btn = QPushButton("Clear chat")
         self.clear_chat_btn.clicked.connect(self.chat_display.clear)
-        self.del_history_btn = QPushButton("Delete History")
-        self.del_history_btn.clicked.connect(gen_ai_apis.delete_chat_history)
+        self.new_session_btn = QPushButton("New Session")
+        self.new_session_btn.clicked.connect(self.new_session)
+        self.history_btn = QPushButton("History")
+        self.history_btn.clicked.connect(self.show_history)
 
         btn_layout.addWidget(self.record_btn)
         btn_layout.addWidget(self.clear_chat_btn)
-        btn_layout.addWidget(self.del_history_btn)
+        btn_layout.addWidget(self.new_session_btn)
+        btn_layout.addWidget(self.history_btn)
         chat_layout.addLayout(btn_layout)
 
         msg_layout = QHBoxLayout()
@@ -157,10 +294,12 @@ class EnglishTutorApp(QWidget):
         msg_layout.addWidget(self.send_btn)
 
         chat_layout.addLayout(msg_layout)
-        chat_tab.setLayout(chat_layout)
+        tab.setLayout(chat_layout)
 
-        # === Tab 2: Report ===
-        report_tab = QWidget()
+    def build_report_tab(self, tab):
+        """
+        Build the report tab.
+        """
         report_layout = QVBoxLayout()
 
         report_header = QHBoxLayout()
@@ -171,9 +310,11 @@ class EnglishTutorApp(QWidget):
         self.feedback_btn.clicked.connect(self.show_feedback)
         self.clear_all_btn = QPushButton("Clear")
         self.clear_all_btn.clicked.connect(self.clear_report)
+        self.report_progress = ui_tasks.TaskProgress()
 
         report_header.addWidget(report_title)
         report_header.addStretch()
+        report_header.addWidget(self.report_progress)
         report_header.addWidget(self.gen_btn)
         report_header.addWidget(self.feedback_btn)
         report_header.addWidget(self.clear_all_btn)
@@ -235,10 +376,12 @@ class EnglishTutorApp(QWidget):
         report_layout.addWidget(self.phrase_text)
         report_layout.addLayout(memory_layout)
 
-        report_tab.setLayout(report_layout)
+        tab.setLayout(report_layout)
 
-        # === Tab 3: Quiz ===
-        quiz_tab = QWidget()
+    def build_quiz_tab(self, tab):
+        """
+        Build the quiz tab.
+        """
         quiz_layout = QVBoxLayout()
 
         quiz_header = QHBoxLayout()
@@ -249,12 +392,27 @@ class EnglishTutorApp(QWidget):
         self.quiz_memory_btn.clicked.connect(self.generate_memory_quiz)
         self.start_quiz_btn = QPushButton("Start Quiz")
         self.start_quiz_btn.clicked.connect(self.start_quiz)
+        self.quiz_history_btn = QPushButton("History")
+        self.quiz_history_btn.clicked.connect(self.show_quiz_history)
+        self.diverse_quiz_checkbox = QCheckBox("Diverse")
+        self.diverse_quiz_checkbox.setToolTip(
+            "Pick memory quiz items that are as different from each other as possible."
+        )
+        self.diverse_quiz_checkbox.setChecked(True)
+        self.spoken_quiz_checkbox = QCheckBox("Spoken")
+        self.spoken_quiz_checkbox.setToolTip("Read questions and answers aloud.")
+        self.spoken_quiz_checkbox.toggled.connect(self.toggle_spoken_quiz)
+        self.quiz_progress = ui_tasks.TaskProgress()
 
         quiz_header.addWidget(quiz_title)
         quiz_header.addStretch()
+        quiz_header.addWidget(self.quiz_progress)
         quiz_header.addWidget(self.quiz_btn)
+        quiz_header.addWidget(self.diverse_quiz_checkbox)
         quiz_header.addWidget(self.quiz_memory_btn)
+        quiz_header.addWidget(self.spoken_quiz_checkbox)
         quiz_header.addWidget(self.start_quiz_btn)
+        quiz_header.addWidget(self.quiz_history_btn)
 
         self.quiz_display = QTextEdit(readOnly=True)
 
@@ -270,13 +428,25 @@ class EnglishTutorApp(QWidget):
         nav_layout.addWidget(self.prev_btn)
         nav_layout.addWidget(self.next_btn)
 
+        answer_layout = QHBoxLayout()
+        self.answer_input = QLineEdit()
+        self.answer_input.setPlaceholderText("Type your answer and press Enter")
+        self.answer_input.returnPressed.connect(self.check_answer)
+        self.check_answer_btn = QPushButton("Check")
+        self.check_answer_btn.clicked.connect(self.check_answer)
+        answer_layout.addWidget(self.answer_input)
+        answer_layout.addWidget(self.check_answer_btn)
+
         quiz_layout.addLayout(quiz_header)
         quiz_layout.addWidget(self.quiz_display)
+        quiz_layout.addLayout(answer_layout)
         quiz_layout.addLayout(nav_layout)
-        quiz_tab.setLayout(quiz_layout)
+        tab.setLayout(quiz_layout)
 
-        # === Tab 4: English Enhancer ===
-        enhancer_tab = QWidget()
+    def build_enhancer_tab(self, tab):
+        """
+        Build the English enhancer tab.
+        """
         enhancer_layout = QVBoxLayout()
 
         # Top buttons
@@ -287,9 +457,11 @@ class EnglishTutorApp(QWidget):
         self.show_diff_btn.clicked.connect(self.show_conversation_diff)
         self.clear_enhancer_btn = QPushButton("Clear")
         self.clear_enhancer_btn.clicked.connect(self.clear_enhancer_texts)
+        self.enhancer_progress = ui_tasks.TaskProgress()
         enhancer_btn_layout.addWidget(self.improve_btn)
         enhancer_btn_layout.addWidget(self.show_diff_btn)
         enhancer_btn_layout.addWidget(self.clear_enhancer_btn)
+        enhancer_btn_layout.addWidget(self.enhancer_progress)
         enhancer_layout.addLayout(enhancer_btn_layout)
 
         # Conversation and Improved Conversation text boxes
@@ -302,25 +474,95 @@ class EnglishTutorApp(QWidget):
         conv_layout.addWidget(self.conv_text)
 
         improved_layout = QVBoxLayout()
-        improved_label = QLabel("Improved Conversation")
+        self.improved_label = QLabel("Improved Conversation")
         self.improved_text = QTextEdit(readOnly=True)
-        improved_layout.addWidget(improved_label)
+        improved_layout.addWidget(self.improved_label)
         improved_layout.addWidget(self.improved_text)
 
         enhancer_texts_layout.addLayout(conv_layout)
         enhancer_texts_layout.addLayout(improved_layout)
         enhancer_layout.addLayout(enhancer_texts_layout)
 
-        enhancer_tab.setLayout(enhancer_layout)
+        tab.setLayout(enhancer_layout)
 
-        # Add all tabs
-        tab_widget.addTab(chat_tab, "🗨️ Chat")
-        tab_widget.addTab(report_tab, "📄 Report")
-        tab_widget.addTab(quiz_tab, "🧠 Quiz")
-        tab_widget.addTab(enhancer_tab, "✨ English Enhancer")
+    def build_stats_tab(self, tab):
+        """
+        Build the progress statistics tab.
+        """
+        stats_layout = QVBoxLayout()
+
+        stats_header = QHBoxLayout()
+        stats_title = QLabel("<b>Progress</b>")
+        self.refresh_stats_btn = QPushButton("Refresh")
+        self.refresh_stats_btn.clicked.connect(self.refresh_stats)
+        stats_header.addWidget(stats_title)
+        stats_header.addStretch()
+        stats_header.addWidget(self.refresh_stats_btn)
+
+        self.stats_display = QTextEdit(readOnly=True)
+
+        # Mastered learnings moved out of the active tables
+        archive_layout = QHBoxLayout()
+        archive_title = QLabel("<b>Mastered archive</b>")
+        self.archive_search_input = QLineEdit()
+        self.archive_search_input.setPlaceholderText("Search mastered learnings")
+        self.archive_search_input.returnPressed.connect(self.search_archive)
+        self.archive_search_btn = QPushButton("Search")
+        self.archive_search_btn.clicked.connect(self.search_archive)
+        self.restore_archived_btn = QPushButton("Restore")
+        self.restore_archived_btn.setToolTip("Quiz the selected learnings again.")
+        self.restore_archived_btn.clicked.connect(self.restore_archived)
+        archive_layout.addWidget(archive_title)
+        archive_layout.addWidget(self.archive_search_input)
+        archive_layout.addWidget(self.archive_search_btn)
+        archive_layout.addWidget(self.restore_archived_btn)
+        self.archive_list = QListWidget()
+        self.archive_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+
+        stats_layout.addLayout(stats_header)
+        stats_layout.addWidget(self.stats_display, 2)
+        stats_layout.addLayout(archive_layout)
+        stats_layout.addWidget(self.archive_list, 1)
+        tab.setLayout(stats_layout)
+
+        # Refresh whenever the tab is shown; the first time once the window is set up
+        self.tab_widget.currentChanged.connect(
+            lambda index: self.tab_widget.widget(index) is tab and self.refresh_stats()
+        )
+        QTimer.singleShot(0, self.refresh_stats)
 
-        main_layout.addWidget(tab_widget)
-        self.setLayout(main_layout)
+    def build_diagnostics_tab(self, tab):
+        """
+        Build the diagnostics tab (span timings, event loop lag, memory).
+        """
+        diagnostics_layout = QVBoxLayout()
+
+        diagnostics_header = QHBoxLayout()
+        diagnostics_title = QLabel("<b>Diagnostics</b>")
+        self.refresh_diagnostics_btn = QPushButton("Refresh")
+        self.refresh_diagnostics_btn.clicked.connect(self.refresh_diagnostics)
+        self.memory_snapshot_btn = QPushButton("Memory Snapshot")
+        self.memory_snapshot_btn.clicked.connect(
+            lambda: self.refresh_diagnostics(with_memory=True)
+        )
+        self.export_trace_btn = QPushButton("Export Trace")
+        self.export_trace_btn.clicked.connect(self.export_trace)
+        diagnostics_header.addWidget(diagnostics_title)
+        diagnostics_header.addStretch()
+        diagnostics_header.addWidget(self.refresh_diagnostics_btn)
+        diagnostics_header.addWidget(self.memory_snapshot_btn)
+        diagnostics_header.addWidget(self.export_trace_btn)
+
+        self.diagnostics_display = QTextEdit(readOnly=True)
+
+        diagnostics_layout.addLayout(diagnostics_header)
+        diagnostics_layout.addWidget(self.diagnostics_display)
+        tab.setLayout(diagnostics_layout)
+
+        self.tab_widget.currentChanged.connect(
+            lambda index: self.tab_widget.widget(index) is tab and self.refresh_diagnostics()
+        )
+        QTimer.singleShot(0, self.refresh_diagnostics)
 
     def toggle_recording(self, checked):
         """
@@ -337,7 +579,17 @@ class EnglishTutorApp(QWidget):
         Start the audio recording thread.
         """
         print("[System] Recording started...")
-        self.recorder_thread = RecorderThread()
+        streaming = self.streaming_stt_enabled
+        self.recorder_thread = RecorderThread(streaming=streaming)
+        self.transcriber = None
+        if streaming:
+            import audio_stream
+            self.transcriber = audio_stream.ChunkedTranscriber(
+                gen_ai_apis.speech_to_text,
+                self.recorder_thread.samplerate,
+                asyncio.get_event_loop(),
+            )
+            self.recorder_thread.segment_ready.connect(self.transcriber.submit)
         self.recorder_thread.finished.connect(
             lambda: asyncio.create_task(self.on_recording_finished())
         )
@@ -350,57 +602,159 @@ class EnglishTutorApp(QWidget):
         if self.recorder_thread:
             self.recorder_thread.stop()
 
-    def del_audio(self):
+    def stop_audio(self):
         """
-        Delete the current audio player instance.
+        Interrupt the system reply that is currently playing.
         """
-        if hasattr(self, "audio_player"):
-            self.audio_player.stop()
-            self.audio_player.setMedia(QMediaContent())
-            self.audio_player.deleteLater()
-            del self.audio_player
+        if self.audio_engine:
+            self.audio_engine.interrupt()
 
-    def play_audio(self):
+    def play_audio(self, audio):
         """
-        Play the system audio file.
+        Queue synthesized system audio on the playback engine.
         """
-        self.audio_player = QMediaPlayer()
-        self.audio_player.setMedia(QMediaContent(
-            QUrl.fromLocalFile(system_audio)))
-        self.audio_player.play()
+        if self.audio_engine is None:
+            # QtMultimedia is only loaded once there is something to play
+            import audio_player
+            self.audio_engine = audio_player.AudioPlaybackEngine(self)
+            self.audio_engine.started.connect(self.on_playback_started)
+        if not self.audio_engine.is_playing():
+            self.end_playback_span = tracer.begin("playback start", format=tts_format)
+        self.audio_engine.enqueue(audio, tts_format)
+
+    def on_playback_started(self):
+        if self.end_playback_span:
+            self.end_playback_span()
+            self.end_playback_span = None
 
     async def send_and_receive_response(self, user_text):
         """
         Send user text to the AI and display the response.
         """
-        self.del_audio()
-        self.display_message(user_text, "You")
+        self.stop_audio()
+        end_turn = tracer.begin("reply turn", audio=self.system_audio_enabled)
+        self.display_message(user_text, "You", self.credit_phrase_usage(user_text))
 
         system_reply = await asyncio.to_thread(
             gen_ai_apis.conversation_builder, user_text
         )
         if self.system_audio_enabled:
-            await asyncio.to_thread(gen_ai_apis.text_to_speech, system_reply)
-            await asyncio.to_thread(self.play_audio)
+            audio = await asyncio.to_thread(
+                gen_ai_apis.text_to_speech, system_reply, tts_format
+            )
+            self.play_audio(audio)
 
         self.display_message(system_reply, "System")
+        end_turn()
+        if self.session_id is None:
+            self.session_id = self.sessions.create_session()
+        # The two turns conversation_builder just appended, with their timestamps
+        self.sessions.add_turns(
+            self.session_id, gen_ai_apis.default_session.transcript.turns[-2:]
+        )
+        self.schedule_turn_analysis()
+
+    def credit_phrase_usage(self, user_text):
+        """
+        Find stored words and phrases the learner used in a message and count
+        each as a recall, once per session.
+
+        Returns:
+            str or None: The message as HTML with the uses highlighted, or None if there were none.
+        """
+        if self.phrase_index is None:
+            self.phrase_index = phrase_matcher.PhraseIndex.from_db(self.db)
+        with tracer.span("phrase match"):
+            matches = self.phrase_index.match(user_text)
+        if not matches:
+            return None
+        used = {}
+        for match in matches:
+            key = (match.item.table, match.item.entry_id)
+            if key not in self.credited_phrases:
+                self.credited_phrases.add(key)
+                used.setdefault(match.item.table, []).append(match.item.entry_id)
+        if used:
+            self.db.record_usage(used)
+            print(f"[System] Credited {sum(map(len, used.values()))} stored words and phrases used in chat.")
+        return helper.highlight_phrases_html(user_text, phrase_matcher.highlight_spans(matches))
+
+    def schedule_turn_analysis(self):
+        """
+        Analyze the new turns in the background so the report is ready when
+        Generate is clicked. A run already in progress picks nothing up twice:
+        whatever it misses is covered by the next turn or by Generate.
+        """
+        if self.tasks.is_running("turn-analysis"):
+            return
+        # Known mistakes are matched on the worker, against the new turns only
+        self.tasks.start(
+            "turn-analysis",
+            asyncio.to_thread(gen_ai_apis.analyze_new_turns, known_mistakes=self.known_mistakes),
+        )
+
+    def resume_session(self, session_id=None):
+        """
+        Restore a saved session (the most recent one by default) into the chat.
+        """
+        if session_id is None:
+            session_id = self.sessions.latest_session_id()
+        if session_id is None:
+            self.new_session()
+            return
+
+        turns = self.sessions.load_turns(session_id)
+        gen_ai_apis.restore_conversation(turns)
+        self.chat_display.clear()
+        for turn in turns:
+            self.display_message(turn["text"], turn["speaker"])
+        self.session_id = session_id
+        self.credited_phrases = set()
+        print(f"[System] Resumed session {session_id} ({len(turns)} turns).")
+
+    def new_session(self):
+        """
+        Start a fresh conversation; earlier sessions stay in the history.
+        """
+        gen_ai_apis.delete_chat_history()
+        self.chat_display.clear()
+        self.session_id = self.sessions.create_session()
+        self.credited_phrases = set()
+
+    def show_history(self):
+        """
+        Browse past sessions and resume one.
+        """
+        dialog = SessionHistoryDialog(self.sessions, self)
+        if dialog.exec_() == QDialog.Accepted and dialog.selected_session_id:
+            self.resume_session(dialog.selected_session_id)
 
     async def on_recording_finished(self):
         """
         Handle actions after audio recording is finished.
         """
-        path = await asyncio.to_thread(self.recorder_thread.save_to_mp3)
-        print(f"[System] Audio saved to: {path}")
-        user_text = await asyncio.to_thread(gen_ai_apis.speech_to_text)
-        await self.send_and_receive_response(user_text)
+        # From the end of the recording until the reply is shown and queued for playback
+        with tracer.span("voice turn", streaming=self.transcriber is not None):
+            if self.transcriber:
+                # Segments cut at pauses are already being transcribed
+                self.transcriber.submit(self.recorder_thread.flush_segment())
+                user_text = await self.transcriber.result()
+                await self.send_and_receive_response(user_text)
+                return
+
+            path = await asyncio.to_thread(self.recorder_thread.save_to_mp3)
+            print(f"[System] Audio saved to: {path}")
+            user_text = await asyncio.to_thread(gen_ai_apis.speech_to_text)
+            await self.send_and_receive_response(user_text)
 
-    def display_message(self, text=None, sender="You"):
+    def display_message(self, text=None, sender="You", rich_text=None):
         """
-        Display a message in the chat display.
+        Display a message in the chat display, optionally as pre-rendered HTML.
         """
         if text.strip():
-            sender = "🤖" if sender == "System" else "👩🏽"
-            self.chat_display.append(f"{sender}: {text}\n")
+            self.chat_display.append_message(
+                "System" if sender == "System" else "You", text, rich_text
+            )
         self.msg_input.clear()
 
     async def send_text_message(self):
@@ -412,9 +766,48 @@ class EnglishTutorApp(QWidget):
 
     def get_report(self):
         """
-        Generate a conversation report.
+        Show the conversation report. Turns are analyzed in the background as
+        the conversation goes, so this usually only reads the merged feedback.
+        Mistakes already in the database are recognized locally and left out.
         """
-        gen_ai_apis.conversation_corrector()
+        if self.tasks.is_running("report"):
+            return
+        known = self.match_known_mistakes()
+        self.tasks.start(
+            "report",
+            asyncio.to_thread(gen_ai_apis.current_feedback, known),
+            buttons=[self.gen_btn],
+            progress=self.report_progress,
+            on_done=self.on_report_ready,
+        )
+
+    def match_known_mistakes(self):
+        """
+        Find stored mistakes the learner repeated in this conversation and make
+        them due for recall again.
+        """
+        start = time.perf_counter()
+        if self.known_mistakes is None:
+            self.known_mistakes = mistake_matcher.KnownMistakeIndex.from_db(self.db)
+        matches = self.known_mistakes.match(gen_ai_apis.default_session.transcript)
+        if matches:
+            repeated = {}
+            for match in matches:
+                repeated.setdefault(match.item.table, []).append(match.item.entry_id)
+            self.db.reschedule(repeated)
+        print(
+            f"[System] {len(matches)} known mistakes recognized locally in "
+            f"{(time.perf_counter() - start) * 1000:.1f} ms."
+        )
+        return matches
+
+    def on_report_ready(self, feedback):
+        """
+        Keep the generated report with the current session.
+        """
+        print("[System] Report ready.")
+        if feedback and self.session_id is not None:
+            self.sessions.save_feedback(self.session_id, feedback)
 
     def show_feedback(self):
         """
@@ -534,56 +927,275 @@ class EnglishTutorApp(QWidget):
 
     def generate_quiz(self):
         """
-        Generate a quiz from feedback.
+        Generate a quiz from feedback in the background.
         """
-        gen_ai_apis.create_quiz(feedback_json)
+        self._start_quiz_task(lambda: gen_ai_apis.create_quiz(feedback_json), self.on_quiz_ready)
 
     def generate_memory_quiz(self):
         """
-        Generate a quiz from memory (learnings).
+        Generate a quiz from memory (learnings) in the background.
         """
-        learnings = self.db.get_random_from_tables(
-            ["GrammarMistakes", "BetterPhrases", "BetterVocabulary", "NewWords", "NewPhrases"], total_limit=10)
+        diverse = self.diverse_quiz_checkbox.isChecked()
+        self._start_quiz_task(
+            lambda: self._create_memory_quiz(diverse),
+            lambda result: self.on_quiz_ready(*result),
+        )
+
+    def _start_quiz_task(self, work, on_done):
+        # Both quiz buttons replace the latest quiz, so they share one task slot
+        self.tasks.start(
+            "quiz",
+            asyncio.to_thread(work),
+            buttons=[self.quiz_btn, self.quiz_memory_btn],
+            progress=self.quiz_progress,
+            on_done=on_done,
+        )
+
+    def _create_memory_quiz(self, diverse):
+        # Runs on a worker thread with its own connection
+        tables = ["GrammarMistakes", "BetterPhrases", "BetterVocabulary", "NewWords", "NewPhrases"]
+        db = database_manager.DBManager(db_file)
+        try:
+            if diverse:
+                learnings = db.get_diverse_from_tables(
+                    tables, total_limit=10, matrix=self.learning_matrix_for(db)
+                )
+            else:
+                learnings = db.get_random_from_tables(tables, total_limit=10)
+        finally:
+            db.close()
         formatted_json = helper.format_learnings_to_json(learnings)
         json_object = json.dumps(formatted_json, indent=2)
         print(json_object)
         with open(learnings_json, "w") as outfile:
             outfile.write(json_object)
+        return gen_ai_apis.create_quiz(learnings_json), learnings
+
+    def learning_matrix_for(self, db):
+        """
+        Return the similarity matrix for diverse quizzes, building it on first
+        use. Called on worker threads: `db` is the thread's own DBManager, and
+        the matrix is kept current through the app manager's insert listeners.
+        """
+        with self.learning_matrix_lock:
+            if self.learning_matrix is None:
+                import quiz_selection
+
+                matrix = quiz_selection.LearningMatrix()
+                # Listening before loading, so nothing stored meanwhile is missed
+                self.db.add_insert_listener(matrix.on_insert)
+                try:
+                    with tracer.span("learning matrix"):
+                        matrix.load(db)
+                except Exception:
+                    self.db.insert_listeners.remove(matrix.on_insert)
+                    raise
+                self.learning_matrix = matrix
+            return self.learning_matrix
+
+    def prepare_learning_matrix(self):
+        """
+        Build the similarity matrix ahead of the first diverse quiz. Runs on a
+        worker thread with its own connection.
+        """
+        db = database_manager.DBManager(db_file)
+        try:
+            self.learning_matrix_for(db)
+        except Exception as e:
+            print(f"Error building the quiz similarity matrix: {e}")
+        finally:
+            db.close()
 
-        gen_ai_apis.create_quiz(learnings_json)
+    def on_quiz_ready(self, qa_pairs, sources=None):
+        """
+        Store the generated quiz with the current session. Cards of a memory
+        quiz are linked to the learnings they were generated from.
+        """
+        print("[System] Quiz ready.")
+        self.save_quiz_results()
+        if not qa_pairs:
+            return
+        links = None
+        if sources:
+            items = [quiz_grading.item_from_entry(entry) for entry in sources]
+            links = quiz_grading.link_sources(qa_pairs, items)
+        self.latest_quiz_id = self.sessions.save_quiz(
+            self.session_id, qa_pairs, "memory" if sources else "conversation", links
+        )
 
     def start_quiz(self):
         """
-        Start the quiz and show the first flashcard.
+        Start the latest quiz and show the first flashcard.
         """
-        try:
-            with open(quiz_json, "r") as infile:
-                self.qa_pairs = json.load(infile)
-        except Exception:
-            self.qa_pairs = []
+        self.open_quiz(self.latest_quiz_id or self.sessions.latest_quiz_id())
 
-        if not self.qa_pairs:
+    def show_quiz_history(self):
+        """
+        Browse past quizzes and reopen one.
+        """
+        dialog = QuizHistoryDialog(self.sessions, self)
+        if dialog.exec_() == QDialog.Accepted and dialog.selected_quiz_id:
+            self.open_quiz(dialog.selected_quiz_id)
+
+    def open_quiz(self, quiz_id):
+        """
+        Open a stored quiz at its first card. Cards are loaded page by page.
+        """
+        self.save_quiz_results()
+        deck = session_store.QuizDeck.open(self.sessions, quiz_id) if quiz_id else None
+        if not deck:
+            self.qa_pairs = []
+            self.next_btn.setEnabled(False)
+            self.prev_btn.setEnabled(False)
             self.quiz_display.setPlainText("No quiz content found.")
             return
 
+        self.qa_pairs = deck
         self.current_index = 0
         self.showing_question = True
         self.next_btn.setEnabled(True)
         self.prev_btn.setEnabled(False)
+        if self.flashcard_audio is not None:
+            self.flashcard_audio.set_deck(self.qa_pairs)
         self.show_flashcard()
 
+    def toggle_spoken_quiz(self, checked):
+        """
+        Turn spoken flashcards on or off.
+        """
+        if not checked:
+            self.stop_audio()
+            if self.flashcard_audio is not None:
+                self.flashcard_audio.discard()
+            return
+        if self.flashcard_audio is None:
+            import flashcard_audio
+            self.flashcard_audio = flashcard_audio.FlashcardAudio(self._synthesize_flashcard)
+        self.flashcard_audio.set_deck(self.qa_pairs)
+        if self.qa_pairs and self.current_index < len(self.qa_pairs):
+            self.speak_flashcard()
+
+    def _synthesize_flashcard(self, text, priority):
+        # INTERACTIVE for the card on screen; prefetching runs at BACKGROUND
+        # and waits behind anything the learner is actively waiting on
+        with request_scheduler.priority(priority):
+            return gen_ai_apis.text_to_speech(text, tts_format)
+
+    def speak_flashcard(self):
+        """
+        Play the current side of the current card and prefetch the next cards.
+        The card is already on screen; if its audio is not ready yet it plays
+        when it arrives, unless the learner has moved on by then.
+        """
+        card = self.current_index
+        side = "question" if self.showing_question else "answer"
+        self.stop_audio()
+        self.flashcard_audio.set_deck(self.qa_pairs)  # No-op unless the deck changed
+        # Asked for before prefetching, so a missing clip is not queued as a prefetch first
+        clip = self.flashcard_audio.clip(card, side)
+        self.flashcard_audio.prefetch(card)
+
+        def play(done_clip):
+            still_current = (
+                card == self.current_index
+                and side == ("question" if self.showing_question else "answer")
+                and self.spoken_quiz_checkbox.isChecked()
+            )
+            if still_current and not done_clip.cancelled() and done_clip.exception() is None:
+                self.play_audio(done_clip.result())
+
+        if clip.done():
+            play(clip)
+        else:
+            tracer.instant("flashcard audio miss", card=card, side=side)
+            clip.add_done_callback(play)
+
     def show_flashcard(self):
         """
         Show the current flashcard (question/answer).
         """
         q = self.qa_pairs[self.current_index]["question"]
         a = self.qa_pairs[self.current_index]["answer"]
+        self.answer_input.clear()
         if self.showing_question:
             self.quiz_display.setHtml(f"<b>Question:</b><br>{q}")
         else:
+            verdict = ""
+            if self.current_index in self.quiz_results:
+                verdict = (
+                    '<div style="color: green;"><b>✅ Correct</b></div><br>'
+                    if self.quiz_results[self.current_index]
+                    else '<div style="color: #b91c1c;"><b>❌ Not quite</b></div><br>'
+                )
             self.quiz_display.setHtml(
-                f"<b>Question:</b><br>{q}<br><br><b>Answer:</b><br>{a}"
+                f"{verdict}<b>Question:</b><br>{q}<br><br><b>Answer:</b><br>{a}"
             )
+        if self.flashcard_audio is not None and self.spoken_quiz_checkbox.isChecked():
+            self.speak_flashcard()
+
+    def check_answer(self):
+        """
+        Grade the typed answer locally and reveal the expected one.
+        """
+        answer = self.answer_input.text().strip()
+        if not answer or self.current_index >= len(self.qa_pairs):
+            return
+        expected = self.qa_pairs[self.current_index]["answer"]
+        passed, score = quiz_grading.grade(answer, expected)
+        self.quiz_results[self.current_index] = passed
+        print(f"[System] Answer graded: {'pass' if passed else 'fail'} ({score:.0%}).")
+        self.showing_question = False
+        self.show_flashcard()
+
+    def save_quiz_results(self):
+        """
+        Store the graded answers with the quiz and write them back to the
+        learnings the cards were generated from, each in one transaction.
+        """
+        if not self.quiz_results:
+            return
+        graded = sorted(self.quiz_results.items())
+        self.quiz_results = {}
+        deck = self.qa_pairs
+        self.sessions.record_answers(deck.quiz_id, graded)
+
+        cards = {index: deck[index] for index, _ in graded}
+        unlinked = [index for index, card in cards.items() if not card["source_table"]]
+        if unlinked and deck.source == "conversation":
+            # A quiz from a conversation: look for its items among the stored mistakes
+            if self.known_mistakes is None:
+                self.known_mistakes = mistake_matcher.KnownMistakeIndex.from_db(self.db)
+            found = {}
+            for index in unlinked:
+                for text in (cards[index]["question"], cards[index]["answer"]):
+                    for item, _ in self.known_mistakes.match_sentence(text):
+                        found[(item.table, item.entry_id)] = (
+                            item.table, item.entry_id, item.key, item.correction
+                        )
+            links = quiz_grading.link_sources([cards[index] for index in unlinked], list(found.values()))
+            new_links = {index: link for index, link in zip(unlinked, links) if link}
+            if new_links:
+                self.sessions.link_cards(deck.quiz_id, new_links)
+                for index, (table, entry_id) in new_links.items():
+                    cards[index].update(source_table=table, source_id=entry_id)
+
+        # Memory quiz items were already counted as recalled when they were drawn
+        drawn = deck.source == "memory"
+        passed, failed = {}, {}
+        linked = 0
+        for index, ok in graded:
+            card = cards[index]
+            if not card["source_table"]:
+                continue
+            linked += 1
+            if ok and drawn:
+                continue
+            (passed if ok else failed).setdefault(card["source_table"], []).append(card["source_id"])
+        self.db.record_quiz_results(passed, failed)
+        print(
+            f"[System] Quiz results saved: {sum(ok for _, ok in graded)}/{len(graded)} correct, "
+            f"{linked} linked to learnings."
+        )
 
     def next_flashcard(self):
         """
@@ -599,6 +1211,14 @@ class EnglishTutorApp(QWidget):
                     '<div style="color: green;"><b>🎉 End of Quiz!</b></div>'
                 )
                 self.next_btn.setEnabled(False)
+                self.save_quiz_results()
+                if self.flashcard_audio is not None and self.flashcard_audio.deck:
+                    audio = self.flashcard_audio
+                    print(
+                        f"[System] Spoken quiz: {audio.hits} of {audio.hits + audio.misses} "
+                        "clips were ready when their card was shown."
+                    )
+                    audio.discard()
                 return
         self.prev_btn.setEnabled(self.current_index > 0)
         self.show_flashcard()
@@ -616,22 +1236,143 @@ class EnglishTutorApp(QWidget):
 
     def improve_conversation(self):
         """
-        Call the English enhancer to improve the conversation.
+        Call the English enhancer in the background to improve the conversation.
         """
-        gen_ai_apis.improve_english()
+        self.tasks.start(
+            "enhancer",
+            asyncio.to_thread(gen_ai_apis.improve_english),
+            buttons=[self.improve_btn],
+            progress=self.enhancer_progress,
+            on_done=self.on_conversation_improved,
+        )
+
+    def on_conversation_improved(self, improved):
+        self.improved_conversation = improved
+        self.show_conversation_diff()
 
     def show_conversation_diff(self):
         """
-        Load and display the original and improved conversation.
+        Display the original and improved conversation with word-level changes
+        highlighted. The diff is computed off the GUI thread.
+        """
+        self.tasks.start(
+            "diff",
+            asyncio.to_thread(
+                self._compute_conversation_diff,
+                gen_ai_apis.default_session.transcript,
+                self.improved_conversation,
+            ),
+            buttons=[self.show_diff_btn],
+            on_done=self._display_conversation_diff,
+        )
+
+    def _compute_conversation_diff(self, transcript, improved):
+        if improved is None:
+            # Nothing improved in this run yet: fall back to the last saved result
+            with open(improv_conversation_txt, "r") as f:
+                improved = f.read()
+        return conversation_diff.render_diff_html(transcript, improved)
+
+    def _display_conversation_diff(self, result):
+        original_html, improved_html, changed, total = result
+        self.conv_text.setHtml(original_html)
+        self.improved_text.setHtml(improved_html)
+        self.improved_label.setText(
+            f"Improved Conversation ({changed} of {total} turns changed)"
+        )
+
+    def refresh_stats(self):
+        """
+        Show the progress statistics. Reads only the aggregate tables.
+        """
+        totals = self.db.get_stats_totals()
+        daily = self.db.get_daily_stats()
+        self.stats_display.setHtml(
+            helper.format_stats_html(totals, daily, database_manager.RECALL_COUNT)
+        )
+
+    def search_archive(self):
+        """
+        List the archived (mastered) learnings matching the search text.
+        """
+        self.archive_list.clear()
+        for entry in self.db.search_archive(self.archive_search_input.text().strip()):
+            item = QListWidgetItem(f"[{entry.table}] {entry.label()}")
+            item.setData(Qt.UserRole, (entry.table, entry.id))
+            self.archive_list.addItem(item)
+
+    def restore_archived(self):
+        """
+        Move the selected archived learnings back into the quiz rotation.
+        """
+        entries = {}
+        for item in self.archive_list.selectedItems():
+            table, entry_id = item.data(Qt.UserRole)
+            entries.setdefault(table, []).append(entry_id)
+        if not entries:
+            return
+        restored = self.db.restore_archived(entries)
+        print(f"[System] Restored {restored} learnings from the archive.")
+        self.search_archive()
+        self.refresh_stats()
+
+    def run_idle_maintenance(self):
+        """
+        Archive mastered learnings and tidy the database in the background,
+        unless the learner is recording, listening or waiting on a background task.
+        """
+        recording = self.recorder_thread is not None and self.recorder_thread.isRunning()
+        playing = self.audio_engine is not None and self.audio_engine.is_playing()
+        if recording or playing or self.tasks.is_busy():
+            return
+        self.tasks.start(
+            "db-maintenance",
+            asyncio.to_thread(self._maintain_database),
+            on_done=self.on_maintenance_done,
+        )
+
+    def _maintain_database(self):
+        # Runs on a worker thread with its own connection
+        with tracer.span("db maintenance"):
+            return database_manager.run_maintenance(db_file)
+
+    def on_maintenance_done(self, result):
+        print(
+            f"[System] Maintenance: archived {result['archived']} mastered learnings, "
+            f"freed {result['freed_pages']} pages."
+        )
+        if result["problems"]:
+            print("Error: database integrity check failed:", "; ".join(result["problems"]))
+        if result["needs_vacuum"] and not self.vacuum_hint_shown:
+            self.vacuum_hint_shown = True
+            print(
+                "[System] Run `python database_manager.py --db "
+                f"{db_file} --maintenance` once to enable incremental vacuum."
+            )
+
+    def refresh_diagnostics(self, with_memory=False):
         """
-        with open(conversation_txt, "r") as f:
-            conv = f.read()
-        with open(improv_conversation_txt, "r") as f:
-            improved = f.read()
+        Show the span timings and event loop lag; optionally take a memory snapshot.
+        """
+        memory_lines = tracing.memory_snapshot() if with_memory else []
+        self.diagnostics_display.setHtml(
+            helper.format_diagnostics_html(
+                tracer.span_stats(), self.loop_lag.stats(), memory_lines,
+                request_scheduler.scheduler.stats(),
+            )
+        )
 
-        # Use helper to format for display
-        self.conv_text.setPlainText(helper.parse_conversation_for_display(conv))
-        self.improved_text.setPlainText(helper.parse_conversation_for_display(improved))
+    def export_trace(self):
+        """
+        Save the recorded spans as a Chrome trace (open in chrome://tracing or Perfetto).
+        """
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Trace", "output/kili_trace.json", "Trace files (*.json)"
+        )
+        if not path:
+            return
+        count = tracer.export_chrome_trace(path)
+        print(f"[System] Exported {count} trace events to {path}")
 
     def clear_enhancer_texts(self):
         """
@@ -639,6 +1380,120 @@ class EnglishTutorApp(QWidget):
         """
         self.conv_text.clear()
         self.improved_text.clear()
+        self.improved_label.setText("Improved Conversation")
+
+
+class SessionHistoryDialog(QDialog):
+    """
+    Dialog listing past sessions page by page, most recent first.
+    """
+    def __init__(self, sessions, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Conversation History")
+        self.sessions = sessions
+        self.selected_session_id = None
+        self.last_key = None
+
+        layout = QVBoxLayout()
+        self.session_list = QListWidget()
+        self.session_list.itemDoubleClicked.connect(self.resume_selected)
+        btn_layout = QHBoxLayout()
+        self.more_btn = QPushButton("Load more")
+        self.more_btn.clicked.connect(self.load_page)
+        self.resume_btn = QPushButton("Resume")
+        self.resume_btn.clicked.connect(self.resume_selected)
+        btn_layout.addWidget(self.more_btn)
+        btn_layout.addStretch()
+        btn_layout.addWidget(self.resume_btn)
+        layout.addWidget(self.session_list)
+        layout.addLayout(btn_layout)
+        self.setLayout(layout)
+        self.resize(500, 400)
+        self.load_page()
+
+    def load_page(self):
+        """
+        Append the next page of sessions to the list.
+        """
+        page = self.sessions.list_sessions(before=self.last_key)
+        for session in page:
+            title = session["title"] or "(empty session)"
+            item = QListWidgetItem(
+                f"{session['updated_at'].replace('T', ' ')}  ·  {session['turn_count']} turns  ·  {title}"
+            )
+            item.setData(Qt.UserRole, session["id"])
+            self.session_list.addItem(item)
+        if page:
+            self.last_key = (page[-1]["updated_at"], page[-1]["id"])
+        self.more_btn.setEnabled(len(page) == session_store.SESSION_PAGE_SIZE)
+
+    def resume_selected(self):
+        item = self.session_list.currentItem()
+        if item:
+            self.selected_session_id = item.data(Qt.UserRole)
+            self.accept()
+
+
+class QuizHistoryDialog(QDialog):
+    """
+    Dialog listing past quizzes page by page, newest first.
+    """
+    def __init__(self, sessions, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Quiz History")
+        self.sessions = sessions
+        self.selected_quiz_id = None
+        self.last_key = None
+
+        layout = QVBoxLayout()
+        self.quiz_list = QListWidget()
+        self.quiz_list.itemDoubleClicked.connect(self.open_selected)
+        btn_layout = QHBoxLayout()
+        self.more_btn = QPushButton("Load more")
+        self.more_btn.clicked.connect(self.load_page)
+        self.open_btn = QPushButton("Open")
+        self.open_btn.clicked.connect(self.open_selected)
+        btn_layout.addWidget(self.more_btn)
+        btn_layout.addStretch()
+        btn_layout.addWidget(self.open_btn)
+        layout.addWidget(self.quiz_list)
+        layout.addLayout(btn_layout)
+        self.setLayout(layout)
+        self.resize(500, 400)
+        self.load_page()
+
+    def load_page(self):
+        """
+        Append the next page of quizzes to the list.
+        """
+        page = self.sessions.list_quizzes(before=self.last_key)
+        for quiz in page:
+            item = QListWidgetItem(
+                f"{quiz['created_at'].replace('T', ' ')}  ·  {quiz['card_count']} cards  ·  "
+                f"{quiz['source']}  ·  {quiz['title'] or ''}"
+            )
+            item.setData(Qt.UserRole, quiz["id"])
+            self.quiz_list.addItem(item)
+        if page:
+            self.last_key = (page[-1]["created_at"], page[-1]["id"])
+        self.more_btn.setEnabled(len(page) == session_store.QUIZ_PAGE_SIZE)
+
+    def open_selected(self):
+        item = self.quiz_list.currentItem()
+        if item:
+            self.selected_quiz_id = item.data(Qt.UserRole)
+            self.accept()
+
+
+def preload_heavy_modules():
+    """
+    Import the audio and model stacks up front instead of on first use.
+    """
+    import sounddevice  # noqa: F401
+    import pydub  # noqa: F401
+    import openai  # noqa: F401
+    import audio_player  # noqa: F401
+    import audio_stream  # noqa: F401
 
 
 # Run app with qasync event loop
@@ -717,7 +1572,20 @@ if __name__ == "__main__":
     loop = QEventLoop(app)
     asyncio.set_event_loop(loop)
 
-    window = EnglishTutorApp()
+    # --eager-startup restores the old behaviour (all tabs, audio and model
+    # stacks loaded up front) so startup times can be compared
+    eager_startup = "--eager-startup" in sys.argv
+    # --startup-benchmark quits right after the first paint
+    startup_benchmark = "--startup-benchmark" in sys.argv
+    # --trace-memory enables tracemalloc for the Diagnostics tab's memory snapshots
+    if "--trace-memory" in sys.argv:
+        tracing.start_memory_tracing()
+    if eager_startup:
+        preload_heavy_modules()
+
+    window = EnglishTutorApp(eager_tabs=eager_startup)
+    if startup_benchmark:
+        window.on_first_paint = lambda: QTimer.singleShot(0, app.quit)
     window.resize(800, 800)
     window.show()
     openai_config = {
@@ -725,11 +1593,17 @@ if __name__ == "__main__":
         "system_audio": system_audio,
         "user_audio": user_audio,
         "feedback_json": feedback_json,
-        "quiz_json": quiz_json,
         "conversation_txt": conversation_txt,
         "improv_conversation_txt": improv_conversation_txt,
     }
-    gen_ai_apis.init_openai_client(openai_config)
+    gen_ai_apis.set_config(openai_config)
+    window.resume_session()
+    if not startup_benchmark:
+        # Create the client and warm its connection without delaying the first paint
+        loop.run_in_executor(None, gen_ai_apis.init_openai_client, openai_config, True)
+        loop.run_in_executor(None, window.prepare_learning_matrix)
+
+    window.loop_lag.start()
 
     with loop:
         loop.run_forever()
@@ -0,0 +1,128 @@
+"""
+Typed learning items for the Kili English Learning App.
+
+One small class per category (grammar mistake, better phrase, better word,
+new word, new phrase) with `__slots__` instead of a dict per row. Items are
+built directly by a sqlite3 row factory from rows selected in a fixed column
+order (see `select_columns`), and each class knows how to serialize itself
+for quiz prompts and the learnings JSON file (`add_to`) and for display
+(`label`).
+"""
+
+from abc import ABC, abstractmethod
+
+
+class LearningItem(ABC):
+    """
+    A stored learning: its id, key text (what the learner said or learned),
+    value text (the suggested replacement, if the category has one) and
+    recall bookkeeping. `archived_at` is only set for archived items.
+    """
+    __slots__ = ("id", "key", "value", "learned_date", "recalled_count", "note", "archived_at")
+
+    table = None
+    key_column = None
+    value_column = None
+    # Key of the category in format_learnings_to_json output
+    section = None
+
+    def __init__(self, id, key, value, learned_date=None, recalled_count=0, note=None, archived_at=None):
+        self.id = id
+        self.key = key
+        self.value = value
+        self.learned_date = learned_date
+        self.recalled_count = recalled_count
+        self.note = note
+        self.archived_at = archived_at
+
+    @classmethod
+    def row_factory(cls, cursor, row):
+        return cls(*row)
+
+    @classmethod
+    def select_columns(cls):
+        """
+        Column list for a SELECT whose rows `row_factory` turns into items.
+        """
+        return f"id, {cls.key_column}, {cls.value_column or 'NULL'}, learned_date, recalled_count, note"
+
+    def column(self, name):
+        """
+        Returns the text of the item's key or value column by its database name.
+        """
+        return self.key if name == self.key_column else self.value
+
+    @abstractmethod
+    def add_to(self, result):
+        """
+        Adds the item to the dict built by helper.format_learnings_to_json.
+        """
+
+    def label(self):
+        return f"{self.key} → {self.value}" if self.value_column else self.key
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.id!r}, {self.key!r}, {self.value!r})"
+
+
+class _Correction(LearningItem):
+    """
+    A category mapping what the learner said to a better version.
+    """
+    __slots__ = ()
+
+    def add_to(self, result):
+        if self.key and self.value:
+            result[self.section][self.key] = self.value
+
+
+class _Term(LearningItem):
+    """
+    A category of single expressions to learn.
+    """
+    __slots__ = ()
+
+    def add_to(self, result):
+        if self.key:
+            result[self.section].append(self.key)
+
+
+class GrammarMistake(_Correction):
+    __slots__ = ()
+    table = "GrammarMistakes"
+    key_column, value_column = "mistake", "correction"
+    section = "grammar_mistakes"
+
+
+class BetterVocabulary(_Correction):
+    __slots__ = ()
+    table = "BetterVocabulary"
+    key_column, value_column = "word", "better_word"
+    section = "better_vocabulary"
+
+
+class BetterPhrase(_Correction):
+    __slots__ = ()
+    table = "BetterPhrases"
+    key_column, value_column = "original", "better"
+    section = "better_phrases"
+
+
+class NewWord(_Term):
+    __slots__ = ()
+    table = "NewWords"
+    key_column = "word"
+    section = "new_words"
+
+
+class NewPhrase(_Term):
+    __slots__ = ()
+    table = "NewPhrases"
+    key_column = "phrase"
+    section = "new_phrases"
+
+
+# Item class per table, in the order of format_learnings_to_json output
+ITEM_TYPES = {
+    cls.table: cls for cls in (GrammarMistake, BetterVocabulary, BetterPhrase, NewWord, NewPhrase)
+}
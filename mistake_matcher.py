@@ -0,0 +1,214 @@
+"""
+Local matcher for mistakes the learner has made before.
+
+Indexes the stored GrammarMistakes, BetterVocabulary and BetterPhrases by
+their normalized text (a hash lookup for exact repeats) and by character
+trigrams (for near-identical sentences and for words or phrases contained in
+a longer sentence). Matching a transcript takes milliseconds, so recurring
+mistakes can be recognized locally: they are rescheduled for recall and left
+out of the corrector prompt instead of being rediscovered by the model.
+"""
+
+import re
+from collections import Counter, defaultdict
+
+from transcript import Transcript
+
+# Source tables and their (mistake, correction) columns
+TABLES = {
+    "GrammarMistakes": ("mistake", "correction"),
+    "BetterVocabulary": ("word", "better_word"),
+    "BetterPhrases": ("original", "better"),
+}
+# Trigram Jaccard similarity above which two sentences count as the same mistake,
+# unless the sentence is at least as similar to the correction
+SIMILARITY = 0.8
+# Shorter keys are too ambiguous to match inside a sentence
+MIN_KEY_LENGTH = 3
+
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+")
+STRIP_PATTERN = re.compile(r"[^\w\s]+")
+
+
+def normalize(text):
+    """
+    Lowercases text and drops punctuation and repeated whitespace. Apostrophes
+    are removed without a gap, so "don't" and "dont" compare equal.
+    """
+    text = text.lower().replace("'", "").replace("’", "")
+    return " ".join(STRIP_PATTERN.sub(" ", text).split())
+
+
+def trigrams(normalized):
+    padded = f" {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+class KnownMistake:
+    """
+    A stored learning item the matcher looks for.
+    """
+    __slots__ = ("table", "entry_id", "key", "correction", "normalized", "grams", "correction_grams")
+
+    def __init__(self, table, entry_id, key, correction):
+        self.table = table
+        self.entry_id = entry_id
+        self.key = key
+        self.correction = correction
+        self.normalized = normalize(key)
+        self.grams = trigrams(self.normalized)
+        self.correction_grams = trigrams(normalize(correction or ""))
+
+
+class KnownMatch:
+    """
+    A known mistake found in one sentence of a "You" turn. `whole_sentence`
+    is set when the sentence itself is the known mistake (not just contains it).
+    """
+    __slots__ = ("item", "turn_index", "sentence", "whole_sentence")
+
+    def __init__(self, item, turn_index, sentence, whole_sentence):
+        self.item = item
+        self.turn_index = turn_index
+        self.sentence = sentence
+        self.whole_sentence = whole_sentence
+
+
+class KnownMistakeIndex:
+    """
+    Hash and trigram index over known mistakes, updated incrementally as
+    items are stored.
+    """
+
+    def __init__(self):
+        self.items = []
+        self.by_text = defaultdict(list)
+        self.by_trigram = defaultdict(list)
+        self.entries = set()  # (table, entry id) already indexed
+
+    @classmethod
+    def from_db(cls, db):
+        """
+        Builds the index from a DBManager and keeps it current through the
+        manager's insert listeners. Archived (mastered) entries are included,
+        so repeating one of them makes it due again.
+        """
+        index = cls()
+        for table in TABLES:
+            for entry in db.get_entries(table, include_archived=True):
+                index.add(table, entry.id, entry.key, entry.value)
+        db.add_insert_listener(index.on_insert)
+        return index
+
+    def on_insert(self, table, entry_id, data):
+        if table in TABLES:
+            key_col, value_col = TABLES[table]
+            self.add(table, entry_id, data[key_col], data[value_col])
+
+    def add(self, table, entry_id, key, correction):
+        # Archived entries are indexed already and are seen again when restored
+        if (table, entry_id) in self.entries:
+            return
+        self.entries.add((table, entry_id))
+        item = KnownMistake(table, entry_id, key, correction)
+        if len(item.normalized) < MIN_KEY_LENGTH:
+            return
+        position = len(self.items)
+        self.items.append(item)
+        self.by_text[item.normalized].append(item)
+        for gram in item.grams:
+            self.by_trigram[gram].append(position)
+
+    def match_sentence(self, sentence):
+        """
+        Returns (item, whole_sentence) pairs for the known mistakes in one sentence.
+        """
+        normalized = normalize(sentence)
+        if not normalized:
+            return []
+        found = {id(item): (item, True) for item in self.by_text.get(normalized, ())}
+
+        grams = trigrams(normalized)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.by_trigram.get(gram, ()))
+        padded = f" {normalized} "
+        for position, count in shared.items():
+            item = self.items[position]
+            if id(item) in found:
+                continue
+            similarity = count / (len(grams) + len(item.grams) - count)
+            if similarity >= SIMILARITY:
+                # The learner said it right this time ("I went" for a stored "I have went")
+                if jaccard(grams, item.correction_grams) >= similarity:
+                    continue
+                found[id(item)] = (item, True)
+            elif count == len(item.grams) and f" {item.normalized} " in padded:
+                found[id(item)] = (item, False)
+        return list(found.values())
+
+    def match(self, transcript, start=0, end=None):
+        """
+        Finds known mistakes in the "You" turns of a transcript (or of its
+        turns from `start` to `end`), each item once.
+
+        Returns:
+            list: KnownMatch objects in conversation order.
+        """
+        matches = []
+        seen = set()
+        for turn_index, turn in enumerate(transcript.turns[start:end], start):
+            if turn.speaker != "You":
+                continue
+            for sentence in SENTENCE_PATTERN.split(turn.text):
+                for item, whole_sentence in self.match_sentence(sentence):
+                    key = (item.table, item.entry_id)
+                    if key not in seen:
+                        seen.add(key)
+                        matches.append(KnownMatch(item, turn_index, sentence, whole_sentence))
+        return matches
+
+
+def strip_known(transcript, matches, start=0, end=None):
+    """
+    Returns a copy of the transcript's turns from `start` to `end` without the
+    "You" sentences that are entirely known mistakes. Turns left empty are dropped.
+    """
+    known = defaultdict(set)
+    for match in matches:
+        if match.whole_sentence:
+            known[match.turn_index].add(match.sentence)
+    if not known and start == 0 and end is None:
+        return transcript
+
+    stripped = Transcript()
+    end = len(transcript) if end is None else end
+    for turn_index in range(start, end):
+        turn = transcript.turns[turn_index]
+        text = turn.text
+        if turn_index in known:
+            text = " ".join(
+                sentence for sentence in SENTENCE_PATTERN.split(text)
+                if sentence not in known[turn_index]
+            )
+        if text:
+            stripped.append(turn.speaker, text, turn.timestamp)
+    return stripped
+
+
+def filter_feedback(feedback, matches):
+    """
+    Drops feedback items the model reported again although they were matched locally.
+    """
+    known = {match.item.normalized for match in matches}
+    for section in ("grammar_mistakes", "better_vocabulary", "better_phrases"):
+        items = feedback.get(section)
+        if isinstance(items, dict):
+            feedback[section] = {
+                key: value for key, value in items.items() if normalize(key) not in known
+            }
+    return feedback
@@ -0,0 +1,275 @@
+"""
+Local detection of stored words and phrases the learner uses in the chat.
+
+The target expressions of NewWords, NewPhrases, BetterVocabulary and
+BetterPhrases (the word or phrase the learner is meant to pick up) are
+compiled into one Aho-Corasick automaton over word stems, so a message is
+scanned once for all of them however many are stored. Words are reduced by
+a light suffix stripper before matching, so a stored "make progress" is
+found in "I'm making progress": regular inflections are tolerated,
+irregular forms ("went" for "go") are not.
+"""
+
+import re
+from collections import defaultdict, deque
+
+# Source tables and their target expression column
+TARGETS = {
+    "NewWords": "word",
+    "NewPhrases": "phrase",
+    "BetterVocabulary": "better_word",
+    "BetterPhrases": "better",
+}
+# Shortest target (in stem letters) worth matching
+MIN_PHRASE_LENGTH = 3
+
+TOKEN_PATTERN = re.compile(r"\w+(?:['’]\w+)*")
+
+
+def stem(token):
+    """
+    Reduces a lowercased word to a crude stem shared by its regular
+    inflections ("studies", "studied", "studying" -> "study"). Stems are never
+    cut below three letters, so short words keep their own form.
+    """
+    if len(token) > 4 and token.endswith(("ies", "ied")):
+        token = token[:-3] + "y"
+    elif token.endswith("es") and token[:-2].endswith(("x", "z", "ch", "sh", "ss")):
+        token = token[:-2]
+    elif token.endswith("s") and not token.endswith(("ss", "us", "is")) and len(token) > 3:
+        token = token[:-1]
+    if token.endswith("ing") and len(token) >= 6:
+        token = token[:-3]
+    elif token.endswith("ed") and not token.endswith("eed") and len(token) >= 5:
+        token = token[:-2]
+    # "running" -> "runn" -> "run"; "hoping", "hoped" and "hope" -> "hop"
+    if len(token) >= 4 and token[-1] == token[-2] and token[-1] not in "aeiouy":
+        token = token[:-1]
+    if len(token) > 3 and token.endswith("e") and not token.endswith("ee"):
+        token = token[:-1]
+    return token
+
+
+def tokenize(text):
+    """
+    Yields (stem, start, end) for each word of the text, with character offsets.
+    """
+    for found in TOKEN_PATTERN.finditer(text):
+        word = found.group().lower().replace("'", "").replace("’", "")
+        yield stem(word), found.start(), found.end()
+
+
+class TargetPhrase:
+    """
+    A stored learning item whose target expression the index looks for.
+    """
+    __slots__ = ("table", "entry_id", "text")
+
+    def __init__(self, table, entry_id, text):
+        self.table = table
+        self.entry_id = entry_id
+        self.text = text
+
+
+class PhraseMatch:
+    """
+    One use of a target phrase, as character offsets into the scanned text.
+    """
+    __slots__ = ("item", "start", "end")
+
+    def __init__(self, item, start, end):
+        self.item = item
+        self.start = start
+        self.end = end
+
+
+class PhraseIndex:
+    """
+    Word-level Aho-Corasick automaton over target phrases. Phrases added
+    after the index is built are linked in place: only the new nodes get
+    failure links, and existing nodes are relinked where the new phrase is
+    now their longest suffix, so a scan never waits for a rebuild.
+    """
+
+    def __init__(self):
+        self.children = [{}]  # Node -> {stem: child node}
+        self.outputs = [[]]  # Node -> [(item, word count)] ending there
+        self.fail = [0]
+        self.report = [0]  # Node -> nearest node on the failure chain with outputs
+        self.parent = [0]
+        self.depth = [0]
+        self.by_token = defaultdict(list)  # Stem -> nodes entered by it
+        self.fail_children = defaultdict(set)  # Node -> nodes failing to it
+        self.count = 0
+        self.linked = True
+        self.entries = set()  # (table, entry id) already indexed
+
+    @classmethod
+    def from_db(cls, db):
+        """
+        Builds the index from a DBManager and keeps it current through the
+        manager's insert listeners. Archived (mastered) entries are included,
+        so using one of them is still recognized.
+        """
+        index = cls()
+        index.add_many(
+            (table, entry.id, entry.column(column))
+            for table, column in TARGETS.items()
+            for entry in db.get_entries(table, include_archived=True)
+        )
+        db.add_insert_listener(index.on_insert)
+        return index
+
+    def on_insert(self, table, entry_id, data):
+        if table in TARGETS:
+            self.add(table, entry_id, data[TARGETS[table]])
+
+    def add_many(self, phrases):
+        """
+        Adds (table, entry_id, text) triples, linking the trie once at the end.
+        """
+        self.linked = False
+        for table, entry_id, text in phrases:
+            self.add(table, entry_id, text)
+        self._link()
+
+    def add(self, table, entry_id, text):
+        # Archived entries are indexed already and are seen again when restored
+        if (table, entry_id) in self.entries:
+            return
+        self.entries.add((table, entry_id))
+        stems = [token for token, _, _ in tokenize(text or "")]
+        if not stems or sum(len(token) for token in stems) < MIN_PHRASE_LENGTH:
+            return
+        node = 0
+        created = []
+        for token in stems:
+            child = self.children[node].get(token)
+            if child is None:
+                child = len(self.children)
+                self.children[node][token] = child
+                self.children.append({})
+                self.outputs.append([])
+                self.fail.append(0)
+                self.report.append(0)
+                self.parent.append(node)
+                self.depth.append(self.depth[node] + 1)
+                self.by_token[token].append(child)
+                created.append((child, token))
+            node = child
+        first_output = not self.outputs[node]
+        self.outputs[node].append((TargetPhrase(table, entry_id, text), len(stems)))
+        self.count += 1
+        if not self.linked:
+            return
+        changed = []
+        for child, token in created:
+            changed.extend(self._link_node(child, token))
+        if first_output:
+            changed.extend(self.fail_children[node])
+        self._update_reports(changed)
+
+    def _set_fail(self, node, target):
+        self.fail_children[self.fail[node]].discard(node)
+        self.fail[node] = target
+        self.fail_children[target].add(node)
+
+    def _link_node(self, node, token):
+        """
+        Links a node just added to a linked trie (its parent is linked
+        already). Returns the nodes whose failure link changed.
+        """
+        parent, depth = self.parent[node], self.depth[node]
+        state = self.fail[parent] if parent else 0
+        while state and token not in self.children[state]:
+            state = self.fail[state]
+        target = self.children[state].get(token, 0) if parent else 0
+        self._set_fail(node, target)
+        changed = [node]
+        # Deeper nodes entered by the same stem fail to this node if its
+        # parent is a suffix of theirs and they had no longer suffix
+        for other in self.by_token[token]:
+            if self.depth[other] <= depth or self.depth[self.fail[other]] >= depth:
+                continue
+            state = self.parent[other]
+            while self.depth[state] >= depth:
+                state = self.fail[state]
+            if state == parent:
+                self._set_fail(other, node)
+                changed.append(other)
+        return changed
+
+    def _update_reports(self, nodes):
+        """
+        Recomputes output links of the given nodes and, where one changed,
+        of the nodes failing to them.
+        """
+        queue = deque(nodes)
+        while queue:
+            node = queue.popleft()
+            target = self.fail[node]
+            report = target if self.outputs[target] else self.report[target]
+            if report != self.report[node]:
+                self.report[node] = report
+                if not self.outputs[node]:
+                    queue.extend(self.fail_children[node])
+
+    def _link(self):
+        """
+        Computes failure and output links of the whole trie breadth first.
+        """
+        self.fail_children.clear()
+        queue = deque()
+        for child in self.children[0].values():
+            self._set_fail(child, 0)
+            self.report[child] = 0
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            for token, child in self.children[node].items():
+                state = self.fail[node]
+                while state and token not in self.children[state]:
+                    state = self.fail[state]
+                target = self.children[state].get(token, 0)
+                self._set_fail(child, target)
+                self.report[child] = target if self.outputs[target] else self.report[target]
+                queue.append(child)
+        self.linked = True
+
+    def match(self, text):
+        """
+        Finds every use of a target phrase in the text, overlapping ones included.
+
+        Returns:
+            list: PhraseMatch objects ordered by end position.
+        """
+        children, fail, outputs, report = self.children, self.fail, self.outputs, self.report
+        matches = []
+        starts = []
+        state = 0
+        for position, (token, start, end) in enumerate(tokenize(text)):
+            starts.append(start)
+            while state and token not in children[state]:
+                state = fail[state]
+            state = children[state].get(token, 0)
+            node = state if outputs[state] else report[state]
+            while node:
+                for item, length in outputs[node]:
+                    matches.append(PhraseMatch(item, starts[position - length + 1], end))
+                node = report[node]
+        return matches
+
+    def __len__(self):
+        return self.count
+
+
+def highlight_spans(matches):
+    """
+    Picks non-overlapping (start, end) spans to highlight, preferring the
+    earliest and then the longest match.
+    """
+    spans = []
+    for match in sorted(matches, key=lambda m: (m.start, -m.end)):
+        if not spans or match.start >= spans[-1][1]:
+            spans.append((match.start, match.end))
+    return spans
@@ -0,0 +1,150 @@
+"""
+Compact prompt building for the corrector and enhancer requests.
+
+Only the learner's "You:" turns are sent in full; each is preceded by a
+short snippet of the System reply it answers, for context. Feedback is
+serialized as compact JSON, and every prompt is kept within a token budget
+by dropping the oldest turns first. Tokens are counted locally (with
+tiktoken when it is installed, otherwise with a close estimate), so each
+request can report how many prompt tokens the compaction saved.
+"""
+
+import json
+import re
+
+from transcript import Transcript
+
+# Words of the preceding System reply kept as context for a "You:" turn
+CONTEXT_WORDS = 12
+CORRECTOR_TOKEN_BUDGET = 3000
+ENHANCER_TOKEN_BUDGET = 3000
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+# A numbered "You[3]: ..." line of a rewrite response
+REWRITE_PATTERN = re.compile(r"^\s*You\[(\d+)\]:\s*(.*)$")
+_encoding = None
+
+
+def count_tokens(text):
+    """
+    Counts the tokens of a prompt. Uses the model tokenizer from tiktoken if
+    available; otherwise estimates one token per punctuation mark and per
+    four characters of each word.
+    """
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except ImportError:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    return sum((len(piece) + 3) // 4 for piece in TOKEN_PATTERN.findall(text))
+
+
+def compact_json(data):
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def _context(text):
+    words = text.split()
+    if len(words) <= CONTEXT_WORDS:
+        return text
+    return " ".join(words[:CONTEXT_WORDS]) + " …"
+
+
+def user_turn_blocks(transcript, numbered=False):
+    """
+    Returns (turn_index, block) for each "You:" turn, where the block is the
+    turn preceded by a shortened System line it replies to. Numbered blocks
+    label the turn with its index ("You[3]:") so rewrites can be matched back.
+    """
+    blocks = []
+    previous = None
+    for index, turn in enumerate(transcript):
+        if turn.speaker == "You":
+            label = f"You[{index}]" if numbered else "You"
+            block = f"{label}: {turn.text}\n"
+            if previous is not None:
+                block = f"System: {_context(previous.text)}\n" + block
+            blocks.append((index, block))
+        else:
+            previous = turn
+    return blocks
+
+
+def fit_to_budget(blocks, build, budget):
+    """
+    Keeps the most recent blocks whose prompt stays within the token budget.
+
+    Args:
+        blocks (list): (turn_index, block) pairs in conversation order.
+        build (callable): Builds the full prompt from the joined blocks.
+        budget (int): Maximum prompt tokens.
+
+    Returns:
+        tuple: (prompt, kept turn indices, prompt tokens)
+    """
+    fixed = count_tokens(build(""))
+    kept, used = [], fixed
+    for index, block in reversed(blocks):
+        cost = count_tokens(block)
+        if kept and used + cost > budget:
+            break
+        kept.append((index, block))
+        used += cost
+    kept.reverse()
+    prompt = build("".join(block for _, block in kept))
+    return prompt, [index for index, _ in kept], count_tokens(prompt)
+
+
+def report(name, before, after, dropped=0):
+    """
+    Prints the prompt token savings of one request and returns them.
+    """
+    saved = 1 - after / before if before else 0.0
+    note = f", {dropped} oldest turns over budget" if dropped else ""
+    print(f"[Prompt] {name}: {before} -> {after} tokens ({saved:.0%} saved{note}).")
+    return {"request": name, "before": before, "after": after, "dropped_turns": dropped}
+
+
+def merge_rewrites(transcript, rewritten_indices, response):
+    """
+    Puts the rewritten "You:" lines of a response back into the transcript.
+
+    Args:
+        transcript (Transcript): The original conversation.
+        rewritten_indices (list): Turn indices that were sent for rewriting, in order.
+        response (str): Model output with one "You[index]:" line per sent turn.
+
+    Returns:
+        Transcript: The conversation with the rewritten turns; turns the
+            response has no rewrite for are kept unchanged.
+    """
+    sent = set(rewritten_indices)
+    rewrites = {}
+    current = None
+    for line in response.splitlines():
+        found = REWRITE_PATTERN.match(line)
+        if found:
+            index = int(found.group(1))
+            current = index if index in sent else None
+            if current is not None:
+                rewrites[current] = found.group(2).strip()
+        elif current is not None and line.strip():
+            rewrites[current] += " " + line.strip()
+    if not rewrites:
+        # Unnumbered "You:" lines can only be matched by position, and only if none went missing
+        user_lines = [turn.text for turn in Transcript.parse(response).user_turns()]
+        if len(user_lines) == len(rewritten_indices):
+            rewrites = dict(zip(rewritten_indices, user_lines))
+        else:
+            print(
+                f"Error merging rewrites: {len(user_lines)} lines for "
+                f"{len(rewritten_indices)} turns; keeping the original turns."
+            )
+    merged = Transcript()
+    for index, turn in enumerate(transcript):
+        merged.append(turn.speaker, rewrites.get(index, turn.text), turn.timestamp)
+    return merged
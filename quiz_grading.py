@@ -0,0 +1,142 @@
+"""
+Local grading of typed quiz answers.
+
+Compares an answer with the expected one by normalized edit distance
+(Levenshtein, one NumPy pass per character) and token overlap (F1), so
+answers are graded instantly without a model round trip. Also links quiz
+questions back to the learning items they were generated from, so the
+results can be written back to the recall schedule.
+"""
+
+import re
+
+import numpy as np
+
+from mistake_matcher import normalize, trigrams
+
+# Score needed to pass. Sentences average edit similarity and token overlap,
+# so one wrong word fails; single words use edit similarity alone, so a typo
+# (one wrong, missing, extra or swapped letter in a word of five or more) passes.
+PASS_SCORE = 0.9
+WORD_PASS_SCORE = 0.8
+# Share of an item's trigrams that must appear in a question/answer to link them
+SOURCE_SCORE = 0.6
+
+OPTION_PATTERN = re.compile(r"^\(?([a-d])[).:]\s*(.+)$", re.IGNORECASE)
+
+
+def edit_similarity(a, b):
+    """
+    1 - optimal string alignment distance / length of the longer string.
+    Like Levenshtein, but swapping two adjacent letters ("recieve") is one edit.
+    """
+    if not a or not b:
+        return float(a == b)
+    source = np.frombuffer(a.encode("utf-32-le"), dtype=np.uint32)
+    target = np.frombuffer(b.encode("utf-32-le"), dtype=np.uint32)
+    offsets = np.arange(len(target) + 1)
+    previous = offsets.copy()
+    before = None
+    for i, char in enumerate(source):
+        current = np.empty_like(previous)
+        current[0] = previous[0] + 1
+        # Deletion or substitution
+        current[1:] = np.minimum(previous[1:] + 1, previous[:-1] + (target != char))
+        if before is not None and len(target) > 1:
+            # Transposition of this and the previous character
+            swapped = (target[:-1] == char) & (target[1:] == source[i - 1])
+            current[2:] = np.where(swapped, np.minimum(current[2:], before[:-2] + 1), current[2:])
+        # Insertions as a running minimum along the row
+        before, previous = previous, np.minimum.accumulate(current - offsets) + offsets
+    return 1.0 - int(previous[-1]) / max(len(source), len(target))
+
+
+def token_overlap(a, b):
+    """
+    F1 score of the shared words of two normalized strings.
+    """
+    a_tokens, b_tokens = a.split(), b.split()
+    if not a_tokens or not b_tokens:
+        return float(a_tokens == b_tokens)
+    remaining = list(b_tokens)
+    shared = 0
+    for token in a_tokens:
+        if token in remaining:
+            remaining.remove(token)
+            shared += 1
+    return 2 * shared / (len(a_tokens) + len(b_tokens))
+
+
+def _expected_variants(expected):
+    """
+    The expected answer, plus for multiple choice the option letter and text.
+    """
+    variants = [expected]
+    option = OPTION_PATTERN.match(expected.strip())
+    if option:
+        variants.extend([option.group(1), option.group(2)])
+    return [normalize(variant) for variant in variants]
+
+
+def grade(answer, expected):
+    """
+    Grades a typed answer.
+
+    Args:
+        answer (str): The learner's answer.
+        expected (str): The answer of the quiz pair.
+
+    Returns:
+        tuple: (passed, score) with score in [0, 1].
+    """
+    typed = normalize(answer)
+    passed, best = False, 0.0
+    for variant in _expected_variants(expected):
+        if typed == variant:
+            return True, 1.0
+        if " " in variant:
+            score = (edit_similarity(typed, variant) + token_overlap(typed, variant)) / 2
+            passed = passed or score >= PASS_SCORE
+        else:
+            score = edit_similarity(typed, variant)
+            passed = passed or score >= WORD_PASS_SCORE
+        best = max(best, score)
+    return passed, float(best)
+
+
+def _containment(item_grams, text_grams):
+    return len(item_grams & text_grams) / len(item_grams) if item_grams else 0.0
+
+
+def link_sources(qa_pairs, items):
+    """
+    Finds the learning item each quiz pair was most likely generated from.
+
+    Args:
+        qa_pairs (list): Dicts with "question" and "answer".
+        items (list): (table, entry_id, key, value) tuples to choose from.
+
+    Returns:
+        list: (table, entry_id) or None per pair.
+    """
+    candidates = [
+        (table, entry_id, trigrams(normalize(key)), trigrams(normalize(value or "")))
+        for table, entry_id, key, value in items
+    ]
+    sources = []
+    for pair in qa_pairs:
+        text_grams = trigrams(normalize(f"{pair['question']} {pair['answer']}"))
+        best, best_score = None, SOURCE_SCORE
+        for table, entry_id, key_grams, value_grams in candidates:
+            score = max(_containment(key_grams, text_grams), _containment(value_grams, text_grams))
+            if score >= best_score:
+                best, best_score = (table, entry_id), score
+        sources.append(best)
+    return sources
+
+
+def item_from_entry(entry):
+    """
+    Turns a LearningItem into a (table, entry_id, key, value) tuple.
+    """
+    return entry.table, entry.id, entry.key, entry.value
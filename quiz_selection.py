@@ -0,0 +1,259 @@
+"""
+Diversity-aware selection of learning items for memory quizzes.
+
+Keeps a sparse TF-IDF matrix of hashed character (UTF-8 byte) trigrams over all learnings,
+appended to row by row as items are stored. A quiz is drawn from a random
+pool of due items by greedy maximal marginal relevance (MMR): each pick
+balances how due an item is against its cosine similarity to the items
+already picked, so five variants of one article mistake do not end up in
+the same quiz. All scoring is vectorized with NumPy/SciPy.
+"""
+
+import threading
+from bisect import bisect_left
+
+import numpy as np
+from scipy import sparse
+
+# Text of each learning table that the similarity is computed on
+KEY_COLUMNS = {
+    "GrammarMistakes": "mistake",
+    "BetterPhrases": "original",
+    "BetterVocabulary": "word",
+    "NewWords": "word",
+    "NewPhrases": "phrase",
+}
+# Hashed feature space (a power of two), so new items never change the matrix width
+DIMENSIONS = 2 ** 18
+# Due items sampled per quiz before MMR ranks them
+POOL_SIZE = 2000
+# MMR trade-off between how due an item is (1.0) and diversity (0.0)
+RELEVANCE_WEIGHT = 0.5
+
+
+def hashed_trigrams(texts, dimensions=DIMENSIONS):
+    """
+    Counts the hashed byte trigrams of many texts at once.
+
+    Returns:
+        scipy.sparse.csr_matrix: One row per text with 1 + log(count) weights.
+    """
+    encoded = [f" {' '.join(text.lower().split())} ".encode("utf-8") for text in texts]
+    lengths = np.fromiter((len(item) for item in encoded), dtype=np.int64, count=len(encoded))
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+    owner = np.repeat(np.arange(len(encoded), dtype=np.int64), lengths)
+    # Windows that do not straddle two texts
+    valid = owner[:-2] == owner[2:]
+    codes = ((data[:-2] << 16) | (data[1:-1] << 8) | data[2:])[valid]
+    shift = 32 - (dimensions.bit_length() - 1)
+    buckets = ((codes * 2654435761) & 0xFFFFFFFF) >> shift  # Multiplicative hashing
+    keys, counts = np.unique(owner[:-2][valid] * dimensions + buckets.astype(np.int64), return_counts=True)
+    rows = keys // dimensions
+    return sparse.csr_matrix(
+        (
+            1.0 + np.log(counts).astype(np.float32),
+            (keys % dimensions).astype(np.int32),
+            np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=len(encoded))))),
+        ),
+        shape=(len(encoded), dimensions),
+    )
+
+
+class LearningMatrix:
+    """
+    Row-per-item sparse matrix of hashed character trigram counts, plus
+    document frequencies for IDF weighting. Rows are only ever appended;
+    new items are vectorized in one batch the next time the matrix is used.
+    Access is locked, so the matrix can be loaded and used on worker threads
+    while insert listeners add to it from the GUI thread.
+    """
+
+    def __init__(self, dimensions=DIMENSIONS):
+        self.dimensions = dimensions
+        self.doc_freq = np.zeros(dimensions, dtype=np.int64)
+        self.rows = 0
+        self._matrix = sparse.csr_matrix((0, dimensions), dtype=np.float32)
+        self._pending = []
+        # Per table: entry ids (kept ascending for rows_for) and their rows
+        self.table_ids = {table: [] for table in KEY_COLUMNS}
+        self.table_rows = {table: [] for table in KEY_COLUMNS}
+        self.known_ids = {table: set() for table in KEY_COLUMNS}
+        self._lookup = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_db(cls, db):
+        """
+        Builds the matrix from all learnings and keeps it current through the
+        DBManager's insert listeners.
+        """
+        matrix = cls()
+        matrix.load(db)
+        db.add_insert_listener(matrix.on_insert)
+        return matrix
+
+    def __len__(self):
+        return self.rows
+
+    def load(self, db):
+        """
+        Adds every learning of a DBManager, skipping items already in the
+        matrix, and vectorizes them. `db` may be a worker thread's own manager
+        while another manager's insert listener feeds the matrix.
+        """
+        for table, column in KEY_COLUMNS.items():
+            rows = db.get_column(table, column)
+            with self._lock:
+                ids, matrix_rows, known = self.table_ids[table], self.table_rows[table], self.known_ids[table]
+                for entry_id, text in rows:
+                    if entry_id not in known:
+                        known.add(entry_id)
+                        self._pending.append(text or "")
+                        ids.append(entry_id)
+                        matrix_rows.append(self.rows)
+                        self.rows += 1
+                # Items stored while loading may already hold higher ids
+                order = sorted(range(len(ids)), key=ids.__getitem__)
+                self.table_ids[table] = [ids[i] for i in order]
+                self.table_rows[table] = [matrix_rows[i] for i in order]
+                self._lookup.pop(table, None)
+        self.matrix()
+
+    def on_insert(self, table, entry_id, data):
+        if table in KEY_COLUMNS:
+            self.add(table, entry_id, data[KEY_COLUMNS[table]])
+
+    def add(self, table, entry_id, text):
+        """
+        Appends one item as a new row. Items already in the matrix (e.g.
+        restored from the archive after the matrix was built) are skipped.
+        """
+        with self._lock:
+            if entry_id in self.known_ids[table]:
+                return
+            self.known_ids[table].add(entry_id)
+            self._pending.append(text or "")
+            ids = self.table_ids[table]
+            # New entries have the highest id; restored ones go back in their sorted place
+            position = len(ids) if not ids or entry_id > ids[-1] else bisect_left(ids, entry_id)
+            ids.insert(position, entry_id)
+            self.table_rows[table].insert(position, self.rows)
+            self.rows += 1
+            self._lookup.pop(table, None)
+
+    def matrix(self):
+        """
+        All rows as a CSR matrix, vectorizing the items added since the last call.
+        """
+        with self._lock:
+            if self._pending:
+                block = hashed_trigrams(self._pending, self.dimensions)
+                self._pending = []
+                self.doc_freq += np.bincount(block.indices, minlength=self.dimensions)
+                self._matrix = sparse.vstack([self._matrix, block], format="csr")
+            return self._matrix
+
+    def rows_for(self, table, entry_ids):
+        """
+        Maps entry ids of one table to matrix rows; ids without a row map to -1.
+        """
+        with self._lock:
+            if table not in self._lookup:
+                self._lookup[table] = (
+                    np.array(self.table_ids[table], dtype=np.int64),
+                    np.array(self.table_rows[table], dtype=np.int64),
+                )
+            ids, rows = self._lookup[table]
+        entry_ids = np.asarray(entry_ids, dtype=np.int64)
+        if not len(ids):
+            return np.full(len(entry_ids), -1, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(ids, entry_ids), len(ids) - 1)
+        return np.where(ids[positions] == entry_ids, rows[positions], -1)
+
+    def sample_ids(self, table, size, rng):
+        """
+        Up to `size` random entry ids of one table.
+        """
+        with self._lock:
+            ids = self.table_ids[table]
+            if len(ids) <= size:
+                return list(ids)
+            return [ids[i] for i in rng.choice(len(ids), size, replace=False)]
+
+    def tfidf(self, rows):
+        """
+        L2-normalized TF-IDF vectors of the given rows.
+        """
+        with self._lock:
+            vectors = self.matrix()[rows]
+            idf = np.log((1.0 + len(self)) / (1.0 + self.doc_freq)).astype(np.float32) + 1.0
+        vectors.data *= idf[vectors.indices]
+        norms = np.sqrt(np.asarray(vectors.multiply(vectors).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        vectors.data /= np.repeat(norms, np.diff(vectors.indptr)).astype(np.float32)
+        return vectors
+
+
+def select_diverse(vectors, relevance, k, relevance_weight=RELEVANCE_WEIGHT):
+    """
+    Greedy MMR over L2-normalized row vectors.
+
+    Args:
+        vectors (scipy.sparse matrix): One normalized row per candidate.
+        relevance (numpy.ndarray): How much each candidate should be picked, in [0, 1].
+        k (int): Number of candidates to pick.
+        relevance_weight (float): Weight of relevance against dissimilarity.
+
+    Returns:
+        list: Positions of the picked candidates, in pick order.
+    """
+    count = vectors.shape[0]
+    max_similarity = np.zeros(count, dtype=np.float32)
+    available = np.ones(count, dtype=bool)
+    picked = []
+    for _ in range(min(k, count)):
+        scores = relevance_weight * relevance - (1.0 - relevance_weight) * max_similarity
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        picked.append(best)
+        available[best] = False
+        similarity = vectors @ vectors[best].toarray().ravel()
+        np.maximum(max_similarity, similarity, out=max_similarity)
+    return picked
+
+
+def pick_diverse_due(db, matrix, tables, total_limit, recall_count, rng=None):
+    """
+    Picks up to `total_limit` due items across tables, maximally diverse.
+
+    Returns:
+        list: (table, entry_id) pairs.
+    """
+    rng = rng or np.random.default_rng()
+    candidate_tables, candidate_ids, candidate_rows, recalled = [], [], [], []
+    total = sum(len(matrix.table_ids[table]) for table in tables) or 1
+    for table in tables:
+        # Look up a random sample of ids by primary key instead of scanning the table
+        share = max(total_limit, POOL_SIZE * len(matrix.table_ids[table]) // total)
+        due = db.get_due_entries(table, matrix.sample_ids(table, share, rng))
+        if len(due) < total_limit and len(matrix.table_ids[table]) > share:
+            due = db.get_due_sample(table, share)  # Few due items left: scan for them
+        if not due:
+            continue
+        ids = np.array([entry_id for entry_id, _ in due], dtype=np.int64)
+        rows = matrix.rows_for(table, ids)
+        known = rows >= 0  # Items stored by another process since the matrix was built
+        candidate_tables.extend([table] * int(known.sum()))
+        candidate_ids.append(ids[known])
+        candidate_rows.append(rows[known])
+        recalled.append(np.array([count for _, count in due], dtype=np.float32)[known])
+    if not candidate_tables:
+        return []
+
+    ids = np.concatenate(candidate_ids)
+    rows = np.concatenate(candidate_rows)
+    recalled = np.concatenate(recalled)
+    # Less-recalled items are more due; the noise keeps quizzes from repeating
+    relevance = (recall_count - recalled) / recall_count * 0.7 + rng.random(len(rows)) * 0.3
+    picked = select_diverse(matrix.tfidf(rows), relevance.astype(np.float32), total_limit)
+    return [(candidate_tables[i], int(ids[i])) for i in picked]
@@ -0,0 +1,227 @@
+"""
+Priority scheduling of model API calls.
+
+Every call in gen_ai_apis goes through one RequestScheduler, which decides
+when it may start:
+
+- Priority classes: INTERACTIVE (chat, speech-to-text, text-to-speech)
+  before USER (reports, quizzes, enhancer runs the learner asked for)
+  before BACKGROUND (turn analysis, audio prefetch). Queued work is started
+  highest class first, so a waiting background call never goes ahead of
+  an interactive one that arrives after it.
+- Concurrency: a few slots are kept free for interactive calls, and
+  background calls only start while no interactive call is running or
+  waiting.
+- Rate limits: a token bucket per model (requests per minute). A model
+  that is out of tokens does not hold up calls to other models.
+
+The priority of a call defaults to its kind and can be overridden for a
+block of code (e.g. background work) with `with priority(BACKGROUND):`;
+the setting follows asyncio.to_thread into the worker thread.
+"""
+
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from tracing import tracer
+
+INTERACTIVE = 0
+USER = 1
+BACKGROUND = 2
+PRIORITY_NAMES = {INTERACTIVE: "interactive", USER: "user", BACKGROUND: "background"}
+
+MAX_CONCURRENT = 16
+# Slots only interactive calls may use
+RESERVED_INTERACTIVE = 2
+# Requests per minute per model; models not listed are not rate limited
+MODEL_LIMITS = {
+    "gpt-4": 500,
+    "gpt-4o": 500,
+    "gpt-4o-transcribe": 500,
+    "tts-1": 500,
+}
+# Queue waits kept per priority class for stats
+WAIT_SAMPLES = 1000
+
+_priority = contextvars.ContextVar("request_priority", default=None)
+
+
+@contextmanager
+def priority(level):
+    """
+    Runs the calls made in the block (and in threads started from it with
+    asyncio.to_thread) at the given priority class.
+    """
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    """
+    Allows `rate` requests per second on average with bursts of up to `capacity`.
+    """
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or max(1.0, per_minute / 6.0)  # Ten seconds' worth
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def take(self, now):
+        """
+        Takes one token if available.
+
+        Returns:
+            float: 0 if a token was taken, otherwise seconds until one is available.
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+
+class _Ticket:
+    __slots__ = ("priority", "model", "granted")
+
+    def __init__(self, priority, model):
+        self.priority = priority
+        self.model = model
+        self.granted = False
+
+
+class RequestScheduler:
+    """
+    Admits blocking API calls by priority class, free slots and per-model rate limits.
+    """
+
+    def __init__(
+        self,
+        max_concurrent=MAX_CONCURRENT,
+        reserved_interactive=RESERVED_INTERACTIVE,
+        limits=None,
+    ):
+        self.max_concurrent = max_concurrent
+        self.reserved_interactive = reserved_interactive
+        self.buckets = {}
+        self.configure(limits=MODEL_LIMITS if limits is None else limits)
+        self._cond = threading.Condition()
+        self._queue = []  # Heap of (priority, sequence, ticket)
+        self._sequence = itertools.count()
+        self._running = {INTERACTIVE: 0, USER: 0, BACKGROUND: 0}
+        self._waits = {level: deque(maxlen=WAIT_SAMPLES) for level in PRIORITY_NAMES}
+
+    def configure(self, max_concurrent=None, limits=None):
+        """
+        Changes the concurrency limit and/or replaces the per-model rate limits.
+        """
+        if max_concurrent is not None:
+            self.max_concurrent = max_concurrent
+        if limits is not None:
+            self.buckets = {model: TokenBucket(per_minute) for model, per_minute in limits.items()}
+
+    def call(self, model, fn, default_priority=USER):
+        """
+        Runs fn() once the scheduler admits it and returns its result.
+
+        Args:
+            model (str): Model the call goes to, for rate limiting.
+            fn (callable): The blocking API call.
+            default_priority (int): Class used unless the caller set one with `priority`.
+        """
+        level = _priority.get()
+        if level is None:
+            level = default_priority
+        ticket = _Ticket(level, model)
+        queued = time.perf_counter()
+        with self._cond:
+            heapq.heappush(self._queue, (level, next(self._sequence), ticket))
+            while True:
+                retry_in = self._dispatch()
+                if ticket.granted:
+                    break
+                self._cond.wait(retry_in)
+            waited = time.perf_counter() - queued
+            self._waits[level].append(waited * 1000)
+        if waited >= 0.001:
+            tracer.counter(f"queue wait {PRIORITY_NAMES[level]} (ms)", round(waited * 1000, 1))
+        try:
+            return fn()
+        finally:
+            with self._cond:
+                self._running[level] -= 1
+                self._dispatch()
+
+    def _dispatch(self):
+        """
+        Grants queued tickets that may start now, best class first. Called
+        with the lock held.
+
+        Returns:
+            float or None: Seconds until a rate-limited ticket may be retried.
+        """
+        retry_in = None
+        blocked_models = set()
+        granted_any = False
+        for entry in sorted(self._queue):
+            level, _, ticket = entry
+            running = sum(self._running.values())
+            if running >= self.max_concurrent:
+                break
+            if level != INTERACTIVE and running >= self.max_concurrent - self.reserved_interactive:
+                continue
+            if level == BACKGROUND and self._interactive_pending():
+                continue
+            if ticket.model in blocked_models:
+                continue
+            bucket = self.buckets.get(ticket.model)
+            wait = bucket.take(time.monotonic()) if bucket else 0.0
+            if wait:
+                # Later tickets for the same model are no luckier
+                blocked_models.add(ticket.model)
+                retry_in = wait if retry_in is None else min(retry_in, wait)
+                continue
+            self._queue.remove(entry)
+            ticket.granted = True
+            self._running[level] += 1
+            granted_any = True
+        if granted_any:
+            heapq.heapify(self._queue)
+            self._cond.notify_all()
+        return retry_in
+
+    def _interactive_pending(self):
+        return self._running[INTERACTIVE] > 0 or any(
+            level == INTERACTIVE for level, _, _ in self._queue
+        )
+
+    def stats(self):
+        """
+        Per priority class: calls seen recently and their p50/p95 queue wait in ms.
+        """
+        # Copied under the lock: callers append to the deques from worker threads
+        with self._cond:
+            samples = {level: list(waits) for level, waits in self._waits.items()}
+        stats = []
+        for level, name in PRIORITY_NAMES.items():
+            waits = sorted(samples[level])
+            if waits:
+                stats.append({
+                    "priority": name,
+                    "count": len(waits),
+                    "p50": waits[len(waits) // 2],
+                    "p95": waits[min(len(waits) - 1, int(0.95 * len(waits)))],
+                })
+        return stats
+
+
+scheduler = RequestScheduler()
@@ -0,0 +1,299 @@
+"""
+Headless async server for the Kili English Learning App.
+
+Serves many learners from one process: each learner gets an isolated
+TutorSession from a SessionManager, all sessions share one ClientPool, and
+the blocking model calls run on a bounded thread pool so the asyncio loop
+keeps accepting requests. Sessions opened with a learner id store their
+learnings in that learner's own database shard (see shard_router).
+Sessions left idle (never closed by their client) are swept periodically.
+
+HTTP endpoints (JSON bodies):
+    POST   /sessions                    {"learner_id"?} -> {"session_id"}
+    DELETE /sessions/{id}
+    POST   /sessions/{id}/chat          {"text"} -> {"reply"}
+    POST   /sessions/{id}/report        -> feedback JSON (stored for the learner)
+    POST   /sessions/{id}/quiz          {"feedback"?, "source"?: "memory"} -> {"qa_pairs"}
+    POST   /sessions/{id}/enhance       -> {"improved"}
+    GET    /sessions/{id}/ws            WebSocket: {"op": "chat"|"report"|"quiz"|"enhance", ...}
+    GET    /admin/stats                 -> progress totals across all learners
+    GET    /health                      -> {"sessions", "open_shards"}
+
+Usage:
+    python server.py --port 8080 --clients 4 --workers 256 --data-dir database/learners
+"""
+
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web, WSMsgType
+
+import gen_ai_apis
+import helper
+import request_scheduler
+import shard_router
+
+auth_key = "openai_auth_key.txt"
+# Learnings drawn per memory quiz
+MEMORY_QUIZ_ITEMS = 10
+QUIZ_TABLES = ["GrammarMistakes", "BetterPhrases", "BetterVocabulary", "NewWords", "NewPhrases"]
+# Seconds between sweeps for idle sessions
+SESSION_SWEEP_INTERVAL = 60
+
+
+async def _read_payload(request):
+    """
+    Returns the request's JSON object body ({} if there is none).
+
+    Raises:
+        web.HTTPBadRequest: If the body is not a JSON object.
+    """
+    if not request.can_read_body:
+        return {}
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(text="The body must be JSON.")
+    if not isinstance(payload, dict):
+        raise web.HTTPBadRequest(text="The body must be a JSON object.")
+    return payload
+
+
+def _feedback_param(payload):
+    feedback = payload.get("feedback")
+    if feedback is not None and not isinstance(feedback, dict):
+        raise web.HTTPBadRequest(text="'feedback' must be an object.")
+    return feedback
+
+
+# Each operation gets the session, the request payload and the learner's
+# shard as a context manager factory (None for anonymous sessions)
+def _chat(session, payload, learnings):
+    text = payload.get("text")
+    if not isinstance(text, str) or not text.strip():
+        raise web.HTTPBadRequest(text="'text' is required.")
+    text = text.strip()
+    return {"reply": session.conversation_builder(text)}
+
+
+def _report(session, payload, learnings):
+    feedback = session.current_feedback()
+    if learnings is not None:
+        with learnings() as db:
+            db.add_feedback(feedback)
+    return feedback
+
+
+def _quiz(session, payload, learnings):
+    if payload.get("source") == "memory":
+        if learnings is None:
+            raise web.HTTPConflict(text="Memory quizzes need a session with a 'learner_id'.")
+        with learnings() as db:
+            drawn = db.get_random_from_tables(QUIZ_TABLES, total_limit=MEMORY_QUIZ_ITEMS)
+        if not drawn:
+            raise web.HTTPConflict(text="No learnings are due for this learner.")
+        return {"qa_pairs": session.create_quiz(helper.format_learnings_to_json(drawn))}
+    feedback = _feedback_param(payload) or session.feedback
+    if not feedback:
+        raise web.HTTPConflict(text="Generate a report first or pass 'feedback'.")
+    return {"qa_pairs": session.create_quiz(feedback)}
+
+
+def _enhance(session, payload, learnings):
+    return {"improved": session.improve_english(_feedback_param(payload))}
+
+
+OPERATIONS = {
+    "chat": _chat,
+    "report": _report,
+    "quiz": _quiz,
+    "enhance": _enhance,
+}
+
+
+class TutorServer:
+    """
+    Routes HTTP and WebSocket requests to per-learner sessions.
+    """
+
+    def __init__(self, manager, executor, shards):
+        self.manager = manager
+        self.executor = executor
+        self.shards = shards
+        # Session id -> learner id, for sessions opened on behalf of a learner
+        self.learners = {}
+
+    def _session(self, request):
+        session_id = request.match_info["session_id"]
+        try:
+            return session_id, self.manager.get(session_id)
+        except KeyError:
+            raise web.HTTPNotFound(text="Unknown session.")
+
+    async def run(self, session_id, session, operation, payload):
+        """
+        Runs one operation on a worker thread, one at a time per session so
+        turns of the same conversation never interleave.
+        """
+        learner_id = self.learners.get(session_id)
+        learnings = None
+        if learner_id is not None:
+            learnings = lambda: self.shards.db(learner_id)  # noqa: E731
+
+        def locked():
+            with session.lock:
+                return OPERATIONS[operation](session, payload, learnings)
+
+        return await asyncio.get_running_loop().run_in_executor(self.executor, locked)
+
+    async def create_session(self, request):
+        payload = await _read_payload(request)
+        learner_id = payload.get("learner_id")
+        if learner_id is not None:
+            try:
+                if not isinstance(learner_id, str):
+                    raise ValueError("Invalid learner id.")
+                self.shards.shard_path(learner_id)
+            except ValueError as e:
+                raise web.HTTPBadRequest(text=str(e))
+        try:
+            session_id, _ = self.manager.create()
+        except RuntimeError as e:
+            raise web.HTTPServiceUnavailable(text=str(e))
+        if learner_id is not None:
+            self.learners[session_id] = learner_id
+        return web.json_response({"session_id": session_id}, status=201)
+
+    async def close_session(self, request):
+        session_id = request.match_info["session_id"]
+        if not self.manager.close(session_id):
+            raise web.HTTPNotFound(text="Unknown session.")
+        self.learners.pop(session_id, None)
+        return web.Response(status=204)
+
+    async def operation(self, request):
+        session_id, session = self._session(request)
+        payload = await _read_payload(request)
+        result = await self.run(session_id, session, request.match_info["operation"], payload)
+        return web.json_response(result)
+
+    async def websocket(self, request):
+        session_id, session = self._session(request)
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            try:
+                payload = msg.json()
+            except ValueError:
+                payload = None
+            if not isinstance(payload, dict):
+                await ws.send_json({"op": None, "error": "Messages must be JSON objects."})
+                continue
+            operation = payload.get("op")
+            try:
+                # Keeps the session from expiring while the connection is in use
+                session = self.manager.get(session_id)
+            except KeyError:
+                await ws.send_json({"op": operation, "error": "Session expired."})
+                break
+            if not isinstance(operation, str) or operation not in OPERATIONS:
+                await ws.send_json({"op": operation, "error": "Unknown operation."})
+                continue
+            try:
+                result = await self.run(session_id, session, operation, payload)
+                await ws.send_json({"op": operation, "result": result})
+            except web.HTTPException as e:
+                await ws.send_json({"op": operation, "error": e.text})
+            except Exception as e:
+                print(f"Error in {operation}:", e)
+                await ws.send_json({"op": operation, "error": "Backend call failed."})
+        return ws
+
+    async def sweep_sessions(self):
+        """
+        Closes idle sessions every SESSION_SWEEP_INTERVAL seconds.
+        """
+        while True:
+            await asyncio.sleep(SESSION_SWEEP_INTERVAL)
+            expired = self.manager.expire_idle()
+            for session_id in expired:
+                self.learners.pop(session_id, None)
+            if expired:
+                print(f"[System] Closed {len(expired)} idle sessions.")
+
+    async def admin_stats(self, request):
+        # Reads every shard from disk, so it runs off the event loop
+        stats = await asyncio.get_running_loop().run_in_executor(
+            self.executor, self.shards.aggregate_stats
+        )
+        return web.json_response(stats)
+
+    async def health(self, request):
+        return web.json_response({"sessions": len(self.manager), "open_shards": len(self.shards)})
+
+
+def create_app(manager, workers=256, shards=None):
+    """
+    Builds the aiohttp application.
+
+    Args:
+        manager (gen_ai_apis.SessionManager): Owns the sessions and the shared client pool.
+        workers (int): Maximum number of model calls in flight at once.
+        shards (shard_router.ShardRouter, optional): Per-learner storage;
+            defaults to shards under database/learners.
+    """
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kili-api")
+    # Every worker may have a model call in flight; the scheduler still orders them by priority
+    request_scheduler.scheduler.configure(max_concurrent=workers)
+    shards = shards or shard_router.ShardRouter("database/learners")
+    server = TutorServer(manager, executor, shards)
+    operations = "{operation:" + "|".join(OPERATIONS) + "}"
+
+    app = web.Application()
+    app.add_routes([
+        web.post("/sessions", server.create_session),
+        web.delete("/sessions/{session_id}", server.close_session),
+        web.post("/sessions/{session_id}/" + operations, server.operation),
+        web.get("/sessions/{session_id}/ws", server.websocket),
+        web.get("/admin/stats", server.admin_stats),
+        web.get("/health", server.health),
+    ])
+
+    async def start_sweeper(app):
+        app["sweeper"] = asyncio.create_task(server.sweep_sessions())
+
+    async def shutdown_executor(app):
+        app["sweeper"].cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+        shards.close()
+
+    app.on_startup.append(start_sweeper)
+    app.on_cleanup.append(shutdown_executor)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kili multi-session tutor server.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--clients", type=int, default=4, help="Size of the shared client pool.")
+    parser.add_argument("--workers", type=int, default=256, help="Concurrent model calls.")
+    parser.add_argument("--max-sessions", type=int, default=10000)
+    parser.add_argument(
+        "--session-ttl", type=int, default=gen_ai_apis.SESSION_IDLE_TIMEOUT,
+        help="Seconds after which an unused session is closed.",
+    )
+    parser.add_argument("--data-dir", default="database/learners", help="Directory of the per-learner shards.")
+    parser.add_argument(
+        "--max-open-shards", type=int, default=shard_router.MAX_OPEN_SHARDS,
+        help="Learner databases kept open at once.",
+    )
+    args = parser.parse_args()
+
+    pool = gen_ai_apis.ClientPool.from_key_file(auth_key, args.clients)
+    manager = gen_ai_apis.SessionManager(pool, args.max_sessions, args.session_ttl)
+    shards = shard_router.ShardRouter(args.data_dir, args.max_open_shards)
+    web.run_app(create_app(manager, args.workers, shards), host=args.host, port=args.port)
@@ -0,0 +1,351 @@
+"""
+Session store for English learning app.
+Persists conversation sessions, their turns, the feedback generated from them
+and every quiz with its cards, so sessions and quizzes survive restarts and
+can be browsed and reopened later.
+"""
+
+import json
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+SESSION_PAGE_SIZE = 20
+RESTORE_TURN_LIMIT = 200
+QUIZ_PAGE_SIZE = 20
+CARD_PAGE_SIZE = 20
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class SessionStore:
+    def __init__(self, db_path="english_learning.db"):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self._create_tables()
+
+    def _create_tables(self):
+        quizzes_exist = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Quizzes'"
+        ).fetchone()
+        with self.conn:
+            self.conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS Sessions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    title TEXT,
+                    started_at TEXT,
+                    updated_at TEXT,
+                    turn_count INTEGER DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS idx_sessions_updated
+                    ON Sessions (updated_at, id);
+
+                CREATE TABLE IF NOT EXISTS Turns (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id INTEGER NOT NULL REFERENCES Sessions (id),
+                    turn_index INTEGER NOT NULL,
+                    speaker TEXT,
+                    text TEXT,
+                    created_at TEXT
+                );
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_turns_session
+                    ON Turns (session_id, turn_index);
+
+                CREATE TABLE IF NOT EXISTS Artifacts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id INTEGER NOT NULL REFERENCES Sessions (id),
+                    kind TEXT,
+                    content TEXT,
+                    created_at TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_artifacts_session
+                    ON Artifacts (session_id, kind, created_at);
+
+                CREATE TABLE IF NOT EXISTS Quizzes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id INTEGER REFERENCES Sessions (id),
+                    source TEXT,
+                    title TEXT,
+                    card_count INTEGER DEFAULT 0,
+                    created_at TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_quizzes_created
+                    ON Quizzes (created_at, id);
+                CREATE INDEX IF NOT EXISTS idx_quizzes_session
+                    ON Quizzes (session_id, created_at);
+
+                -- passed is NULL until the card is answered
+                CREATE TABLE IF NOT EXISTS QuizCards (
+                    quiz_id INTEGER NOT NULL REFERENCES Quizzes (id),
+                    card_index INTEGER NOT NULL,
+                    question TEXT,
+                    answer TEXT,
+                    source_table TEXT,
+                    source_id INTEGER,
+                    passed INTEGER,
+                    PRIMARY KEY (quiz_id, card_index)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_quiz_cards_source
+                    ON QuizCards (source_table, source_id);
+                """
+            )
+        if not quizzes_exist:
+            self._import_quiz_artifacts()
+
+    def _import_quiz_artifacts(self):
+        """
+        Moves quizzes stored as JSON artifacts by earlier versions into the quiz tables.
+        """
+        rows = self.conn.execute(
+            "SELECT session_id, content, created_at FROM Artifacts WHERE kind = 'quiz' ORDER BY id"
+        ).fetchall()
+        for row in rows:
+            self.save_quiz(row["session_id"], json.loads(row["content"]), created_at=row["created_at"])
+        if rows:
+            with self.conn:
+                self.conn.execute("DELETE FROM Artifacts WHERE kind = 'quiz'")
+
+    def create_session(self, title: Optional[str] = None) -> int:
+        """Start a new, empty session and return its id."""
+        now = _now()
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO Sessions (title, started_at, updated_at) VALUES (?, ?, ?)",
+                (title, now, now),
+            )
+        return cursor.lastrowid
+
+    def add_turns(self, session_id: int, turns: List):
+        """
+        Appends transcript turns (objects with speaker, text and timestamp) to a
+        session in a single transaction. The first "You" turn becomes the
+        session title if it has none.
+        """
+        if not turns:
+            return
+        now = _now()
+        with self.conn:
+            row = self.conn.execute(
+                "SELECT turn_count, title FROM Sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+            start = row["turn_count"]
+            self.conn.executemany(
+                "INSERT INTO Turns (session_id, turn_index, speaker, text, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (session_id, start + i, turn.speaker, turn.text, turn.timestamp or now)
+                    for i, turn in enumerate(turns)
+                ],
+            )
+            title = row["title"] or next(
+                (turn.text[:60] for turn in turns if turn.speaker == "You"), None
+            )
+            self.conn.execute(
+                "UPDATE Sessions SET turn_count = ?, updated_at = ?, title = ? WHERE id = ?",
+                (start + len(turns), now, title, session_id),
+            )
+
+    def load_turns(self, session_id: int, limit: int = RESTORE_TURN_LIMIT) -> List[Dict]:
+        """
+        Returns the latest `limit` turns of a session in conversation order,
+        read with one range scan over the (session_id, turn_index) index.
+        """
+        rows = self.conn.execute(
+            "SELECT turn_index, speaker, text, created_at FROM Turns "
+            "WHERE session_id = ? ORDER BY turn_index DESC LIMIT ?",
+            (session_id, limit),
+        ).fetchall()
+        return [dict(row) for row in reversed(rows)]
+
+    def list_sessions(
+        self, before: Optional[Tuple[str, int]] = None, page_size: int = SESSION_PAGE_SIZE
+    ) -> List[Dict]:
+        """
+        Returns one page of sessions, most recently updated first.
+
+        Pass the (updated_at, id) of the last session of a page as `before`
+        to get the next page; keyset paging keeps every page an index seek.
+        """
+        if before is None:
+            rows = self.conn.execute(
+                "SELECT * FROM Sessions ORDER BY updated_at DESC, id DESC LIMIT ?",
+                (page_size,),
+            ).fetchall()
+        else:
+            rows = self.conn.execute(
+                "SELECT * FROM Sessions WHERE (updated_at, id) < (?, ?) "
+                "ORDER BY updated_at DESC, id DESC LIMIT ?",
+                (*before, page_size),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def latest_session_id(self) -> Optional[int]:
+        row = self.conn.execute(
+            "SELECT id FROM Sessions ORDER BY updated_at DESC, id DESC LIMIT 1"
+        ).fetchone()
+        return row["id"] if row else None
+
+    def _add_artifact(self, session_id: int, kind: str, content):
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO Artifacts (session_id, kind, content, created_at) VALUES (?, ?, ?, ?)",
+                (session_id, kind, json.dumps(content), _now()),
+            )
+
+    def _latest_artifact(self, session_id: int, kind: str):
+        row = self.conn.execute(
+            "SELECT content FROM Artifacts WHERE session_id = ? AND kind = ? "
+            "ORDER BY created_at DESC, id DESC LIMIT 1",
+            (session_id, kind),
+        ).fetchone()
+        return json.loads(row["content"]) if row else None
+
+    def save_feedback(self, session_id: int, feedback: Dict):
+        """Store a feedback report generated for a session."""
+        self._add_artifact(session_id, "feedback", feedback)
+
+    def latest_feedback(self, session_id: int) -> Optional[Dict]:
+        return self._latest_artifact(session_id, "feedback")
+
+    def save_quiz(
+        self,
+        session_id: Optional[int],
+        qa_pairs: List[Dict],
+        source: str = "conversation",
+        links: Optional[List[Optional[Tuple[str, int]]]] = None,
+        created_at: Optional[str] = None,
+    ) -> int:
+        """
+        Stores a generated quiz and its cards in one transaction.
+
+        Args:
+            session_id (int, optional): Session the quiz was generated in.
+            qa_pairs (list): Dicts with "question" and "answer", in card order.
+            source (str): "conversation" or "memory".
+            links (list, optional): (table, entry_id) of the learning item behind each card, or None.
+
+        Returns:
+            int: The quiz id.
+        """
+        links = links or [None] * len(qa_pairs)
+        title = qa_pairs[0]["question"].split("\n")[0][:60] if qa_pairs else None
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO Quizzes (session_id, source, title, card_count, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (session_id, source, title, len(qa_pairs), created_at or _now()),
+            )
+            quiz_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO QuizCards (quiz_id, card_index, question, answer, source_table, source_id) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (quiz_id, index, pair["question"], pair["answer"], *(link or (None, None)))
+                    for index, (pair, link) in enumerate(zip(qa_pairs, links))
+                ],
+            )
+        return quiz_id
+
+    def get_quiz(self, quiz_id: int) -> Optional[Dict]:
+        row = self.conn.execute("SELECT * FROM Quizzes WHERE id = ?", (quiz_id,)).fetchone()
+        return dict(row) if row else None
+
+    def latest_quiz_id(self, session_id: Optional[int] = None) -> Optional[int]:
+        """
+        Id of the most recent quiz, of one session or overall.
+        """
+        if session_id is None:
+            row = self.conn.execute(
+                "SELECT id FROM Quizzes ORDER BY created_at DESC, id DESC LIMIT 1"
+            ).fetchone()
+        else:
+            row = self.conn.execute(
+                "SELECT id FROM Quizzes WHERE session_id = ? ORDER BY created_at DESC, id DESC LIMIT 1",
+                (session_id,),
+            ).fetchone()
+        return row["id"] if row else None
+
+    def list_quizzes(
+        self, before: Optional[Tuple[str, int]] = None, page_size: int = QUIZ_PAGE_SIZE
+    ) -> List[Dict]:
+        """
+        Returns one page of quizzes, newest first, keyset-paged like list_sessions.
+        """
+        query = "SELECT * FROM Quizzes"
+        params = []
+        if before is not None:
+            query += " WHERE (created_at, id) < (?, ?)"
+            params.extend(before)
+        rows = self.conn.execute(
+            query + " ORDER BY created_at DESC, id DESC LIMIT ?", (*params, page_size)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def load_cards(self, quiz_id: int, start: int = 0, limit: int = CARD_PAGE_SIZE) -> List[Dict]:
+        """
+        Returns the cards `start` to `start + limit` of a quiz with one
+        range scan over its primary key.
+        """
+        rows = self.conn.execute(
+            "SELECT card_index, question, answer, source_table, source_id, passed FROM QuizCards "
+            "WHERE quiz_id = ? AND card_index >= ? ORDER BY card_index LIMIT ?",
+            (quiz_id, start, limit),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def record_answers(self, quiz_id: int, results: List[Tuple[int, bool]]):
+        """
+        Stores whether each answered card (card_index, passed) was passed.
+        """
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE QuizCards SET passed = ? WHERE quiz_id = ? AND card_index = ?",
+                [(int(passed), quiz_id, index) for index, passed in results],
+            )
+
+    def link_cards(self, quiz_id: int, links: Dict[int, Tuple[str, int]]):
+        """
+        Stores the learning item found for cards that had none.
+        """
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE QuizCards SET source_table = ?, source_id = ? WHERE quiz_id = ? AND card_index = ?",
+                [(table, entry_id, quiz_id, index) for index, (table, entry_id) in links.items()],
+            )
+
+    def close(self):
+        self.conn.close()
+
+
+class QuizDeck:
+    """
+    The cards of a stored quiz as a read-only sequence. Cards are fetched a
+    page at a time on first access, so opening a quiz of any size is instant.
+    """
+
+    def __init__(self, store: SessionStore, quiz: Dict, page_size: int = CARD_PAGE_SIZE):
+        self.store = store
+        self.quiz_id = quiz["id"]
+        self.source = quiz["source"]
+        self.card_count = quiz["card_count"]
+        self.page_size = page_size
+        self.pages = {}
+
+    @classmethod
+    def open(cls, store: SessionStore, quiz_id: int) -> Optional["QuizDeck"]:
+        quiz = store.get_quiz(quiz_id)
+        return cls(store, quiz) if quiz else None
+
+    def __len__(self):
+        return self.card_count
+
+    def __getitem__(self, index: int) -> Dict:
+        if not 0 <= index < self.card_count:
+            raise IndexError(index)
+        page, offset = divmod(index, self.page_size)
+        if page not in self.pages:
+            self.pages[page] = self.store.load_cards(self.quiz_id, page * self.page_size, self.page_size)
+        return self.pages[page][offset]
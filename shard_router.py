@@ -0,0 +1,191 @@
+"""
+Per-learner storage for the Kili server.
+
+Maps each learner to their own SQLite shard (a DBManager database under a
+data directory) and keeps a bounded LRU pool of open shards, so file
+handles and memory stay flat however many learners there are. Shards are
+opened on first use; statistics across all learners are aggregated by
+reading each shard's StatsTotals table with a short-lived read-only
+connection that never enters the pool.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from urllib.request import pathname2url
+
+import database_manager
+
+MAX_OPEN_SHARDS = 64
+# Page cache per open shard in KiB (SQLite's default is 2 MiB)
+SHARD_CACHE_KIB = 512
+LEARNER_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+STATS_COLUMNS = ("total", "due", "attempted", "mastered", "recall_attempts")
+
+
+class _Shard:
+    __slots__ = ("db", "lock", "users")
+
+    def __init__(self):
+        self.db = None
+        self.lock = threading.Lock()
+        self.users = 0
+
+
+class ShardRouter:
+    """
+    Routes learners to their database shard through an LRU pool of open DBManagers.
+    """
+
+    def __init__(self, root, max_open=MAX_OPEN_SHARDS):
+        """
+        Args:
+            root (str): Directory holding the shards.
+            max_open (int): Open shards kept in the pool. Shards in use are
+                never closed, so the pool can briefly exceed this under load.
+        """
+        self.root = root
+        self.max_open = max_open
+        self._open = OrderedDict()
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.evicted = 0
+
+    def shard_path(self, learner_id):
+        """
+        Raises:
+            ValueError: If the learner id is not 1-64 letters, digits, '-' or '_'.
+        """
+        if not LEARNER_ID_PATTERN.match(learner_id or ""):
+            raise ValueError("Invalid learner id.")
+        # Two-character buckets keep directories small with thousands of learners
+        bucket = hashlib.sha1(learner_id.encode("utf-8")).hexdigest()[:2]
+        return os.path.join(self.root, bucket, f"{learner_id}.db")
+
+    @contextmanager
+    def db(self, learner_id):
+        """
+        Lends the learner's DBManager for the duration of the block, opening
+        the shard if needed. Blocks for the same learner run one at a time.
+        """
+        path = self.shard_path(learner_id)
+        shard = self._acquire(learner_id)
+        try:
+            with shard.lock:
+                if shard.db is None:
+                    shard.db = self._open_db(path)
+                yield shard.db
+        finally:
+            self._release(shard)
+
+    def _open_db(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        db = database_manager.DBManager(path, check_same_thread=False)
+        db.conn.execute(f"PRAGMA cache_size = -{SHARD_CACHE_KIB}")
+        with self._lock:
+            self.opened += 1
+        return db
+
+    def _acquire(self, learner_id):
+        with self._lock:
+            shard = self._open.get(learner_id)
+            if shard is None:
+                shard = self._open[learner_id] = _Shard()
+            else:
+                self._open.move_to_end(learner_id)
+            shard.users += 1
+            idle = self._evict()
+        self._close(idle)
+        return shard
+
+    def _release(self, shard):
+        with self._lock:
+            shard.users -= 1
+            idle = self._evict()
+        self._close(idle)
+
+    def _evict(self):
+        """
+        Removes least recently used idle shards over the limit; called with the lock held.
+        """
+        evicted = []
+        if len(self._open) > self.max_open:
+            for learner_id, shard in list(self._open.items()):
+                if len(self._open) <= self.max_open:
+                    break
+                if shard.users == 0:
+                    del self._open[learner_id]
+                    evicted.append(shard)
+            self.evicted += len(evicted)
+        return evicted
+
+    @staticmethod
+    def _close(shards):
+        for shard in shards:
+            if shard.db is not None:
+                shard.db.close()
+
+    def _shard_files(self):
+        if not os.path.isdir(self.root):
+            return []
+        files = []
+        for bucket in sorted(os.listdir(self.root)):
+            bucket_dir = os.path.join(self.root, bucket)
+            if os.path.isdir(bucket_dir):
+                files.extend(
+                    (name[:-3], os.path.join(bucket_dir, name))
+                    for name in sorted(os.listdir(bucket_dir)) if name.endswith(".db")
+                )
+        return files
+
+    def learner_ids(self):
+        """
+        Ids of all learners with a shard on disk.
+        """
+        return [learner_id for learner_id, _ in self._shard_files()]
+
+    def aggregate_stats(self):
+        """
+        Sums the progress statistics of all shards, one shard at a time.
+
+        Returns:
+            dict: Learner count and per-category totals with success rates.
+        """
+        totals = {}
+        learners = 0
+        for learner_id, path in self._shard_files():
+            uri = f"file:{pathname2url(os.path.abspath(path))}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True)
+            try:
+                rows = conn.execute(
+                    f"SELECT category, {', '.join(STATS_COLUMNS)} FROM StatsTotals"
+                ).fetchall()
+            except sqlite3.DatabaseError as e:
+                print(f"Error reading shard of {learner_id}:", e)
+                continue
+            finally:
+                conn.close()
+            learners += 1
+            for category, *values in rows:
+                sums = totals.setdefault(category, [0] * len(STATS_COLUMNS))
+                for i, value in enumerate(values):
+                    sums[i] += value or 0
+        categories = []
+        for category, sums in totals.items():
+            entry = {"category": category, **dict(zip(STATS_COLUMNS, sums))}
+            entry["success_rate"] = entry["mastered"] / entry["attempted"] if entry["attempted"] else 0.0
+            categories.append(entry)
+        return {"learners": learners, "categories": categories}
+
+    def __len__(self):
+        return len(self._open)
+
+    def close(self):
+        with self._lock:
+            shards = list(self._open.values())
+            self._open.clear()
+        self._close(shards)
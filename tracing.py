@@ -0,0 +1,193 @@
+"""
+Lightweight span tracing for the Kili English Learning App.
+
+Records timed spans (e.g. capture, transcription, chat, TTS, playback start)
+from any thread into a bounded in-memory buffer, samples how late the event
+loop wakes up (time the Qt loop was blocked), and can take tracemalloc
+snapshots on demand. The buffer feeds the diagnostics panel and can be
+exported as a Chrome trace (chrome://tracing or https://ui.perfetto.dev).
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+MAX_EVENTS = 20000
+LAG_INTERVAL = 0.05  # Seconds between event-loop lag samples
+LAG_SAMPLES = 1200
+
+
+class Tracer:
+    """
+    Thread-safe recorder of spans, instant events and counters.
+    Timestamps are microseconds since the tracer was created.
+    """
+
+    def __init__(self, max_events=MAX_EVENTS):
+        self.events = deque(maxlen=max_events)
+        self.origin = time.perf_counter_ns()
+        self.lock = threading.Lock()
+        self.threads = {}
+
+    def _now(self):
+        return (time.perf_counter_ns() - self.origin) / 1000
+
+    def _record(self, event):
+        thread = threading.current_thread()
+        event["pid"] = os.getpid()
+        event["tid"] = thread.ident
+        with self.lock:
+            self.threads[thread.ident] = thread.name
+            self.events.append(event)
+
+    @contextmanager
+    def span(self, name, **args):
+        """
+        Times the enclosed block as one span.
+        """
+        start = self._now()
+        try:
+            yield
+        finally:
+            self._record({"name": name, "ph": "X", "ts": start, "dur": self._now() - start, "args": args})
+
+    def begin(self, name, **args):
+        """
+        Starts a span that ends elsewhere (e.g. in another callback).
+
+        Returns:
+            callable: Call it to end the span.
+        """
+        start = self._now()
+        ended = False
+
+        def end(**end_args):
+            nonlocal ended
+            if not ended:
+                ended = True
+                self._record({
+                    "name": name, "ph": "X", "ts": start, "dur": self._now() - start,
+                    "args": {**args, **end_args},
+                })
+
+        return end
+
+    def instant(self, name, **args):
+        self._record({"name": name, "ph": "i", "s": "t", "ts": self._now(), "args": args})
+
+    def counter(self, name, value):
+        self._record({"name": name, "ph": "C", "ts": self._now(), "args": {name: value}})
+
+    def span_stats(self):
+        """
+        Per span name: count, mean, p95 and max duration in milliseconds.
+        """
+        durations = {}
+        with self.lock:
+            events = list(self.events)
+        for event in events:
+            if event["ph"] == "X":
+                durations.setdefault(event["name"], []).append(event["dur"] / 1000)
+        stats = []
+        for name, values in durations.items():
+            values.sort()
+            stats.append({
+                "name": name,
+                "count": len(values),
+                "mean": sum(values) / len(values),
+                "p95": values[min(len(values) - 1, int(0.95 * len(values)))],
+                "max": values[-1],
+            })
+        return sorted(stats, key=lambda entry: entry["mean"], reverse=True)
+
+    def export_chrome_trace(self, path):
+        """
+        Writes the recorded events as a Chrome trace JSON file.
+        """
+        with self.lock:
+            events = list(self.events)
+            threads = dict(self.threads)
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+        return len(events)
+
+    def clear(self):
+        with self.lock:
+            self.events.clear()
+
+
+class LoopLagMonitor:
+    """
+    Samples how late the event loop runs a timer. Under qasync this is the
+    time the Qt loop was blocked by work on the GUI thread.
+    """
+
+    def __init__(self, tracer, interval=LAG_INTERVAL):
+        self.tracer = tracer
+        self.interval = interval
+        self.samples = deque(maxlen=LAG_SAMPLES)
+        self.task = None
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.ensure_future(self._run())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def _run(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (time.perf_counter() - expected) * 1000)
+            self.samples.append(lag_ms)
+            if lag_ms >= 1.0:
+                self.tracer.counter("event loop lag (ms)", round(lag_ms, 1))
+
+    def stats(self):
+        """
+        Returns (mean, p95, max) lag in milliseconds over the recent samples.
+        """
+        if not self.samples:
+            return 0.0, 0.0, 0.0
+        values = sorted(self.samples)
+        return (
+            sum(values) / len(values),
+            values[min(len(values) - 1, int(0.95 * len(values)))],
+            values[-1],
+        )
+
+
+def start_memory_tracing():
+    import tracemalloc
+    tracemalloc.start()
+
+
+def memory_snapshot(limit=10):
+    """
+    Returns the top allocation sites as text lines, or None if tracemalloc
+    was not started (see --trace-memory).
+    """
+    import tracemalloc
+
+    if not tracemalloc.is_tracing():
+        return None
+    current, peak = tracemalloc.get_traced_memory()
+    tracer.counter("traced memory (KiB)", current // 1024)
+    lines = [f"current: {current / 1024:.0f} KiB, peak: {peak / 1024:.0f} KiB"]
+    for stat in tracemalloc.take_snapshot().statistics("lineno")[:limit]:
+        lines.append(str(stat))
+    return lines
+
+
+tracer = Tracer()
@@ -0,0 +1,121 @@
+"""
+Structured transcript model for the Kili English Learning App.
+
+A conversation is parsed once into turns (speaker, text, character offsets,
+timestamp) and then updated incrementally as turns are appended, so display,
+diffing, prompting and persistence reuse the same structure instead of
+re-parsing the conversation text with regexes every time.
+"""
+
+import re
+from datetime import datetime
+
+TURN_PATTERN = re.compile(r"(You:|System:)")
+SPEAKER_ICONS = {"You": "👩🏽", "System": "🤖"}
+
+
+class Turn:
+    """
+    One turn of a conversation. `start` and `end` are the offsets of the
+    turn's text within the transcript text.
+    """
+    __slots__ = ("speaker", "text", "start", "end", "timestamp")
+
+    def __init__(self, speaker, text, start, end, timestamp=None):
+        self.speaker = speaker
+        self.text = text
+        self.start = start
+        self.end = end
+        self.timestamp = timestamp
+
+    def line(self):
+        return f"{self.speaker}: {self.text}\n"
+
+    def display_line(self):
+        return f"{SPEAKER_ICONS.get(self.speaker, self.speaker)}: {self.text}"
+
+
+class Transcript:
+    """
+    Ordered turns of a conversation plus their serialized text, kept in sync
+    on append. Rendering the full text is cached until the next append.
+    """
+
+    def __init__(self):
+        self.turns = []
+        self._lines = []
+        self._length = 0
+        self._text = ""
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Builds a transcript from "You: ... System: ..." text. Markers do not
+        have to start a line.
+        """
+        transcript = cls()
+        parts = TURN_PATTERN.split(text)
+        for marker, body in zip(parts[1::2], parts[2::2]):
+            transcript.append(marker[:-1], body.strip())
+        return transcript
+
+    @classmethod
+    def from_turns(cls, turns):
+        """
+        Builds a transcript from stored turns (dicts with "speaker", "text"
+        and optionally "created_at").
+        """
+        transcript = cls()
+        for turn in turns:
+            transcript.append(turn["speaker"], turn["text"], turn.get("created_at"))
+        return transcript
+
+    def append(self, speaker, text, timestamp=None):
+        """
+        Appends a turn in O(len(text)).
+
+        Returns:
+            Turn: The new turn.
+        """
+        start = self._length + len(speaker) + 2
+        turn = Turn(
+            speaker,
+            text,
+            start,
+            start + len(text),
+            timestamp or datetime.now().isoformat(timespec="seconds"),
+        )
+        line = turn.line()
+        self.turns.append(turn)
+        self._lines.append(line)
+        self._length += len(line)
+        return turn
+
+    def text(self):
+        """
+        The conversation as "Speaker: text" lines, joined only when it changed.
+        """
+        if len(self._text) != self._length:
+            self._text = "".join(self._lines)
+        return self._text
+
+    def text_since(self, index):
+        """
+        The lines of the turns from `index` on, e.g. to append them to a log.
+        """
+        return "".join(self._lines[index:])
+
+    def user_turns(self):
+        return [turn for turn in self.turns if turn.speaker == "You"]
+
+    def display_text(self):
+        """
+        The conversation formatted for display, one icon-prefixed turn per paragraph.
+        """
+        return "\n\n".join(turn.display_line() for turn in self.turns)
+
+    def __len__(self):
+        return len(self.turns)
+
+    def __iter__(self):
+        return iter(self.turns)
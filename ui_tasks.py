@@ -0,0 +1,110 @@
+"""
+Background task helpers for the Kili English Learning App UI.
+
+Runs blocking model calls as asyncio tasks on the qasync loop so the window
+keeps repainting, with a progress indicator, a cancel button, the trigger
+button disabled while the task is in flight, and repeated clicks ignored.
+"""
+
+import asyncio
+from PyQt5.QtWidgets import QWidget, QHBoxLayout, QProgressBar, QPushButton
+
+
+class TaskProgress(QWidget):
+    """
+    Busy indicator with a cancel button, hidden while its task is idle.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.bar = QProgressBar()
+        self.bar.setRange(0, 0)  # Busy mode: model calls report no progress
+        self.bar.setTextVisible(False)
+        self.bar.setFixedWidth(120)
+        self.cancel_btn = QPushButton("Cancel")
+        layout.addWidget(self.bar)
+        layout.addWidget(self.cancel_btn)
+        self.setLayout(layout)
+        self.hide()
+
+
+class TaskRunner:
+    """
+    Starts, deduplicates and cancels named background tasks.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+
+    def is_running(self, name):
+        task = self._tasks.get(name)
+        return task is not None and not task.done()
+
+    def is_busy(self):
+        return any(not task.done() for task in self._tasks.values())
+
+    def start(self, name, coro, buttons=(), progress=None, on_done=None):
+        """
+        Run a coroutine as a named task unless one with that name is in flight.
+
+        Args:
+            name (str): Task name used for deduplication and cancellation.
+            coro (coroutine): The work to run, typically wrapping asyncio.to_thread.
+            buttons (iterable): Trigger buttons, disabled while running.
+            progress (TaskProgress, optional): Indicator shown while running.
+            on_done (callable, optional): Called with the result on success.
+
+        Returns:
+            asyncio.Task or None: The new task, or None if the click was a duplicate.
+        """
+        if self.is_running(name):
+            coro.close()
+            print(f"[Task] {name} already running, ignoring repeated click.")
+            return None
+
+        task = asyncio.create_task(coro)
+        self._tasks[name] = task
+
+        for button in buttons:
+            button.setEnabled(False)
+        def cancel():
+            task.cancel()
+
+        if progress is not None:
+            progress.cancel_btn.clicked.connect(cancel)
+            progress.show()
+
+        def finish(done_task):
+            if self._tasks.get(name) is done_task:
+                del self._tasks[name]
+            for button in buttons:
+                button.setEnabled(True)
+            if progress is not None:
+                progress.cancel_btn.clicked.disconnect(cancel)
+                progress.hide()
+            if done_task.cancelled():
+                print(f"[Task] {name} cancelled.")
+                return
+            error = done_task.exception()
+            if error is not None:
+                print(f"Error in {name}:", error)
+            elif on_done is not None:
+                on_done(done_task.result())
+
+        task.add_done_callback(finish)
+        return task
+
+    def cancel(self, name):
+        """
+        Cancel a running task. Work already inside a worker thread finishes
+        in the background, but its result is discarded.
+        """
+        task = self._tasks.get(name)
+        if task is not None:
+            task.cancel()
+
+    def cancel_all(self):
+        for task in list(self._tasks.values()):
+            task.cancel()